@@ -6,21 +6,24 @@ import json
 import logging
 import math
 import os
+import time
 import uuid
-from collections import deque
+from collections import OrderedDict, deque
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Deque, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict
 
 import httpx
 import psycopg
+import redis.asyncio as redis_asyncio
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
 
 from service_contracts import (
+    FastJSONResponse,
     GoldPriceHistoryPoint,
     GoldPriceHistoryResponse,
     GoldPriceKeyNode,
@@ -185,6 +188,28 @@ class AgentAnalyzeResponse(BaseModel):
     timing_ms: Dict[str, int]
 
 
+class AgentAnalyzeBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[AgentAnalyzeRequest] = Field(min_length=1, max_length=32)
+
+
+class AgentAnalyzeBatchItem(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    index: int
+    response: Optional[AgentAnalyzeResponse] = None
+    error: Optional[Dict[str, Any]] = None
+
+
+class AgentAnalyzeBatchResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[AgentAnalyzeBatchItem]
+    tool_trace: List[Dict[str, Any]]
+    timing_ms: Dict[str, int]
+
+
 class AgentForecastsResponse(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -295,6 +320,7 @@ class AgentGatewayConfig:
     vix_circuit_breaker_threshold: float
     stale_after_seconds: int
     news_stale_after_seconds: int
+    snapshot_freshness_budget_seconds: int = 60
 
 
 @dataclass
@@ -335,6 +361,16 @@ class AnalysisBundle:
     tool_trace: List[Dict[str, Any]]
 
 
+@dataclass
+class PreparedAnalysis:
+    evidence_query: str
+    bundle: AnalysisBundle
+    horizon_forecasts: List["HorizonForecastCard"]
+    evidence_cards: List[EvidenceCard]
+    citations: List[CitationItem]
+    draft: NarrativeOutput
+
+
 @dataclass
 class AnalysisComputation:
     response: AgentAnalyzeResponse
@@ -780,6 +816,9 @@ def _split_csv(value: Optional[str]) -> List[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+_GOLD_RESEARCH_TERMS = "黄金 金价 美元 利率 美联储 ETF CFTC"
+
+
 def _evidence_query(req: AgentAnalyzeRequest) -> str:
     primary = (req.optional_news_text or "").strip()
     if primary:
@@ -792,8 +831,7 @@ def _news_search_query(req: AgentAnalyzeRequest) -> str:
     if primary:
         return primary
     base = req.question.strip()
-    gold_research_terms = "黄金 金价 美元 利率 美联储 ETF CFTC"
-    return f"{base} {gold_research_terms}".strip()
+    return f"{base} {_GOLD_RESEARCH_TERMS}".strip()
 
 
 def _memory_unavailable_copy(status: str, reason: Optional[str]) -> str:
@@ -863,6 +901,83 @@ class TraceStoreUnavailableError(RuntimeError):
     pass
 
 
+class ToolCircuitOpenError(RuntimeError):
+    pass
+
+
+class ToolCircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        budget_seconds: float,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+        latency_window: int = 100,
+        min_hedge_samples: int = 20,
+    ):
+        self.name = name
+        self._budget_seconds = max(0.001, float(budget_seconds))
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._cooldown_seconds = max(0.0, float(cooldown_seconds))
+        self._latencies: Deque[float] = deque(maxlen=max(1, int(latency_window)))
+        self._min_hedge_samples = max(1, int(min_hedge_samples))
+        self._consecutive_failures = 0
+        self._open_until: Optional[float] = None
+        self._trial_inflight = False
+        self._stats: Dict[str, Any] = {"calls": 0, "failures": 0, "short_circuited": 0, "timeouts": 0, "last_error": None}
+
+    @property
+    def state(self) -> str:
+        if self._open_until is None:
+            return "closed"
+        return "open" if time.monotonic() < self._open_until else "half_open"
+
+    def p95_seconds(self) -> Optional[float]:
+        if len(self._latencies) < self._min_hedge_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(math.ceil(0.95 * len(ordered))) - 1)]
+
+    async def call(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_inflight):
+            self._stats["short_circuited"] += 1
+            raise ToolCircuitOpenError(f"circuit_open:{self.name}")
+        trial = state == "half_open"
+        self._trial_inflight = trial
+        self._stats["calls"] += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(factory(), timeout=self._budget_seconds)
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                self._stats["timeouts"] += 1
+            self._stats["failures"] += 1
+            self._stats["last_error"] = f"{type(exc).__name__}:{exc}"
+            self._consecutive_failures += 1
+            if trial or self._consecutive_failures >= self._failure_threshold:
+                self._open_until = time.monotonic() + self._cooldown_seconds
+            raise
+        finally:
+            if trial:
+                self._trial_inflight = False
+        self._latencies.append(time.perf_counter() - started)
+        self._consecutive_failures = 0
+        self._open_until = None
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95_seconds()
+        return {
+            **self._stats,
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "budget_ms": int(self._budget_seconds * 1000),
+            "p95_ms": int(p95 * 1000) if p95 is not None else None,
+        }
+
+
 class ApiKeyAuthorizer:
     def __init__(self, *, public_keys: Sequence[str], internal_keys: Sequence[str]):
         self._public_keys = {key for key in public_keys if key}
@@ -922,31 +1037,219 @@ class ApiKeyAuthorizer:
         }
 
 
-class SlidingWindowRateLimiter:
-    def __init__(self, *, limit: int, window_seconds: int):
+_GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local ahead = new_tat - now
+if ahead > window then
+    return math.max(1, math.ceil(ahead - window))
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(ahead))
+return 0
+"""
+
+
+class GcraRateLimiter:
+    def __init__(
+        self,
+        *,
+        limit: int,
+        window_seconds: int,
+        redis_client: Any = None,
+        key_prefix: str = "golden_sense:rate_limit:",
+    ):
         self._limit = max(0, int(limit))
-        self._window_seconds = max(1, int(window_seconds))
-        self._buckets: Dict[str, Deque[float]] = {}
-        self._lock = asyncio.Lock()
+        self._window_ms = max(1, int(window_seconds)) * 1000
+        self._interval_ms = self._window_ms / max(1, self._limit)
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self._key_prefix = key_prefix
+        self._script = redis_client.register_script(_GCRA_LUA) if redis_client is not None else None
+        self._stats: Dict[str, Any] = {"local_rejections": 0, "redis_rejections": 0, "redis_errors": 0, "last_redis_error": None}
+
+    def _evict_idle(self, now_ms: float) -> None:
+        while self._tat:
+            _, tat = next(iter(self._tat.items()))
+            if tat > now_ms:
+                break
+            self._tat.popitem(last=False)
+
+    def _check_local(self, client_id: str, now_ms: float) -> float:
+        self._evict_idle(now_ms)
+        tat = max(self._tat.get(client_id, now_ms), now_ms)
+        new_tat = tat + self._interval_ms
+        ahead = new_tat - now_ms
+        if ahead > self._window_ms:
+            return ahead - self._window_ms
+        self._tat[client_id] = new_tat
+        self._tat.move_to_end(client_id)
+        return 0.0
+
+    def _reject(self, retry_after_ms: float) -> HTTPException:
+        return HTTPException(
+            status_code=429,
+            detail={
+                "error_code": "rate_limit_exceeded",
+                "message": f"Analyze rate limit exceeded. Try again later (limit={self._limit}/{self._window_ms // 1000}s).",
+            },
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_ms / 1000)))},
+        )
 
     async def check(self, client_id: str) -> None:
         if self._limit <= 0:
             return
 
-        now = datetime.now(timezone.utc).timestamp()
-        async with self._lock:
-            bucket = self._buckets.setdefault(client_id, deque())
-            while bucket and now - bucket[0] >= self._window_seconds:
-                bucket.popleft()
-            if len(bucket) >= self._limit:
-                raise HTTPException(
-                    status_code=429,
-                    detail={
-                        "error_code": "rate_limit_exceeded",
-                        "message": f"Analyze rate limit exceeded. Try again later (limit={self._limit}/{self._window_seconds}s).",
-                    },
-                )
-            bucket.append(now)
+        retry_after_ms = self._check_local(client_id, time.time() * 1000)
+        if retry_after_ms > 0:
+            self._stats["local_rejections"] += 1
+            raise self._reject(retry_after_ms)
+        if self._script is None:
+            return
+        try:
+            retry_after_ms = float(
+                await self._script(keys=[f"{self._key_prefix}{client_id}"], args=[self._interval_ms, self._window_ms])
+            )
+        except Exception as exc:
+            self._stats["redis_errors"] += 1
+            self._stats["last_redis_error"] = f"{type(exc).__name__}:{exc}"
+            return
+        if retry_after_ms > 0:
+            self._stats["redis_rejections"] += 1
+            raise self._reject(retry_after_ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "backend": "redis" if self._script is not None else "local",
+            "local_buckets": len(self._tat),
+        }
+
+
+class CurrentViewCache:
+    def __init__(self, *, ttl_seconds: float, stale_grace_seconds: float):
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._stale_grace_seconds = max(0.0, float(stale_grace_seconds))
+        self._entries: Dict[Tuple[str, str], Tuple[float, BaseModel]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._stats: Dict[str, Any] = {"hits": 0, "stale_hits": 0, "misses": 0, "last_refresh_error": None}
+
+    def _start_refresh(self, key: Tuple[str, str], compute: Callable[[], Awaitable[BaseModel]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+
+        async def _refresh() -> BaseModel:
+            try:
+                value = await compute()
+                self._entries[key] = (time.monotonic(), value)
+                self._stats["last_refresh_error"] = None
+                return value
+            except Exception as exc:
+                self._stats["last_refresh_error"] = f"{type(exc).__name__}:{exc}"
+                raise
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.create_task(_refresh())
+        self._inflight[key] = task
+        return task
+
+    async def get(
+        self, endpoint: str, locale: str, compute: Callable[[], Awaitable[BaseModel]]
+    ) -> Tuple[BaseModel, int]:
+        if self._ttl_seconds <= 0:
+            return await compute(), 0
+
+        key = (endpoint, locale)
+        cached = self._entries.get(key)
+        if cached is not None:
+            stored_at, value = cached
+            age = time.monotonic() - stored_at
+            if age < self._ttl_seconds:
+                self._stats["hits"] += 1
+                return value, int(age * 1000)
+            if age < self._ttl_seconds + self._stale_grace_seconds:
+                self._stats["stale_hits"] += 1
+                task = self._start_refresh(key, compute)
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                return value, int(age * 1000)
+
+        self._stats["misses"] += 1
+        value = await asyncio.shield(self._start_refresh(key, compute))
+        return value, 0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "items": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl_seconds": self._ttl_seconds,
+        }
+
+
+class _TraceMemoryCache:
+    def __init__(self, *, ttl_seconds: int, max_items: int, max_bytes: int = 0):
+        self._ttl_seconds = ttl_seconds
+        self._max_items = max_items
+        self._max_bytes = max(0, int(max_bytes))
+        self._rows: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def _drop(self, analysis_id: str) -> None:
+        entry = self._rows.pop(analysis_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def expire(self, now_ts: Optional[float] = None) -> None:
+        now_ts = datetime.now(timezone.utc).timestamp() if now_ts is None else now_ts
+        while self._expiry and now_ts - self._expiry[0][0] > self._ttl_seconds:
+            created_at_epoch, analysis_id = self._expiry.popleft()
+            entry = self._rows.get(analysis_id)
+            if entry is not None and entry[0].get("created_at_epoch") == created_at_epoch:
+                self._drop(analysis_id)
+        if len(self._expiry) > 2 * len(self._rows) + 64:
+            self._expiry = deque(
+                (row["created_at_epoch"], analysis_id)
+                for analysis_id, (row, _) in sorted(self._rows.items(), key=lambda item: item[1][0]["created_at_epoch"])
+            )
+
+    def put(self, row: Dict[str, Any]) -> None:
+        analysis_id = row["analysis_id"]
+        self._drop(analysis_id)
+        size = len(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")) if self._max_bytes else 0
+        self._rows[analysis_id] = (row, size)
+        self._bytes += size
+        self._expiry.append((row["created_at_epoch"], analysis_id))
+        self.expire()
+        while len(self._rows) > self._max_items or (self._max_bytes and self._bytes > self._max_bytes and len(self._rows) > 1):
+            self._drop(next(iter(self._rows)))
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        self.expire()
+        entry = self._rows.get(analysis_id)
+        if entry is None:
+            return None
+        self._rows.move_to_end(analysis_id)
+        return entry[0]
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._expiry.clear()
+        self._bytes = 0
 
 
 class AgentTraceStore:
@@ -957,18 +1260,56 @@ class AgentTraceStore:
         allow_memory_fallback: bool,
         memory_ttl_seconds: int,
         memory_max_items: int,
+        memory_max_bytes: int = 0,
+        write_behind: bool = False,
+        flush_interval_ms: int = 200,
+        flush_max_rows: int = 100,
+        queue_max_items: int = 2000,
+        enqueue_timeout_seconds: float = 2.0,
+        flush_max_attempts: int = 3,
     ):
         self._database_url = database_url
         self._allow_memory_fallback = allow_memory_fallback
         self._memory_ttl_seconds = max(60, int(memory_ttl_seconds))
         self._memory_max_items = max(1, int(memory_max_items))
-        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._memory = _TraceMemoryCache(
+            ttl_seconds=self._memory_ttl_seconds,
+            max_items=self._memory_max_items,
+            max_bytes=memory_max_bytes,
+        )
         self._db_ready = False
+        self._write_behind_requested = write_behind
+        self._write_behind = False
+        self._flush_interval_seconds = max(1, int(flush_interval_ms)) / 1000.0
+        self._flush_max_rows = max(1, int(flush_max_rows))
+        self._queue_max_items = max(1, int(queue_max_items))
+        self._enqueue_timeout_seconds = max(0.0, float(enqueue_timeout_seconds))
+        self._flush_max_attempts = max(1, int(flush_max_attempts))
+        self._failed_attempts = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._dead_letters: Deque[Dict[str, Any]] = deque(maxlen=self._queue_max_items)
+        self._queue_space = asyncio.Condition()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_stop = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_behind_stats: Dict[str, Any] = {
+            "flushed_rows": 0,
+            "flush_batches": 0,
+            "flush_failures": 0,
+            "dropped_rows": 0,
+            "dead_lettered_rows": 0,
+            "last_flush_ms": None,
+            "max_flush_ms": 0,
+        }
 
     async def startup(self) -> None:
         try:
             await asyncio.to_thread(self._ensure_schema_sync)
             self._db_ready = True
+            if self._write_behind_requested and self._flush_task is None:
+                self._write_behind = True
+                self._flush_task = asyncio.create_task(self._flush_loop())
         except Exception as exc:
             self._db_ready = False
             LOGGER.warning(
@@ -984,27 +1325,14 @@ class AgentTraceStore:
         if not self._allow_memory_fallback:
             self._memory.clear()
             return
-        now_ts = datetime.now(timezone.utc).timestamp()
-        expired = [
-            analysis_id
-            for analysis_id, row in self._memory.items()
-            if now_ts - float(row.get("created_at_epoch", now_ts)) > self._memory_ttl_seconds
-        ]
-        for analysis_id in expired:
-            self._memory.pop(analysis_id, None)
-        while len(self._memory) > self._memory_max_items:
-            oldest = next(iter(self._memory))
-            self._memory.pop(oldest, None)
+        self._memory.expire()
 
     def _store_memory(self, row: Dict[str, Any]) -> None:
         if not self._allow_memory_fallback:
             return
-        self._prune_memory()
-        self._memory[row["analysis_id"]] = row
-        self._prune_memory()
+        self._memory.put(row)
 
     def _memory_row(self, analysis_id: str) -> Optional[Dict[str, Any]]:
-        self._prune_memory()
         row = self._memory.get(analysis_id)
         if row is None:
             return None
@@ -1038,6 +1366,9 @@ class AgentTraceStore:
             if self._allow_memory_fallback:
                 return analysis_id
             raise TraceStoreUnavailableError("trace_store_unavailable")
+        if self._write_behind:
+            await self._enqueue(row)
+            return analysis_id
 
         try:
             await asyncio.to_thread(self._persist_analysis_sync, row)
@@ -1053,11 +1384,115 @@ class AgentTraceStore:
                 return analysis_id
             raise TraceStoreUnavailableError("trace_store_persist_failed") from exc
 
+    async def _enqueue(self, row: Dict[str, Any]) -> None:
+        async with self._queue_space:
+            if len(self._pending) >= self._queue_max_items:
+                self._flush_wakeup.set()
+                try:
+                    await asyncio.wait_for(
+                        self._queue_space.wait_for(lambda: len(self._pending) < self._queue_max_items),
+                        timeout=self._enqueue_timeout_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    self._write_behind_stats["dropped_rows"] += 1
+                    LOGGER.warning(
+                        "agent_trace_queue_full analysis_id=%s queue_length=%s allow_memory_fallback=%s",
+                        row["analysis_id"],
+                        len(self._pending),
+                        self._allow_memory_fallback,
+                    )
+                    if self._allow_memory_fallback:
+                        return
+                    raise TraceStoreUnavailableError("trace_store_queue_full")
+            self._pending[row["analysis_id"]] = row
+        if len(self._pending) >= self._flush_max_rows:
+            self._flush_wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._flush_stop.is_set():
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self._flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        async with self._flush_lock:
+            while self._pending:
+                batch = list(self._pending.values())[: self._flush_max_rows]
+                started = time.perf_counter()
+                try:
+                    await asyncio.to_thread(self._persist_batch_sync, batch)
+                except Exception as exc:
+                    self._write_behind_stats["flush_failures"] += 1
+                    self._failed_attempts += 1
+                    LOGGER.warning(
+                        "agent_trace_flush_failed rows=%s queue_length=%s attempts=%s error=%s",
+                        len(batch),
+                        len(self._pending),
+                        self._failed_attempts,
+                        f"{type(exc).__name__}:{exc}",
+                    )
+                    if self._failed_attempts < self._flush_max_attempts:
+                        return False
+                    self._failed_attempts = 0
+                    batch = await self._isolate_failed_rows(batch)
+                    if not batch:
+                        return False
+                self._failed_attempts = 0
+                elapsed_ms = int((time.perf_counter() - started) * 1000)
+                for row in batch:
+                    self._pending.pop(row["analysis_id"], None)
+                stats = self._write_behind_stats
+                stats["flushed_rows"] += len(batch)
+                stats["flush_batches"] += 1
+                stats["last_flush_ms"] = elapsed_ms
+                stats["max_flush_ms"] = max(int(stats["max_flush_ms"]), elapsed_ms)
+                async with self._queue_space:
+                    self._queue_space.notify_all()
+        return True
+
+    async def _isolate_failed_rows(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 逐行重试：只要有行写入成功就说明数据库可用，失败行移入死信，避免一行坏数据堵住整个队列；
+        # 全部失败时视为数据库不可用，行保留在队列中等待下次重试。
+        persisted: List[Dict[str, Any]] = []
+        failed: List[Tuple[Dict[str, Any], Exception]] = []
+        for row in batch:
+            try:
+                await asyncio.to_thread(self._persist_batch_sync, [row])
+                persisted.append(row)
+            except Exception as exc:
+                failed.append((row, exc))
+        if not persisted:
+            return []
+        for row, exc in failed:
+            self._pending.pop(row["analysis_id"], None)
+            self._dead_letters.append(row)
+            self._write_behind_stats["dead_lettered_rows"] += 1
+            LOGGER.error(
+                "agent_trace_dead_lettered analysis_id=%s error=%s",
+                row["analysis_id"],
+                f"{type(exc).__name__}:{exc}",
+            )
+        return persisted
+
+    async def shutdown(self) -> None:
+        if self._flush_task is not None:
+            self._flush_stop.set()
+            self._flush_wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+        if self._pending:
+            await self.flush()
+
     async def save_feedback(self, analysis_id: str, rating: str, comment: Optional[str]) -> bool:
-        row = self._memory.get(analysis_id)
+        row = self._memory.get(analysis_id) or self._pending.get(analysis_id)
         if row is not None:
             row["feedback_rating"] = rating
             row["feedback_comment"] = comment
+        if analysis_id in self._pending:
+            await self.flush()
 
         if self._db_ready:
             try:
@@ -1080,6 +1515,11 @@ class AgentTraceStore:
         row = self._memory_row(analysis_id)
         if row is not None:
             return row
+        pending = self._pending.get(analysis_id)
+        if pending is not None:
+            payload = dict(pending)
+            payload.pop("created_at_epoch", None)
+            return payload
         if not self._db_ready:
             if self._allow_memory_fallback:
                 return None
@@ -1103,12 +1543,23 @@ class AgentTraceStore:
             "db_ready": self._db_ready,
             "allow_memory_fallback": self._allow_memory_fallback,
             "memory_items": len(self._memory),
+            "memory_bytes": self._memory.total_bytes,
+            "write_behind": {
+                "enabled": self._write_behind,
+                "queue_length": len(self._pending),
+                "queue_max_items": self._queue_max_items,
+                "dead_letter_length": len(self._dead_letters),
+                **self._write_behind_stats,
+            },
         }
 
     def _persist_analysis_sync(self, row: Dict[str, Any]) -> None:
+        self._persist_batch_sync([row])
+
+    def _persist_batch_sync(self, rows: List[Dict[str, Any]]) -> None:
         with psycopg.connect(self._database_url) as conn:
             with conn.cursor() as cur:
-                cur.execute(
+                cur.executemany(
                     """
                     insert into agent_analysis_traces (
                         analysis_id,
@@ -1120,16 +1571,20 @@ class AgentTraceStore:
                         feedback_comment
                     )
                     values (%s, %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb, %s, %s)
+                    on conflict (analysis_id) do nothing
                     """,
-                    (
-                        row["analysis_id"],
-                        json.dumps(row["request_payload"], ensure_ascii=False),
-                        json.dumps(row["tool_trace"], ensure_ascii=False),
-                        json.dumps(row["evidence_payload"], ensure_ascii=False),
-                        json.dumps(row["response_payload"], ensure_ascii=False),
-                        None,
-                        None,
-                    ),
+                    [
+                        (
+                            row["analysis_id"],
+                            json.dumps(row["request_payload"], ensure_ascii=False),
+                            json.dumps(row["tool_trace"], ensure_ascii=False),
+                            json.dumps(row["evidence_payload"], ensure_ascii=False),
+                            json.dumps(row["response_payload"], ensure_ascii=False),
+                            row.get("feedback_rating"),
+                            row.get("feedback_comment"),
+                        )
+                        for row in rows
+                    ],
                 )
             conn.commit()
 
@@ -1301,33 +1756,262 @@ class KeywordSentimentScorer(BaseSentimentScorer):
         return _clamp(score, -1.0, 1.0)
 
 
+def _parse_historical_events(payload: Dict[str, Any], top_k: int) -> HistoricalEventsLookup:
+    items = payload.get("results", [])
+    out: List[RagEventItem] = []
+    if isinstance(items, list):
+        for item in items[:top_k]:
+            if isinstance(item, dict):
+                out.append(
+                    RagEventItem(
+                        headline=str(item.get("headline", "")),
+                        similarity=_safe_float(item.get("similarity")),
+                        gold_t1_return=_safe_float(item.get("gold_t1_return")),
+                        gold_t7_return=_safe_float(item.get("gold_t7_return")),
+                    )
+                )
+    return HistoricalEventsLookup(
+        items=out,
+        status=str(payload.get("status", "ok")),
+        degraded_reason=payload.get("degraded_reason"),
+        source_freshness_seconds=payload.get("source_freshness_seconds"),
+    )
+
+
+class UpstreamPoolTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, name: str, *, limits: httpx.Limits, http2: bool = False):
+        super().__init__(limits=limits, http2=http2)
+        self.name = name
+        self._limits = limits
+        self._http2 = http2
+        self._stats: Dict[str, Any] = {"requests": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def _record_wait(self, wait_seconds: float) -> None:
+        wait_ms = wait_seconds * 1000
+        self._stats["wait_ms_total"] += wait_ms
+        self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        outer_trace = request.extensions.get("trace")
+        acquired = False
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired and (
+                event_name == "connection.connect_tcp.started" or event_name.endswith(".send_request_headers.started")
+            ):
+                acquired = True
+                self._record_wait(time.perf_counter() - started)
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": _trace}
+        self._stats["requests"] += 1
+        return await super().handle_async_request(request)
+
+    def metrics(self) -> Dict[str, Any]:
+        connections = list(self._pool.connections)
+        idle = sum(1 for conn in connections if conn.is_idle())
+        requests = self._stats["requests"]
+        return {
+            "http2": self._http2,
+            "max_connections": self._limits.max_connections,
+            "max_keepalive_connections": self._limits.max_keepalive_connections,
+            "active": len(connections) - idle,
+            "idle": idle,
+            "requests": requests,
+            "wait_ms_avg": round(self._stats["wait_ms_total"] / requests, 3) if requests else 0.0,
+            "wait_ms_max": round(self._stats["wait_ms_max"], 3),
+        }
+
+
+def _upstream_origin(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f"{parsed.scheme}://{parsed.host}" + (f":{parsed.port}" if parsed.port else "")
+
+
+def build_upstream_client(
+    cfg: AgentGatewayConfig,
+    *,
+    timeout: httpx.Timeout,
+    max_connections: Dict[str, int],
+    max_keepalive_connections: int,
+    keepalive_expiry_seconds: float,
+    http2: bool = False,
+) -> Tuple[httpx.AsyncClient, Dict[str, UpstreamPoolTransport]]:
+    upstream_urls = {
+        "forecast": [cfg.forecast_url],
+        "memory": [cfg.memory_url],
+        "market": [cfg.market_snapshot_url, cfg.market_indicators_url, cfg.market_history_url],
+        "news": [cfg.recent_news_url],
+    }
+    pools: Dict[str, UpstreamPoolTransport] = {}
+    mounts: Dict[str, httpx.AsyncBaseTransport] = {}
+    for name, urls in upstream_urls.items():
+        for url in urls:
+            origin = _upstream_origin(url)
+            if origin in mounts:
+                continue
+            if name not in pools:
+                size = max(1, max_connections[name])
+                pools[name] = UpstreamPoolTransport(
+                    name,
+                    limits=httpx.Limits(
+                        max_connections=size,
+                        max_keepalive_connections=min(size, max_keepalive_connections),
+                        keepalive_expiry=keepalive_expiry_seconds,
+                    ),
+                    http2=http2,
+                )
+            mounts[origin] = pools[name]
+    return httpx.AsyncClient(timeout=timeout, mounts=mounts, http2=http2), pools
+
+
+# /snapshot/refresh 会触发行情服务的完整 yfinance 拉取，单独熔断并使用更宽的预算，避免拖垮只读的 market 组
+_TOOL_BREAKER_GROUPS: Dict[str, str] = {
+    "market_snapshot": "market",
+    "market_refresh": "market_refresh",
+    "market_indicators": "market",
+    "gold_history": "market",
+    "quant_forecast": "forecast",
+    "recent_news": "news",
+    "historical_events": "memory",
+}
+
+
 class HttpResearchToolbox:
-    def __init__(self, http: httpx.AsyncClient, cfg: AgentGatewayConfig):
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        cfg: AgentGatewayConfig,
+        *,
+        budget_seconds: Optional[Dict[str, float]] = None,
+        breaker_failure_threshold: int = 5,
+        breaker_cooldown_seconds: float = 30.0,
+        hedge_gets: bool = False,
+    ):
         self._http = http
         self._cfg = cfg
+        self._snapshot_refresh: Optional[asyncio.Task] = None
+        budgets = {
+            "market": 8.0,
+            "market_refresh": 40.0,
+            "forecast": 15.0,
+            "news": 8.0,
+            "memory": 5.0,
+            **(budget_seconds or {}),
+        }
+        self._breakers = {
+            tool: ToolCircuitBreaker(
+                tool,
+                budget_seconds=budgets[group],
+                failure_threshold=breaker_failure_threshold,
+                cooldown_seconds=breaker_cooldown_seconds,
+            )
+            for tool, group in _TOOL_BREAKER_GROUPS.items()
+        }
+        self._hedge_gets = hedge_gets
+        self._hedge_stats: Dict[str, int] = {"hedged": 0, "hedge_wins": 0}
 
-    async def get_market_snapshot(self) -> MarketSnapshotResponse:
+    def breaker_states(self) -> Dict[str, Any]:
+        return {
+            **{tool: breaker.snapshot() for tool, breaker in self._breakers.items()},
+            "hedging": {"enabled": self._hedge_gets, **self._hedge_stats},
+        }
+
+    async def _get(self, tool: str, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        delay = self._breakers[tool].p95_seconds() if self._hedge_gets else None
+        if delay is None:
+            resp = await self._http.get(url, params=params)
+            resp.raise_for_status()
+            return resp
+
+        primary = asyncio.create_task(self._http.get(url, params=params))
+        pending = {primary}
+        last_exc: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self._hedge_stats["hedged"] += 1
+                pending.add(asyncio.create_task(self._http.get(url, params=params)))
+            while done or pending:
+                for task in done:
+                    if task.exception() is not None:
+                        last_exc = task.exception()
+                        continue
+                    resp = task.result()
+                    if resp.status_code >= 500 and pending:
+                        last_exc = httpx.HTTPStatusError("hedge_5xx", request=resp.request, response=resp)
+                        continue
+                    if task is not primary:
+                        self._hedge_stats["hedge_wins"] += 1
+                    resp.raise_for_status()
+                    return resp
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            raise last_exc if last_exc is not None else RuntimeError(f"{tool}_hedge_failed")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _refresh_market_snapshot(self) -> MarketSnapshotResponse:
         refresh_url = self._cfg.market_snapshot_url.replace("/latest", "/refresh")
+        resp = await self._http.post(refresh_url, json={})
+        resp.raise_for_status()
+        return MarketSnapshotResponse.model_validate_json(resp.content)
+
+    async def _fetch_latest_snapshot(self) -> MarketSnapshotResponse:
+        resp = await self._get("market_snapshot", self._cfg.market_snapshot_url)
+        return MarketSnapshotResponse.model_validate_json(resp.content)
+
+    async def _coalesced_snapshot_refresh(self) -> MarketSnapshotResponse:
+        task = self._snapshot_refresh
+        if task is None:
+            task = asyncio.create_task(self._refresh_market_snapshot())
+            self._snapshot_refresh = task
+
+            def _clear(done: asyncio.Task) -> None:
+                if self._snapshot_refresh is done:
+                    self._snapshot_refresh = None
+
+            task.add_done_callback(_clear)
+        return await asyncio.shield(task)
+
+    async def get_market_snapshot(self) -> MarketSnapshotResponse:
+        latest: Optional[MarketSnapshotResponse] = None
         try:
-            resp = await self._http.post(refresh_url, json={})
-            resp.raise_for_status()
-            return MarketSnapshotResponse(**resp.json())
+            latest = await self._breakers["market_snapshot"].call(self._fetch_latest_snapshot)
         except Exception:
-            resp = await self._http.get(self._cfg.market_snapshot_url)
-            resp.raise_for_status()
-            return MarketSnapshotResponse(**resp.json())
+            latest = None
+        if latest is not None and latest.freshness_seconds <= self._cfg.snapshot_freshness_budget_seconds:
+            return latest
+        try:
+            return await self._breakers["market_refresh"].call(self._coalesced_snapshot_refresh)
+        except Exception:
+            if latest is None:
+                raise
+            return latest
 
     async def get_market_indicators(self) -> MarketIndicatorsResponse:
-        resp = await self._http.get(self._cfg.market_indicators_url)
-        resp.raise_for_status()
-        return MarketIndicatorsResponse(**resp.json())
+        async def _fetch() -> MarketIndicatorsResponse:
+            resp = await self._get("market_indicators", self._cfg.market_indicators_url)
+            return MarketIndicatorsResponse.model_validate_json(resp.content)
+
+        return await self._breakers["market_indicators"].call(_fetch)
 
     async def get_gold_history(self) -> GoldPriceHistoryResponse:
-        resp = await self._http.get(self._cfg.market_history_url)
-        resp.raise_for_status()
-        return GoldPriceHistoryResponse(**resp.json())
+        async def _fetch() -> GoldPriceHistoryResponse:
+            resp = await self._get("gold_history", self._cfg.market_history_url)
+            return GoldPriceHistoryResponse.model_validate_json(resp.content)
+
+        return await self._breakers["gold_history"].call(_fetch)
 
     async def get_quant_forecast(self, horizon: PublicHorizon) -> Dict[str, Any]:
+        return await self._breakers["quant_forecast"].call(lambda: self._fetch_quant_forecast(horizon))
+
+    async def _fetch_quant_forecast(self, horizon: PublicHorizon) -> Dict[str, Any]:
         mapped = _public_to_internal_horizon(horizon)
         payload = {
             "asset_symbol": "XAUUSD",
@@ -1339,6 +2023,9 @@ class HttpResearchToolbox:
         return resp.json()
 
     async def get_quant_forecasts(self, horizons: List[PublicHorizon]) -> Dict[PublicHorizon, Dict[str, Any]]:
+        return await self._breakers["quant_forecast"].call(lambda: self._fetch_quant_forecasts(horizons))
+
+    async def _fetch_quant_forecasts(self, horizons: List[PublicHorizon]) -> Dict[PublicHorizon, Dict[str, Any]]:
         batch_url = (
             self._cfg.forecast_url.replace("/api/v1/forecast", "/api/v1/forecast/batch")
             if "/api/v1/forecast" in self._cfg.forecast_url
@@ -1352,7 +2039,7 @@ class HttpResearchToolbox:
         }
         resp = await self._http.post(batch_url, json=payload)
         if resp.status_code in {404, 405}:
-            return {horizon: await self.get_quant_forecast(horizon) for horizon in horizons}
+            return {horizon: await self._fetch_quant_forecast(horizon) for horizon in horizons}
         resp.raise_for_status()
         data = resp.json()
         forecasts = data.get("forecasts", {})
@@ -1363,11 +2050,13 @@ class HttpResearchToolbox:
         }
 
     async def search_recent_news(self, query: str, limit: int = 6) -> RecentNewsResponse:
+        return await self._breakers["recent_news"].call(lambda: self._fetch_recent_news(query, limit))
+
+    async def _fetch_recent_news(self, query: str, limit: int) -> RecentNewsResponse:
         cached: Optional[RecentNewsResponse] = None
         try:
-            resp = await self._http.get(self._cfg.recent_news_url, params={"limit": limit, "q": query})
-            resp.raise_for_status()
-            cached = RecentNewsResponse(**resp.json())
+            resp = await self._get("recent_news", self._cfg.recent_news_url, params={"limit": limit, "q": query})
+            cached = RecentNewsResponse.model_validate_json(resp.content)
             if cached.items and cached.freshness_seconds <= self._cfg.news_stale_after_seconds:
                 return cached
         except Exception:
@@ -1379,37 +2068,35 @@ class HttpResearchToolbox:
             refresh.raise_for_status()
             resp = await self._http.get(self._cfg.recent_news_url, params={"limit": limit, "q": query})
             resp.raise_for_status()
-            return RecentNewsResponse(**resp.json())
+            return RecentNewsResponse.model_validate_json(resp.content)
         except Exception:
             if cached is not None:
                 return cached
             resp = await self._http.get(self._cfg.recent_news_url, params={"limit": limit, "q": query})
             resp.raise_for_status()
-            return RecentNewsResponse(**resp.json())
+            return RecentNewsResponse.model_validate_json(resp.content)
 
     async def retrieve_historical_events(self, text: str, top_k: int = 3) -> HistoricalEventsLookup:
+        return await self._breakers["historical_events"].call(lambda: self._fetch_historical_events(text, top_k))
+
+    async def _fetch_historical_events(self, text: str, top_k: int) -> HistoricalEventsLookup:
         resp = await self._http.post(self._cfg.memory_url, json={"current_event_text": text, "top_k": top_k})
         resp.raise_for_status()
-        payload = resp.json()
-        items = payload.get("results", [])
-        out: List[RagEventItem] = []
-        if isinstance(items, list):
-            for item in items[:top_k]:
-                if isinstance(item, dict):
-                    out.append(
-                        RagEventItem(
-                            headline=str(item.get("headline", "")),
-                            similarity=_safe_float(item.get("similarity")),
-                            gold_t1_return=_safe_float(item.get("gold_t1_return")),
-                            gold_t7_return=_safe_float(item.get("gold_t7_return")),
-                            )
-                        )
-        return HistoricalEventsLookup(
-            items=out,
-            status=str(payload.get("status", "ok")),
-            degraded_reason=payload.get("degraded_reason"),
-            source_freshness_seconds=payload.get("source_freshness_seconds"),
-        )
+        return _parse_historical_events(resp.json(), top_k)
+
+    async def retrieve_historical_events_batch(self, texts: List[str], top_k: int = 3) -> List[HistoricalEventsLookup]:
+        return await self._breakers["historical_events"].call(lambda: self._fetch_historical_events_batch(texts, top_k))
+
+    async def _fetch_historical_events_batch(self, texts: List[str], top_k: int) -> List[HistoricalEventsLookup]:
+        batch_url = f"{self._cfg.memory_url.rstrip('/')}/batch"
+        resp = await self._http.post(batch_url, json={"current_event_texts": texts, "top_k": top_k})
+        if resp.status_code in {404, 405}:
+            return list(await asyncio.gather(*[self._fetch_historical_events(text, top_k) for text in texts]))
+        resp.raise_for_status()
+        items = resp.json().get("items", [])
+        if not isinstance(items, list) or len(items) != len(texts):
+            raise RuntimeError("memory_batch_size_mismatch")
+        return [_parse_historical_events(item, top_k) for item in items]
 
     def get_macro_context(self, snapshot: MarketSnapshotResponse, news: RecentNewsResponse) -> Dict[str, Any]:
         divergence = snapshot.feature_summary.gold_usd_divergence
@@ -1451,10 +2138,52 @@ class HttpResearchToolbox:
         return _risk_profile_dict(profile)
 
 
+_NARRATIVE_VOLATILE_KEYS = frozenset({"freshness_seconds", "source_freshness_seconds"})
+
+
+def _narrative_cache_key(model: str, prompt_payload: Dict[str, Any]) -> str:
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: _normalize(item) for key, item in value.items() if key not in _NARRATIVE_VOLATILE_KEYS}
+        if isinstance(value, list):
+            return [_normalize(item) for item in value]
+        return value
+
+    canonical = json.dumps(
+        {"model": model, "prompt": _normalize(prompt_payload)},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 class OpenAINarrator:
-    def __init__(self, cfg: AgentGatewayConfig):
+    def __init__(
+        self,
+        cfg: AgentGatewayConfig,
+        *,
+        client: Any = None,
+        cache_ttl_seconds: float = 300.0,
+        cache_max_items: int = 256,
+    ):
         self._cfg = cfg
-        self._client = AsyncOpenAI() if AsyncOpenAI is not None and os.environ.get("OPENAI_API_KEY") else None
+        if client is None and AsyncOpenAI is not None and os.environ.get("OPENAI_API_KEY"):
+            client = AsyncOpenAI()
+        self._client = client
+        self._cache_ttl_seconds = max(0.0, float(cache_ttl_seconds))
+        self._cache_max_items = max(1, int(cache_max_items))
+        self._cache: "OrderedDict[str, Tuple[float, NarrativeOutput]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "size": len(self._cache), "inflight": len(self._inflight)}
+
+    def _cache_ttl(self, bundle: AnalysisBundle) -> float:
+        snapshot = bundle.snapshot
+        return min(self._cache_ttl_seconds, max(0, snapshot.stale_after_seconds - snapshot.freshness_seconds))
 
     async def narrate(self, bundle: AnalysisBundle, draft: NarrativeOutput) -> NarrativeOutput:
         if self._client is None:
@@ -1473,6 +2202,32 @@ class OpenAINarrator:
             "risk_gate": bundle.risk_gate,
             "draft": draft.model_dump(),
         }
+        key = _narrative_cache_key(model, prompt_payload)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            self._stats["hits"] += 1
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats["misses"] += 1
+            task = asyncio.create_task(self._complete(key, model, prompt_payload, self._cache_ttl(bundle)))
+            self._inflight[key] = task
+
+            def _clear(done: asyncio.Task) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(_clear)
+        else:
+            self._stats["coalesced"] += 1
+        narrative = await asyncio.shield(task)
+        return narrative if narrative is not None else draft
+
+    async def _complete(
+        self, key: str, model: str, prompt_payload: Dict[str, Any], ttl_seconds: float
+    ) -> Optional[NarrativeOutput]:
         schema = NarrativeOutput.model_json_schema()
         try:
             response = await self._client.responses.create(
@@ -1506,10 +2261,16 @@ class OpenAINarrator:
             )
             output_text = getattr(response, "output_text", "")
             if not output_text:
-                return draft
-            return NarrativeOutput(**json.loads(output_text))
+                return None
+            narrative = NarrativeOutput(**json.loads(output_text))
         except Exception:
-            return draft
+            return None
+        if ttl_seconds > 0:
+            self._cache.pop(key, None)
+            self._cache[key] = (time.monotonic() + ttl_seconds, narrative)
+            while len(self._cache) > self._cache_max_items:
+                self._cache.popitem(last=False)
+        return narrative
 
 
 class AgentAnalysisService:
@@ -1535,11 +2296,248 @@ class AgentAnalysisService:
         t0 = datetime.now(timezone.utc)
         evidence_query = _evidence_query(req)
         news_query = _news_search_query(req)
-        snapshot, forecast_map, news, memory_lookup, tool_trace = await self._gather(
+        gathered = await self._gather(
             req,
             evidence_query=evidence_query,
             news_query=news_query,
         )
+        prepared = self._prepare_analysis(req, evidence_query, *gathered)
+        narrative = await self._narrator.narrate(prepared.bundle, prepared.draft)
+        elapsed_ms = int((datetime.now(timezone.utc) - t0).total_seconds() * 1000)
+        return await self._finalize_analysis(req, prepared, narrative, elapsed_ms=elapsed_ms)
+
+    async def analyze_stream(self, req: AgentAnalyzeRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        t0 = datetime.now(timezone.utc)
+
+        def _elapsed_ms() -> int:
+            return int((datetime.now(timezone.utc) - t0).total_seconds() * 1000)
+
+        evidence_query = _evidence_query(req)
+        news_query = _news_search_query(req)
+        resolved: asyncio.Queue = asyncio.Queue()
+
+        async def _run_gather() -> None:
+            try:
+                result = await self._gather(
+                    req,
+                    evidence_query=evidence_query,
+                    news_query=news_query,
+                    on_resolved=lambda name, payload: resolved.put_nowait((name, payload)),
+                )
+            except Exception as exc:
+                resolved.put_nowait((None, exc))
+            else:
+                resolved.put_nowait((None, result))
+
+        gather_task = asyncio.create_task(_run_gather())
+        try:
+            snapshot: Optional[MarketSnapshotResponse] = None
+            forecast_map: Optional[Dict[PublicHorizon, Dict[str, Any]]] = None
+            while True:
+                name, payload = await resolved.get()
+                if name is None:
+                    break
+                if name == "quant_forecasts":
+                    forecast_map, traces = payload
+                else:
+                    traces = [payload[1]]
+                    if name == "get_market_snapshot":
+                        snapshot = payload[0]
+                for trace in traces:
+                    yield "tool", {
+                        "tool": trace["tool"],
+                        "status": trace["status"],
+                        "elapsed_ms": int(trace["elapsed_ms"]),
+                    }
+                if name in {"get_market_snapshot", "quant_forecasts"} and snapshot is not None and forecast_map is not None:
+                    yield "forecast_cards", {
+                        "horizon_forecasts": [
+                            self._build_stable_horizon_forecast_card(
+                                horizon=horizon,
+                                forecast=forecast_map[horizon],
+                                snapshot=snapshot,
+                            ).model_dump(mode="json")
+                            for horizon in ("24h", "7d", "30d")
+                        ]
+                    }
+            if isinstance(payload, Exception):
+                raise payload
+            yield "timing", {"phase": "tools", "elapsed_ms": _elapsed_ms()}
+
+            prepared = self._prepare_analysis(req, evidence_query, *payload)
+            yield "summary", {
+                "summary_card": prepared.draft.summary_card.model_dump(mode="json"),
+                "risk_banner": prepared.draft.risk_banner.model_dump(mode="json"),
+                "is_draft": True,
+            }
+            yield "evidence", {
+                "evidence_cards": [card.model_dump(mode="json") for card in prepared.evidence_cards],
+                "citations": [citation.model_dump(mode="json") for citation in prepared.citations],
+                "recent_news": [item.model_dump(mode="json") for item in prepared.bundle.news.items[:6]],
+                "degradation_flags": prepared.bundle.degradation_flags,
+            }
+            yield "timing", {"phase": "evidence", "elapsed_ms": _elapsed_ms()}
+
+            narrative = await self._narrator.narrate(prepared.bundle, prepared.draft)
+            yield "narrative", narrative.model_dump(mode="json")
+            yield "timing", {"phase": "narrative", "elapsed_ms": _elapsed_ms()}
+
+            computation = await self._finalize_analysis(req, prepared, narrative, elapsed_ms=_elapsed_ms())
+            yield "timing", {"phase": "persist", "elapsed_ms": _elapsed_ms()}
+            yield "complete", computation.response.model_dump(mode="json")
+        finally:
+            if not gather_task.done():
+                gather_task.cancel()
+
+    async def analyze_batch(self, reqs: List[AgentAnalyzeRequest], *, concurrency: int = 8) -> AgentAnalyzeBatchResponse:
+        t0 = time.perf_counter()
+
+        def _elapsed_ms(since: float) -> int:
+            return int((time.perf_counter() - since) * 1000)
+
+        evidence_queries = [_evidence_query(req) for req in reqs]
+        # 新闻检索与单条 /analyze 使用同一查询；相同查询只检索一次，失败时按首个条目的证据查询回退
+        news_queries = [_news_search_query(req) for req in reqs]
+        unique_news_queries: Dict[str, str] = {}
+        for query, evidence_query in zip(news_queries, evidence_queries):
+            unique_news_queries.setdefault(query, evidence_query)
+
+        def _search_news(query: str, fallback_query: str):
+            return self._timed_optional_tool(
+                "search_recent_news",
+                self._toolbox.search_recent_news(query, limit=6),
+                lambda exc: _fallback_recent_news(fallback_query),
+            )
+
+        try:
+            timed_snapshot, timed_forecasts, timed_news_list, memory_lookups = await asyncio.gather(
+                self._timed_tool("get_market_snapshot", self._toolbox.get_market_snapshot()),
+                self._gather_quant_forecasts(("24h", "7d", "30d")),
+                asyncio.gather(*(_search_news(query, fallback) for query, fallback in unique_news_queries.items())),
+                self._gather_memory_batch(evidence_queries),
+            )
+        except Exception as exc:
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "error_code": "upstream_unavailable",
+                    "message": f"Upstream tool failed: {type(exc).__name__}: {exc}",
+                },
+            ) from exc
+        snapshot = timed_snapshot[0]
+        timed_news = dict(zip(unique_news_queries, timed_news_list))
+        forecast_map, forecast_trace = timed_forecasts
+        shared_trace = [timed_snapshot[1], *forecast_trace]
+        shared_ms = _elapsed_ms(t0)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _run_item(index: int) -> AgentAnalyzeBatchItem:
+            req = reqs[index]
+            memory_lookup, memory_trace = memory_lookups[index]
+            news, news_trace = timed_news[news_queries[index]]
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    prepared = self._prepare_analysis(
+                        req,
+                        evidence_queries[index],
+                        snapshot,
+                        forecast_map,
+                        news,
+                        _normalize_memory_lookup(memory_lookup),
+                        [*shared_trace, news_trace, memory_trace],
+                    )
+                    prepare_ms = _elapsed_ms(started)
+                    narrative_started = time.perf_counter()
+                    narrative = await self._narrator.narrate(prepared.bundle, prepared.draft)
+                    computation = await self._finalize_analysis(
+                        req,
+                        prepared,
+                        narrative,
+                        elapsed_ms=shared_ms + _elapsed_ms(started),
+                        timing_ms={
+                            "shared_tools": shared_ms,
+                            "memory": int(memory_trace["elapsed_ms"]),
+                            "prepare": prepare_ms,
+                            "narrative": _elapsed_ms(narrative_started),
+                        },
+                    )
+                except HTTPException as exc:
+                    return AgentAnalyzeBatchItem(index=index, error=exc.detail)
+                except Exception as exc:
+                    LOGGER.warning(
+                        "agent_batch_item_failed index=%s error=%s",
+                        index,
+                        f"{type(exc).__name__}:{exc}",
+                    )
+                    return AgentAnalyzeBatchItem(
+                        index=index,
+                        error={
+                            "error_code": "analysis_failed",
+                            "message": f"Analysis failed: {type(exc).__name__}: {exc}",
+                        },
+                    )
+            return AgentAnalyzeBatchItem(index=index, response=computation.response)
+
+        items = await asyncio.gather(*[_run_item(index) for index in range(len(reqs))])
+        return AgentAnalyzeBatchResponse(
+            items=list(items),
+            tool_trace=[*shared_trace, *(trace for _, trace in timed_news.values())],
+            timing_ms={"shared_tools": shared_ms, "total": _elapsed_ms(t0)},
+        )
+
+    async def _gather_memory_batch(
+        self, evidence_queries: List[str]
+    ) -> List[Tuple[HistoricalEventsLookup, Dict[str, Any]]]:
+        def _fallback(exc: Exception) -> HistoricalEventsLookup:
+            return HistoricalEventsLookup(
+                items=[],
+                status="degraded",
+                degraded_reason=f"memory_lookup_failed:{type(exc).__name__}:{exc}",
+                source_freshness_seconds=None,
+            )
+
+        batch_method = getattr(self._toolbox, "retrieve_historical_events_batch", None)
+        if not callable(batch_method):
+            return list(
+                await asyncio.gather(
+                    *[
+                        self._timed_optional_tool(
+                            "retrieve_historical_events",
+                            self._toolbox.retrieve_historical_events(query, top_k=3),
+                            _fallback,
+                        )
+                        for query in evidence_queries
+                    ]
+                )
+            )
+
+        started = datetime.now(timezone.utc)
+        try:
+            lookups = await batch_method(evidence_queries, top_k=3)
+            status, error = "ok", None
+        except Exception as exc:
+            lookups = [_fallback(exc) for _ in evidence_queries]
+            status, error = "fallback", f"{type(exc).__name__}:{exc}"
+        elapsed_ms = int((datetime.now(timezone.utc) - started).total_seconds() * 1000)
+        out: List[Tuple[HistoricalEventsLookup, Dict[str, Any]]] = []
+        for lookup in lookups:
+            trace = self._tool_trace_entry("retrieve_historical_events", lookup, elapsed_ms=elapsed_ms, status=status, error=error)
+            if status == "ok":
+                trace["status"] = "degraded" if trace["degraded"] else "ok"
+            out.append((lookup, trace))
+        return out
+
+    def _prepare_analysis(
+        self,
+        req: AgentAnalyzeRequest,
+        evidence_query: str,
+        snapshot: MarketSnapshotResponse,
+        forecast_map: Dict[PublicHorizon, Dict[str, Any]],
+        news: RecentNewsResponse,
+        memory_lookup: HistoricalEventsLookup,
+        tool_trace: List[Dict[str, Any]],
+    ) -> PreparedAnalysis:
         rag_events = memory_lookup.items
         news_sentiment = self._derive_news_sentiment(req, news)
         risk_profile = self._toolbox.get_user_risk_profile(req.risk_profile)
@@ -1623,8 +2621,32 @@ class AgentAnalysisService:
                 },
             )
 
-        draft = self._build_draft_narrative(req, bundle)
-        narrative = await self._narrator.narrate(bundle, draft)
+        return PreparedAnalysis(
+            evidence_query=evidence_query,
+            bundle=bundle,
+            horizon_forecasts=horizon_forecasts,
+            evidence_cards=evidence_cards,
+            citations=citations,
+            draft=self._build_draft_narrative(req, bundle),
+        )
+
+    async def _finalize_analysis(
+        self,
+        req: AgentAnalyzeRequest,
+        prepared: PreparedAnalysis,
+        narrative: NarrativeOutput,
+        *,
+        elapsed_ms: int,
+        timing_ms: Optional[Dict[str, int]] = None,
+    ) -> AnalysisComputation:
+        bundle = prepared.bundle
+        evidence_query = prepared.evidence_query
+        horizon_forecasts = prepared.horizon_forecasts
+        evidence_cards = prepared.evidence_cards
+        citations = prepared.citations
+        news = bundle.news
+        degradation_flags = bundle.degradation_flags
+        tool_trace = bundle.tool_trace
         if not evidence_cards:
             raise HTTPException(
                 status_code=503,
@@ -1634,7 +2656,6 @@ class AgentAnalysisService:
                 },
             )
 
-        elapsed_ms = int((datetime.now(timezone.utc) - t0).total_seconds() * 1000)
         analysis_id = str(uuid.uuid4())
         response_model = AgentAnalyzeResponse(
             analysis_id=analysis_id,
@@ -1646,7 +2667,7 @@ class AgentAnalysisService:
             risk_banner=narrative.risk_banner,
             degradation_flags=degradation_flags,
             follow_up_questions=narrative.follow_up_questions,
-            timing_ms={"total": elapsed_ms},
+            timing_ms={**(timing_ms or {}), "total": elapsed_ms},
         )
         try:
             await self._trace_store.persist_analysis(
@@ -1939,25 +2960,42 @@ class AgentAnalysisService:
         return forecast_map, traces
 
     async def _gather(
-        self, req: AgentAnalyzeRequest, *, evidence_query: str, news_query: str
+        self,
+        req: AgentAnalyzeRequest,
+        *,
+        evidence_query: str,
+        news_query: str,
+        on_resolved: Optional[Callable[[str, Any], None]] = None,
     ) -> Tuple[MarketSnapshotResponse, Dict[PublicHorizon, Dict[str, Any]], RecentNewsResponse, HistoricalEventsLookup, List[Dict[str, Any]]]:
+        async def _notify(name: str, awaitable):
+            result = await awaitable
+            if on_resolved is not None:
+                on_resolved(name, result)
+            return result
+
         try:
             timed_snapshot, timed_forecasts, timed_news, timed_rag = await asyncio.gather(
-                self._timed_tool("get_market_snapshot", self._toolbox.get_market_snapshot()),
-                self._gather_quant_forecasts(("24h", "7d", "30d")),
-                self._timed_optional_tool(
+                _notify("get_market_snapshot", self._timed_tool("get_market_snapshot", self._toolbox.get_market_snapshot())),
+                _notify("quant_forecasts", self._gather_quant_forecasts(("24h", "7d", "30d"))),
+                _notify(
                     "search_recent_news",
-                    self._toolbox.search_recent_news(news_query, limit=6),
-                    lambda exc: _fallback_recent_news(evidence_query),
+                    self._timed_optional_tool(
+                        "search_recent_news",
+                        self._toolbox.search_recent_news(news_query, limit=6),
+                        lambda exc: _fallback_recent_news(evidence_query),
+                    ),
                 ),
-                self._timed_optional_tool(
+                _notify(
                     "retrieve_historical_events",
-                    self._toolbox.retrieve_historical_events(evidence_query, top_k=3),
-                    lambda exc: HistoricalEventsLookup(
-                        items=[],
-                        status="degraded",
-                        degraded_reason=f"memory_lookup_failed:{type(exc).__name__}:{exc}",
-                        source_freshness_seconds=None,
+                    self._timed_optional_tool(
+                        "retrieve_historical_events",
+                        self._toolbox.retrieve_historical_events(evidence_query, top_k=3),
+                        lambda exc: HistoricalEventsLookup(
+                            items=[],
+                            status="degraded",
+                            degraded_reason=f"memory_lookup_failed:{type(exc).__name__}:{exc}",
+                            source_freshness_seconds=None,
+                        ),
                     ),
                 ),
             )
@@ -2703,6 +3741,10 @@ def _legacy_risk_result(resp: AgentAnalyzeResponse, vix_value: Optional[float],
     }
 
 
+def _sse_event(event: str, payload: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
 def _health_url(service_url: str) -> str:
     base = service_url.split("/api/", 1)[0].rstrip("/")
     return f"{base}/health/ready"
@@ -2718,6 +3760,16 @@ def create_app(
 ) -> FastAPI:
     tool_timeout_seconds = float(_env("AGENT_TOOL_TIMEOUT_SECONDS", "35.0"))
     tool_connect_timeout_seconds = float(_env("AGENT_TOOL_CONNECT_TIMEOUT_SECONDS", "1.5"))
+    tool_budget_seconds = {
+        "market": float(_env("AGENT_TOOL_BUDGET_SECONDS_MARKET", "8.0")),
+        "market_refresh": float(_env("AGENT_TOOL_BUDGET_SECONDS_MARKET_REFRESH", "40.0")),
+        "forecast": float(_env("AGENT_TOOL_BUDGET_SECONDS_FORECAST", "15.0")),
+        "news": float(_env("AGENT_TOOL_BUDGET_SECONDS_NEWS", "8.0")),
+        "memory": float(_env("AGENT_TOOL_BUDGET_SECONDS_MEMORY", "5.0")),
+    }
+    breaker_failure_threshold = int(_env("AGENT_BREAKER_FAILURE_THRESHOLD", "5"))
+    breaker_cooldown_seconds = float(_env("AGENT_BREAKER_COOLDOWN_SECONDS", "30"))
+    hedge_gets = _env("AGENT_TOOL_HEDGE_GETS", "0") != "0"
     app_env = _env("APP_ENV", "development").lower()
     cfg = AgentGatewayConfig(
         forecast_url=_env("FORECAST_URL", "http://localhost:8010/api/v1/forecast"),
@@ -2731,6 +3783,7 @@ def create_app(
         vix_circuit_breaker_threshold=float(_env("VIX_CIRCUIT_BREAKER_THRESHOLD", "30")),
         stale_after_seconds=int(_env("MARKET_STALE_AFTER_SECONDS", "180")),
         news_stale_after_seconds=int(_env("NEWS_STALE_AFTER_SECONDS", "300")),
+        snapshot_freshness_budget_seconds=int(_env("AGENT_SNAPSHOT_FRESHNESS_BUDGET_SECONDS", "60")),
     )
     database_url = _env("DATABASE_URL", "postgresql://localhost/postgres")
     public_keys_raw = os.environ.get("AGENT_PUBLIC_API_KEYS")
@@ -2745,37 +3798,99 @@ def create_app(
         raise RuntimeError("Default development API keys are not allowed outside development.")
     analyze_rate_limit_per_minute = int(_env("AGENT_ANALYZE_RATE_LIMIT_PER_MINUTE", "60"))
     analyze_rate_limit_window_seconds = int(_env("AGENT_ANALYZE_RATE_LIMIT_WINDOW_SECONDS", "60"))
+    rate_limit_redis_url = os.environ.get("AGENT_RATE_LIMIT_REDIS_URL", "").strip()
     allow_trace_memory_fallback = (
         os.environ.get("AGENT_ALLOW_TRACE_MEMORY_FALLBACK", "1" if app_env == "development" else "0") != "0"
     )
     trace_memory_ttl_seconds = int(_env("AGENT_TRACE_MEMORY_TTL_SECONDS", "3600"))
     trace_memory_max_items = int(_env("AGENT_TRACE_MEMORY_MAX_ITEMS", "200"))
+    trace_memory_max_bytes = int(_env("AGENT_TRACE_MEMORY_MAX_BYTES", "0"))
+    trace_write_behind = _env("AGENT_TRACE_WRITE_BEHIND", "0") != "0"
+    trace_flush_interval_ms = int(_env("AGENT_TRACE_FLUSH_INTERVAL_MS", "200"))
+    trace_flush_max_rows = int(_env("AGENT_TRACE_FLUSH_MAX_ROWS", "100"))
+    trace_queue_max_items = int(_env("AGENT_TRACE_QUEUE_MAX_ITEMS", "2000"))
+    trace_enqueue_timeout_seconds = float(_env("AGENT_TRACE_ENQUEUE_TIMEOUT_SECONDS", "2.0"))
+    trace_flush_max_attempts = int(_env("AGENT_TRACE_FLUSH_MAX_ATTEMPTS", "3"))
+    current_view_cache_ttl_seconds = float(_env("AGENT_CURRENT_VIEW_CACHE_TTL_SECONDS", "60"))
+    current_view_stale_grace_seconds = float(_env("AGENT_CURRENT_VIEW_STALE_GRACE_SECONDS", "120"))
+    ready_probe_timeout_seconds = float(_env("AGENT_READY_PROBE_TIMEOUT_SECONDS", "2.0"))
+    ready_probe_cache_seconds = float(_env("AGENT_READY_PROBE_CACHE_SECONDS", "5"))
+    upstream_pool_timeout_seconds = float(_env("AGENT_UPSTREAM_POOL_TIMEOUT_SECONDS", "2.0"))
+    upstream_default_max_connections = _env("AGENT_UPSTREAM_MAX_CONNECTIONS", "20")
+    upstream_max_connections = {
+        name: int(_env(f"AGENT_UPSTREAM_MAX_CONNECTIONS_{name.upper()}", upstream_default_max_connections))
+        for name in ("forecast", "memory", "market", "news")
+    }
+    upstream_max_keepalive_connections = int(_env("AGENT_UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    upstream_keepalive_expiry_seconds = float(_env("AGENT_UPSTREAM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    upstream_http2 = _env("AGENT_UPSTREAM_HTTP2", "0") != "0"
+    narrative_cache_ttl_seconds = float(_env("AGENT_NARRATIVE_CACHE_TTL_SECONDS", "300"))
+    narrative_cache_max_items = int(_env("AGENT_NARRATIVE_CACHE_MAX_ITEMS", "256"))
+    analyze_batch_concurrency = int(_env("AGENT_ANALYZE_BATCH_CONCURRENCY", "8"))
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         own_http = http_client is None
-        http = http_client or httpx.AsyncClient(
-            timeout=httpx.Timeout(tool_timeout_seconds, connect=tool_connect_timeout_seconds)
-        )
+        app.state.upstream_pools = {}
+        http = http_client
+        if http is None:
+            http, app.state.upstream_pools = build_upstream_client(
+                cfg,
+                timeout=httpx.Timeout(
+                    tool_timeout_seconds,
+                    connect=tool_connect_timeout_seconds,
+                    pool=upstream_pool_timeout_seconds,
+                ),
+                max_connections=upstream_max_connections,
+                max_keepalive_connections=upstream_max_keepalive_connections,
+                keepalive_expiry_seconds=upstream_keepalive_expiry_seconds,
+                http2=upstream_http2,
+            )
         app.state.http = http
         app.state.cfg = cfg
         app.state.uses_injected_toolbox = toolbox is not None
-        app.state.toolbox = toolbox or HttpResearchToolbox(http, cfg)
-        app.state.narrator = narrator or OpenAINarrator(cfg)
+        app.state.toolbox = toolbox or HttpResearchToolbox(
+            http,
+            cfg,
+            budget_seconds=tool_budget_seconds,
+            breaker_failure_threshold=breaker_failure_threshold,
+            breaker_cooldown_seconds=breaker_cooldown_seconds,
+            hedge_gets=hedge_gets,
+        )
+        app.state.narrator = narrator or OpenAINarrator(
+            cfg,
+            cache_ttl_seconds=narrative_cache_ttl_seconds,
+            cache_max_items=narrative_cache_max_items,
+        )
         app.state.sentiment_scorer = sentiment_scorer or KeywordSentimentScorer()
         app.state.authorizer = ApiKeyAuthorizer(public_keys=public_api_keys, internal_keys=internal_api_keys)
-        app.state.rate_limiter = SlidingWindowRateLimiter(
+        rate_limit_redis = redis_asyncio.Redis.from_url(rate_limit_redis_url) if rate_limit_redis_url else None
+        app.state.rate_limiter = GcraRateLimiter(
             limit=analyze_rate_limit_per_minute,
             window_seconds=analyze_rate_limit_window_seconds,
+            redis_client=rate_limit_redis,
         )
         app.state.trace_store = trace_store or AgentTraceStore(
             database_url,
             allow_memory_fallback=allow_trace_memory_fallback,
             memory_ttl_seconds=trace_memory_ttl_seconds,
             memory_max_items=trace_memory_max_items,
+            memory_max_bytes=trace_memory_max_bytes,
+            write_behind=trace_write_behind,
+            flush_interval_ms=trace_flush_interval_ms,
+            flush_max_rows=trace_flush_max_rows,
+            queue_max_items=trace_queue_max_items,
+            enqueue_timeout_seconds=trace_enqueue_timeout_seconds,
+            flush_max_attempts=trace_flush_max_attempts,
         )
         if hasattr(app.state.trace_store, "startup"):
             await app.state.trace_store.startup()
+        app.state.current_view_cache = CurrentViewCache(
+            ttl_seconds=current_view_cache_ttl_seconds,
+            stale_grace_seconds=current_view_stale_grace_seconds,
+        )
+        app.state.ready_probe_lock = asyncio.Lock()
+        app.state.ready_probe_result = None
         app.state.analysis_service = AgentAnalysisService(
             toolbox=app.state.toolbox,
             narrator=app.state.narrator,
@@ -2784,10 +3899,19 @@ def create_app(
             cfg=cfg,
         )
         yield
+        if hasattr(app.state.trace_store, "shutdown"):
+            await app.state.trace_store.shutdown()
+        if rate_limit_redis is not None:
+            await rate_limit_redis.aclose()
         if own_http:
             await http.aclose()
 
-    app = FastAPI(title="GoldenSense Agent Gateway", version="2.0.0", lifespan=lifespan)
+    app = FastAPI(
+        title="GoldenSense Agent Gateway",
+        version="2.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
     allow_origins = [
         origin.strip()
         for origin in _env(
@@ -2812,12 +3936,45 @@ def create_app(
             "mode": "educational-retail-agent",
             "auth": "api-key",
             "trace_store": trace_health,
+            "current_view_cache": app.state.current_view_cache.metrics(),
+            "rate_limiter": app.state.rate_limiter.metrics(),
+            "upstream_pools": {name: pool.metrics() for name, pool in app.state.upstream_pools.items()},
+            "narrative_cache": app.state.narrator.metrics() if hasattr(app.state.narrator, "metrics") else {},
         }
 
     @app.get("/health/live")
     async def health_live() -> Dict[str, str]:
         return {"status": "ok", "service": "agent_gateway"}
 
+    async def _probe_target(name: str, url: str) -> Dict[str, Any]:
+        http: httpx.AsyncClient = app.state.http
+        try:
+            resp = await http.get(url, timeout=ready_probe_timeout_seconds)
+        except Exception as exc:
+            return {"status": "unavailable", "error": f"{type(exc).__name__}:{exc}"}
+        return {"status_code": resp.status_code, "status": "ok" if resp.status_code < 400 else "unavailable"}
+
+    async def _probe_downstream() -> Dict[str, Any]:
+        cached = app.state.ready_probe_result
+        if cached is not None and time.monotonic() - cached[0] < ready_probe_cache_seconds:
+            return cached[1]
+        async with app.state.ready_probe_lock:
+            cached = app.state.ready_probe_result
+            if cached is not None and time.monotonic() - cached[0] < ready_probe_cache_seconds:
+                return cached[1]
+            health_targets = {
+                "forecast": _health_url(cfg.forecast_url),
+                "memory": _health_url(cfg.memory_url),
+                "market": _health_url(cfg.market_snapshot_url),
+                "indicators": _health_url(cfg.market_indicators_url),
+                "history": _health_url(cfg.market_history_url),
+                "news": _health_url(cfg.recent_news_url),
+            }
+            results = await asyncio.gather(*(_probe_target(name, url) for name, url in health_targets.items()))
+            downstream = dict(zip(health_targets, results))
+            app.state.ready_probe_result = (time.monotonic(), downstream)
+            return downstream
+
     @app.get("/health/ready")
     async def health_ready() -> Response:
         trace_health = app.state.trace_store.health() if hasattr(app.state.trace_store, "health") else {}
@@ -2829,28 +3986,8 @@ def create_app(
         if getattr(app.state, "uses_injected_toolbox", False):
             downstream["toolbox"] = {"status": "skipped", "reason": "injected_toolbox"}
         else:
-            http: httpx.AsyncClient = app.state.http
-            health_targets = {
-                "forecast": _health_url(cfg.forecast_url),
-                "memory": _health_url(cfg.memory_url),
-                "market": _health_url(cfg.market_snapshot_url),
-                "indicators": _health_url(cfg.market_indicators_url),
-                "history": _health_url(cfg.market_history_url),
-                "news": _health_url(cfg.recent_news_url),
-            }
-            for name, url in health_targets.items():
-                try:
-                    resp = await http.get(url)
-                    ok = resp.status_code < 400
-                    downstream[name] = {
-                        "status_code": resp.status_code,
-                        "status": "ok" if ok else "unavailable",
-                    }
-                    if not ok:
-                        errors.append(f"{name}_unavailable")
-                except Exception as exc:
-                    downstream[name] = {"status": "unavailable", "error": f"{type(exc).__name__}:{exc}"}
-                    errors.append(f"{name}_unavailable")
+            downstream = await _probe_downstream()
+            errors.extend(f"{name}_unavailable" for name, item in downstream.items() if item["status"] != "ok")
 
         status = "ok" if not errors else "unavailable"
         return JSONResponse(
@@ -2859,30 +3996,65 @@ def create_app(
                 "status": status,
                 "trace_store": trace_health,
                 "downstream": downstream,
+                "circuit_breakers": (
+                    app.state.toolbox.breaker_states() if hasattr(app.state.toolbox, "breaker_states") else {}
+                ),
                 "errors": errors,
             },
         )
 
     @app.post("/api/v1/agent/analyze", response_model=AgentAnalyzeResponse)
-    async def analyze(req: AgentAnalyzeRequest, request: Request) -> AgentAnalyzeResponse:
+    async def analyze(req: AgentAnalyzeRequest, request: Request) -> FastJSONResponse:
+        auth_ctx = app.state.authorizer.authorize(request, internal_only=False)
+        await app.state.rate_limiter.check(auth_ctx["client_id"])
+        service: AgentAnalysisService = app.state.analysis_service
+        return FastJSONResponse(await service.analyze(req))
+
+    async def _cached_current_view(endpoint: str, compute: Callable[[], Awaitable[BaseModel]]) -> FastJSONResponse:
+        cache: CurrentViewCache = app.state.current_view_cache
+        view, age_ms = await cache.get(endpoint, "zh-CN", compute)
+        fields = {**dict(view), "timing_ms": {**view.timing_ms, "cache_age": age_ms}}
+        return FastJSONResponse(type(view).model_construct(view.model_fields_set | {"timing_ms"}, **fields))
+
+    @app.post("/api/v1/agent/analyze/stream")
+    async def analyze_stream(req: AgentAnalyzeRequest, request: Request) -> StreamingResponse:
         auth_ctx = app.state.authorizer.authorize(request, internal_only=False)
         await app.state.rate_limiter.check(auth_ctx["client_id"])
         service: AgentAnalysisService = app.state.analysis_service
-        return await service.analyze(req)
+
+        async def _events():
+            try:
+                async for event, payload in service.analyze_stream(req):
+                    yield _sse_event(event, payload)
+            except HTTPException as exc:
+                yield _sse_event("error", exc.detail if isinstance(exc.detail, dict) else {"message": str(exc.detail)})
+            except Exception as exc:
+                # 响应头已发出，意外异常只能以 error 事件收尾；细节只进日志，不回显给客户端
+                LOGGER.exception("agent_stream_failed error=%s", f"{type(exc).__name__}:{exc}")
+                yield _sse_event(
+                    "error",
+                    {"error_code": "analysis_failed", "message": "Analysis failed unexpectedly; please retry."},
+                )
+
+        return StreamingResponse(
+            _events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @app.get("/api/v1/agent/forecasts/current", response_model=AgentForecastsResponse)
-    async def current_forecasts(request: Request) -> AgentForecastsResponse:
+    async def current_forecasts(request: Request) -> FastJSONResponse:
         auth_ctx = app.state.authorizer.authorize(request, internal_only=False)
         await app.state.rate_limiter.check(auth_ctx["client_id"])
         service: AgentAnalysisService = app.state.analysis_service
-        return await service.current_forecasts()
+        return await _cached_current_view("forecasts", service.current_forecasts)
 
     @app.get("/api/v1/agent/dashboard/current", response_model=AgentDashboardResponse)
-    async def current_dashboard(request: Request) -> AgentDashboardResponse:
+    async def current_dashboard(request: Request) -> FastJSONResponse:
         auth_ctx = app.state.authorizer.authorize(request, internal_only=False)
         await app.state.rate_limiter.check(auth_ctx["client_id"])
         service: AgentAnalysisService = app.state.analysis_service
-        return await service.current_dashboard()
+        return await _cached_current_view("dashboard", service.current_dashboard)
 
     @app.post("/api/v1/agent/feedback", response_model=AgentFeedbackResponse)
     async def feedback(req: AgentFeedbackRequest, request: Request) -> AgentFeedbackResponse:
@@ -2932,6 +4104,12 @@ def create_app(
             )
         return AgentTraceResponse(**payload)
 
+    @app.post("/api/v1/agent/analyze/batch", response_model=AgentAnalyzeBatchResponse)
+    async def analyze_batch(req: AgentAnalyzeBatchRequest, request: Request) -> FastJSONResponse:
+        app.state.authorizer.authorize(request, internal_only=True)
+        service: AgentAnalysisService = app.state.analysis_service
+        return FastJSONResponse(await service.analyze_batch(req.items, concurrency=analyze_batch_concurrency))
+
     @app.post("/api/v1/agent/trigger", response_model=AgentTriggerResponse)
     async def trigger(req: AgentTriggerRequest, request: Request, response: Response) -> AgentTriggerResponse:
         app.state.authorizer.authorize(request, internal_only=True)
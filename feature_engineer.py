@@ -3,9 +3,45 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.feature_selection import mutual_info_regression, SelectKBest, f_regression
 from sklearn.ensemble import RandomForestRegressor
-from scipy import stats
+from joblib import Parallel, delayed
+import hashlib
+import json
+import logging
 import os
 
+LOGGER = logging.getLogger("goldensense.feature_engineer")
+
+# 特征定义版本：修改任何特征构建逻辑后需递增，特征库据此隔离新旧特征
+FEATURE_DEFINITION_VERSION = "1"
+
+# 互信息分块的固定特征数：mutual_info_regression 的扰动噪声与分块形状有关，
+# 分块大小不随 CPU 核数变化，评分才能在不同机器间复现并安全缓存
+MI_CHUNK_FEATURES = 8
+
+
+def sliding_windows(data, seq_length):
+    """
+    返回 (样本数, seq_length, 特征数) 的只读滑动窗口视图，与二维数组 data 共享内存。
+    行数不足 seq_length 时返回 (0, seq_length, 特征数) 的空数组。
+    """
+    data = np.asarray(data)
+    if len(data) < seq_length:
+        return np.empty((0, seq_length) + data.shape[1:], dtype=data.dtype)
+    return np.lib.stride_tricks.sliding_window_view(data, seq_length, axis=0).transpose(0, 2, 1)
+
+
+def window_base(windows):
+    """
+    sliding_windows 的逆操作：取回连续窗口所依赖的二维数组与窗口长度。
+    落盘、计算指纹或跨进程传递时只处理二维数组，使用处再用 sliding_windows 重建视图。
+    """
+    if windows.ndim != 3 or len(windows) == 0:
+        raise ValueError("expected a non-empty (samples, seq_length, features) window array")
+    if len(windows) > 1 and not np.array_equal(windows[1, :-1], windows[0, 1:], equal_nan=True):
+        raise ValueError("windows are not consecutive sliding windows")
+    base = np.concatenate([windows[0], windows[1:, -1, :]], axis=0)
+    return base, windows.shape[1]
+
 class FeatureEngineer:
     """
     全面的特征工程流程：预处理、构建、变换、选择和文档化。
@@ -70,11 +106,10 @@ class FeatureEngineer:
     def create_sequences(self, data, seq_length=60):
         """
         为序列模型构建过去 N 天的数据。
+        返回 (样本数, seq_length, 特征数) 的只读滑动窗口视图，与原数组共享内存，
+        训练时按批次取用才会物化窗口。
         """
-        sequences = []
-        for i in range(len(data) - seq_length + 1):
-            sequences.append(data[i:i + seq_length])
-        return np.array(sequences)
+        return sliding_windows(data, seq_length)
 
     def construct_seasonal_features(self, df):
         """
@@ -113,31 +148,78 @@ class FeatureEngineer:
             
         return df.dropna()
 
-    def select_features(self, X, y):
+    def _selection_fingerprint(self, X, y, sample_frac, random_state):
+        digest = hashlib.sha1()
+        digest.update(
+            json.dumps([list(map(str, X.columns)), sample_frac, random_state, MI_CHUNK_FEATURES]).encode("utf-8")
+        )
+        digest.update(np.ascontiguousarray(X.to_numpy(dtype=float)).tobytes())
+        digest.update(np.ascontiguousarray(np.asarray(y, dtype=float)).tobytes())
+        return digest.hexdigest()[:16]
+
+    def select_features(
+        self,
+        X,
+        y,
+        sample_frac=None,
+        n_jobs=-1,
+        cache_dir=".feature_selection_cache",
+        random_state=42,
+        top_k=15,
+    ):
         """
         多准则特征选择：统计方法 + 机器学习模型。
+        相关性一次矩阵运算完成，互信息按特征分块并行；可按比例抽样行，
+        评分结果按数据指纹缓存，输入不变时直接复用。
         """
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f"{self._selection_fingerprint(X, y, sample_frac, random_state)}.csv")
+            if os.path.exists(cache_path):
+                LOGGER.info("feature_selection_cache_hit path=%s", cache_path)
+                results = pd.read_csv(cache_path, index_col=0)
+                top_features = results.sort_values(by='Total_Score', ascending=False).head(top_k).index.tolist()
+                self.selected_features = top_features
+                return results, top_features
+
         print("执行特征选择流程...")
         features = X.columns
         results = pd.DataFrame(index=features)
-        
-        # 1. 相关性分析 (Pearson)
-        corr_list = []
-        for f in features:
-            if X[f].nunique() <= 1:
-                corr_list.append(0)
-            else:
-                c, _ = stats.pearsonr(X[f], y)
-                corr_list.append(c if not np.isnan(c) else 0)
-        results['Correlation'] = corr_list
-        
-        # 2. 互信息 (Mutual Information) - 捕捉非线性关系
-        mi = mutual_info_regression(X, y)
-        results['MI_Score'] = mi / np.max(mi)
-        
+        X_values = X.to_numpy(dtype=float)
+        y_values = np.asarray(y, dtype=float)
+
+        # 0. 可选的行抽样（保持时间顺序）
+        if sample_frac is not None and 0 < sample_frac < 1:
+            rng = np.random.default_rng(random_state)
+            n_rows = max(int(len(X_values) * sample_frac), min(len(X_values), 50))
+            rows = np.sort(rng.choice(len(X_values), size=n_rows, replace=False))
+            X_values, y_values = X_values[rows], y_values[rows]
+
+        # 1. 相关性分析 (Pearson)：中心化后一次矩阵乘法
+        X_centered = X_values - X_values.mean(axis=0)
+        y_centered = y_values - y_values.mean()
+        denom = np.sqrt((X_centered ** 2).sum(axis=0) * (y_centered ** 2).sum())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = (X_centered.T @ y_centered) / denom
+        results['Correlation'] = np.nan_to_num(corr, nan=0.0, posinf=0.0, neginf=0.0)
+
+        # 2. 互信息 (Mutual Information) - 捕捉非线性关系，按固定大小的特征分块并行
+        n_features = X_values.shape[1]
+        chunks = [
+            np.arange(start, min(start + MI_CHUNK_FEATURES, n_features))
+            for start in range(0, n_features, MI_CHUNK_FEATURES)
+        ]
+        n_workers = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(1, n_jobs)
+        mi_chunks = Parallel(n_jobs=min(n_workers, len(chunks)))(
+            delayed(mutual_info_regression)(X_values[:, chunk], y_values, random_state=random_state)
+            for chunk in chunks
+        )
+        mi = np.concatenate(mi_chunks)
+        results['MI_Score'] = mi / (np.max(mi) if np.max(mi) > 0 else 1.0)
+
         # 3. Random Forest 特征重要性
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X, y)
+        model = RandomForestRegressor(n_estimators=100, random_state=random_state, n_jobs=n_jobs)
+        model.fit(X_values, y_values)
         importance = model.feature_importances_
         results['RF_Importance'] = importance / np.max(importance)
         
@@ -145,8 +227,12 @@ class FeatureEngineer:
         results['Total_Score'] = (results['Correlation'].abs() + results['MI_Score'] + results['RF_Importance']) / 3
         
         # 选择前 K 个特征
-        top_features = results.sort_values(by='Total_Score', ascending=False).head(15).index.tolist()
+        top_features = results.sort_values(by='Total_Score', ascending=False).head(top_k).index.tolist()
         self.selected_features = top_features
+
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            results.to_csv(cache_path)
         
         return results, top_features
 
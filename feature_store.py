@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from feature_engineer import FEATURE_DEFINITION_VERSION, FeatureEngineer
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# 计算滚动特征（MA20、动量、20 日 ZScore 等）所需的预热行数
+FEATURE_WARMUP_ROWS = 120
+
+
+def _naive_timestamp(value: Optional[datetime]) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tz is not None else ts
+
+
+class FeatureStore:
+    """
+    本地特征库：按特征定义版本隔离、按月分区的 Parquet 文件集。
+    追加写入时把涉及的月份合并为单个分片（同一日期以最新写入为准），已落库日期另存索引文件，
+    判断缺失日期无需读取分片。读写都持有版本目录下的文件锁，多个进程或线程并发补算时互斥。
+    """
+
+    def __init__(self, root: str = "feature_store", version: str = FEATURE_DEFINITION_VERSION):
+        self.root = Path(root)
+        self.version = version
+        self.version_dir = self.root / f"version={version}"
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        self._dates_cache: Optional[Tuple[Tuple[int, int], pd.DatetimeIndex]] = None
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.version_dir / "_definition.json"
+
+    @property
+    def _dates_path(self) -> Path:
+        return self.version_dir / "_dates.json"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """同一线程可重入；最外层持有版本目录下 `_lock` 文件的排他锁。"""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self.version_dir.mkdir(parents=True, exist_ok=True)
+                self._lock_handle = open(self.version_dir / "_lock", "a+")
+                if fcntl is not None:
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_handle, fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+
+    def _write_json(self, path: Path, payload: dict) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def columns(self) -> List[str]:
+        if not self._manifest_path.exists():
+            return []
+        return json.loads(self._manifest_path.read_text(encoding="utf-8"))["columns"]
+
+    def _partitions(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> List[Path]:
+        if not self.version_dir.exists():
+            return []
+        selected = []
+        for partition in sorted(self.version_dir.glob("month=*")):
+            month = pd.Period(partition.name.split("=", 1)[1], freq="M")
+            if start is not None and month.end_time < start:
+                continue
+            if end is not None and month.start_time > end:
+                continue
+            selected.append(partition)
+        return selected
+
+    def append(self, features: pd.DataFrame) -> int:
+        if features.empty:
+            return 0
+        columns = [str(c) for c in features.columns]
+        known = self.columns()
+        if known and known != columns:
+            raise ValueError(
+                f"Feature columns do not match definition version {self.version}; bump FEATURE_DEFINITION_VERSION."
+            )
+        frame = features.copy()
+        frame.columns = columns
+        frame.index = pd.DatetimeIndex(frame.index).tz_localize(None).normalize()
+        frame.index.name = "Date"
+        with self._locked():
+            if not known:
+                manifest = {
+                    "version": self.version,
+                    "columns": columns,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }
+                self._write_json(self._manifest_path, manifest)
+            stored = self.stored_dates()
+            for month, rows in frame.groupby(frame.index.to_period("M")):
+                self._compact_partition(self.version_dir / f"month={month}", rows)
+            self._write_dates(stored.union(frame.index))
+        return len(frame)
+
+    def _compact_partition(self, partition: Path, rows: pd.DataFrame) -> None:
+        """把月分区已有分片与新行合并为一个分片，旧分片在新分片落盘后删除。"""
+        partition.mkdir(parents=True, exist_ok=True)
+        old_parts = sorted(partition.glob("part-*.parquet"))
+        merged = pd.concat([*(pd.read_parquet(part) for part in old_parts), rows])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        part_path = partition / f"part-{time.time_ns()}.parquet"
+        tmp_path = part_path.with_suffix(".tmp")
+        merged.to_parquet(tmp_path)
+        os.replace(tmp_path, part_path)
+        for part in old_parts:
+            part.unlink()
+
+    def _write_dates(self, dates: pd.DatetimeIndex) -> None:
+        dates = pd.DatetimeIndex(dates).sort_values()
+        self._write_json(self._dates_path, {"dates": [d.strftime("%Y-%m-%d") for d in dates]})
+        self._dates_cache = (self._dates_stamp(), dates)
+
+    def _dates_stamp(self) -> Tuple[int, int]:
+        stat = self._dates_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        start_ts = _naive_timestamp(start)
+        end_ts = _naive_timestamp(end)
+
+        with self._locked():
+            parts = [
+                pd.read_parquet(part, columns=columns)
+                for partition in self._partitions(start_ts, end_ts)
+                for part in sorted(partition.glob("part-*.parquet"))
+            ]
+        if not parts:
+            return pd.DataFrame(columns=columns or self.columns(), index=pd.DatetimeIndex([], name="Date"))
+        frame = pd.concat(parts)
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        if start_ts is not None:
+            frame = frame.loc[frame.index >= start_ts]
+        if end_ts is not None:
+            frame = frame.loc[frame.index <= end_ts]
+        return frame
+
+    def stored_dates(self) -> pd.DatetimeIndex:
+        """从日期索引读取已落库日期；索引文件未变化时直接返回内存副本，缺少索引的旧特征库扫描一次后补写。"""
+        with self._locked():
+            if not self._dates_path.exists():
+                if not self._partitions():
+                    return pd.DatetimeIndex([], name="Date")
+                self._write_dates(self.read(columns=self.columns()[:1] or None).index)
+            stamp = self._dates_stamp()
+            if self._dates_cache is None or self._dates_cache[0] != stamp:
+                dates = json.loads(self._dates_path.read_text(encoding="utf-8"))["dates"]
+                self._dates_cache = (stamp, pd.DatetimeIndex(dates, name="Date"))
+            return self._dates_cache[1]
+
+
+def backfill_feature_store(
+    store: FeatureStore,
+    raw_market: pd.DataFrame,
+    daily_signals: Optional[pd.DataFrame] = None,
+    engineer: Optional[FeatureEngineer] = None,
+    until: Optional[datetime] = None,
+) -> int:
+    """
+    只为特征库中缺失的日期计算特征：从最早缺失日期往前预留预热窗口，
+    用与在线推理相同的 prepare_inference_data 流水线计算后追加写入。
+    行情开头不足预热窗口的日期不参与补算（流水线会丢弃这些行，否则每次都会被当作缺失而触发全量重算）。
+    until（不含）之后的日期视为未收盘，不落库。
+    """
+    engineer = engineer or FeatureEngineer()
+    market = raw_market.copy()
+    market.index = pd.DatetimeIndex(market.index).tz_localize(None)
+    market_days = market.index.normalize()
+    candidates = market_days[FEATURE_WARMUP_ROWS:]
+    if until is not None:
+        candidates = candidates[candidates < _naive_timestamp(until).normalize()]
+
+    # 持锁完成“判断缺失 -> 计算 -> 写入”，并发补算的调用方不会重复计算同一批日期
+    with store._locked():
+        missing = candidates.difference(store.stored_dates())
+        if missing.empty:
+            return 0
+
+        first_pos = int(market_days.searchsorted(missing.min()))
+        last_pos = int(market_days.searchsorted(missing.max(), side="right"))
+        window = market.iloc[max(0, first_pos - FEATURE_WARMUP_ROWS):last_pos]
+        signals = daily_signals.copy(deep=False) if daily_signals is not None else None
+        features = engineer.prepare_inference_data(window, signals, n_rows=len(window))
+        features = features.loc[pd.DatetimeIndex(features.index).normalize().isin(missing)]
+        return store.append(features)
+
+
+def main() -> None:
+    from data_loader import MarketDataLoader, NewsDataLoader
+
+    parser = argparse.ArgumentParser(description="Backfill the local GoldenSense feature store.")
+    parser.add_argument("--root", default=os.environ.get("FEATURE_STORE_DIR", "feature_store"))
+    parser.add_argument("--period", default="5y")
+    args = parser.parse_args()
+
+    raw_market = MarketDataLoader().fetch_data(period=args.period)
+    news_loader = NewsDataLoader()
+    daily_signals = news_loader.get_daily_signals(news_loader.analyze_causality(news_loader.fetch_news()))
+    store = FeatureStore(args.root)
+    written = backfill_feature_store(store, raw_market, daily_signals, until=datetime.now(timezone.utc))
+    print(f"特征库 {store.version_dir} 新增 {written} 行")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,28 @@
 import asyncio
-from dataclasses import dataclass
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+import gc
+import hashlib
 import os
 from pathlib import Path
+import threading
 import time
-from typing import Dict, List, Literal, Optional, Sequence, Tuple
+from typing import AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
 import numpy as np
 import pandas as pd
 import xgboost as xgb
 import torch
 from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
 
 from stacking_model import DynamicEnsemble
 from data_loader import MarketDataProvider, NewsDataProvider, create_market_data_provider, create_news_data_provider
 from feature_engineer import FeatureEngineer
+from feature_store import FeatureStore, backfill_feature_store
+from service_contracts import FastJSONResponse
 
 
 class ForecastRequest(BaseModel):
@@ -24,6 +31,7 @@ class ForecastRequest(BaseModel):
     asset_symbol: str = Field(min_length=1, max_length=20)
     horizon: str = Field(pattern=r"^T\+(1|7|30)$")
     current_timestamp: datetime
+    include_explanations: bool = True
 
 
 class ForecastBatchRequest(BaseModel):
@@ -32,6 +40,17 @@ class ForecastBatchRequest(BaseModel):
     asset_symbol: str = Field(min_length=1, max_length=20)
     horizons: List[Literal["T+1", "T+7", "T+30"]] = Field(min_length=1, max_length=3)
     current_timestamp: datetime
+    include_explanations: bool = True
+
+
+class ForecastRangeRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    asset_symbol: str = Field(min_length=1, max_length=20)
+    horizons: List[Literal["T+1", "T+7", "T+30"]] = Field(min_length=1, max_length=3)
+    start: datetime
+    end: datetime
+    include_explanations: bool = False
 
 
 class FeatureImportanceItem(BaseModel):
@@ -80,11 +99,68 @@ class ErrorResponse(BaseModel):
     message: str
 
 
-@dataclass
+SEQUENCE_FEATURE_COLUMNS = ["Gold_ZScore", "Silver_ZScore", "Crude_Oil_ZScore", "USD_Index_ZScore"]
+
+
+def _frozen_array(values: np.ndarray) -> np.ndarray:
+    frozen = np.array(values, dtype=float)
+    frozen.setflags(write=False)
+    return frozen
+
+
+def _freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        return df
+    return pd.DataFrame(_frozen_array(df.to_numpy(dtype=float)), index=df.index, columns=df.columns, copy=False)
+
+
+def _tabular_frame(X_rows: pd.DataFrame, training_features: Sequence[str]) -> pd.DataFrame:
+    return X_rows.reindex(columns=list(training_features), fill_value=0.0).astype(float).reset_index(drop=True)
+
+
+@dataclass(frozen=True)
+class _CachedForecast:
+    fingerprint: str
+    response: ForecastResponse
+    body: bytes
+
+
+@dataclass(frozen=True)
 class _PreparedInferenceInput:
     market_df: pd.DataFrame
     daily_signals: pd.DataFrame
     X_features: pd.DataFrame
+    X_seq: Optional[np.ndarray] = None
+    fingerprint: str = ""
+    _tabular_rows: Dict[Tuple[str, ...], pd.DataFrame] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def build(
+        cls, market_df: pd.DataFrame, daily_signals: pd.DataFrame, X_features: pd.DataFrame
+    ) -> "_PreparedInferenceInput":
+        X_seq = None
+        if all(c in X_features.columns for c in SEQUENCE_FEATURE_COLUMNS):
+            window = X_features[SEQUENCE_FEATURE_COLUMNS].tail(60).to_numpy(dtype=float)
+            X_seq = _frozen_array(window.reshape(1, 60, len(SEQUENCE_FEATURE_COLUMNS)))
+        digest = hashlib.sha1()
+        for frame in (market_df.tail(1), daily_signals.tail(1), X_features.tail(1)):
+            digest.update(repr(list(frame.index)).encode("utf-8"))
+            digest.update(np.ascontiguousarray(frame.to_numpy(dtype=float)).tobytes())
+        return cls(
+            market_df=_freeze_frame(market_df),
+            daily_signals=_freeze_frame(daily_signals),
+            X_features=_freeze_frame(X_features),
+            X_seq=X_seq,
+            fingerprint=digest.hexdigest(),
+        )
+
+    def tabular_row(self, training_features: Sequence[str]) -> pd.DataFrame:
+        key = tuple(training_features)
+        row = self._tabular_rows.get(key)
+        if row is None:
+            row = _freeze_frame(_tabular_frame(self.X_features.tail(1), key))
+            self._tabular_rows[key] = row
+        return row
 
 
 def _prob_up_from_return(pred_return: float, scale: float) -> float:
@@ -105,32 +181,28 @@ def _weighted_mean_std(values: np.ndarray, weights: np.ndarray) -> Tuple[float,
     return mean, float(np.sqrt(max(var, 0.0)))
 
 
-def _feature_importance_top_3(
-    model: DynamicEnsemble, X_tab_df: pd.DataFrame
-) -> List[FeatureImportanceItem]:
-    feature_names = list(X_tab_df.columns)
+def _xgb_contributions(model: DynamicEnsemble, X_tab_df: pd.DataFrame) -> Optional[np.ndarray]:
     xgb_model = getattr(model, "xgb", None)
     get_booster = getattr(xgb_model, "get_booster", None)
-    if callable(get_booster):
-        booster = xgb_model.get_booster()
-        dm = xgb.DMatrix(X_tab_df.values, feature_names=feature_names)
-        contribs = booster.predict(dm, pred_contribs=True)
-        if isinstance(contribs, np.ndarray) and contribs.ndim == 2 and contribs.shape[0] == 1:
-            contribs_1 = contribs[0]
-            if contribs_1.shape[0] == len(feature_names) + 1:
-                contribs_1 = contribs_1[:-1]
-            order = np.argsort(np.abs(contribs_1))[::-1][:3]
-            return [
-                FeatureImportanceItem(feature=feature_names[i], importance=float(contribs_1[i]))
-                for i in order
-            ]
-
-    row = X_tab_df.iloc[0].to_numpy(dtype=float)
+    if not callable(get_booster):
+        return None
+    feature_names = list(X_tab_df.columns)
+    booster = xgb_model.get_booster()
+    dm = xgb.DMatrix(X_tab_df.to_numpy(dtype=float), feature_names=feature_names)
+    contribs = booster.predict(dm, pred_contribs=True)
+    if not isinstance(contribs, np.ndarray) or contribs.ndim != 2 or contribs.shape[0] != len(X_tab_df):
+        return None
+    if contribs.shape[1] == len(feature_names) + 1:
+        contribs = contribs[:, :-1]
+    return contribs
+
+
+def _top_3_feature_items(feature_names: Sequence[str], row: np.ndarray) -> List[FeatureImportanceItem]:
     order = np.argsort(np.abs(row))[::-1][:3]
     return [FeatureImportanceItem(feature=feature_names[i], importance=float(row[i])) for i in order]
 
 
-def _attention_top_3_lags(model: DynamicEnsemble, seq_len: int) -> List[AttentionLagItem]:
+def _attention_top_3_lags(model: DynamicEnsemble, seq_len: int, row: int = 0) -> List[AttentionLagItem]:
     transformer = getattr(model, "transformer", None)
     attn = getattr(transformer, "last_attention_weights", None)
     if attn is None:
@@ -141,10 +213,10 @@ def _attention_top_3_lags(model: DynamicEnsemble, seq_len: int) -> List[Attentio
     else:
         attn_np = np.asarray(attn)
 
-    if attn_np.ndim != 4 or attn_np.shape[0] < 1:
+    if attn_np.ndim != 4 or attn_np.shape[0] <= row:
         return []
 
-    weights = attn_np[0, :, -1, :].mean(axis=0)
+    weights = attn_np[row, :, -1, :].mean(axis=0)
     if weights.shape[0] != seq_len:
         return []
 
@@ -160,6 +232,97 @@ async def _to_thread_with_timeout(func, timeout_s: float):
     return await asyncio.wait_for(asyncio.to_thread(func), timeout=timeout_s)
 
 
+class _ForecastMicroBatcher:
+    def __init__(self, run_batch, *, window_s: float, max_batch_size: int):
+        self._run_batch = run_batch
+        self.window_s = max(window_s, 0.0)
+        self.max_batch_size = max(max_batch_size, 1)
+        self._pending: Dict[str, List[Tuple[pd.DataFrame, np.ndarray, bool, asyncio.Future]]] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 每个 horizon 的模型同一时刻只允许一次前向（Transformer 会写入 last_attention_weights）
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._in_flight = 0
+        self._batches = 0
+        self._items = 0
+        self._last_batch_size = 0
+        self._max_observed_batch_size = 0
+
+    async def submit(
+        self, horizon: str, X_tab_df: pd.DataFrame, X_seq: np.ndarray, explain: bool = True
+    ) -> ForecastResponse:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        queue = self._pending.setdefault(horizon, [])
+        queue.append((X_tab_df, X_seq, explain, future))
+        if horizon not in self._tasks:
+            self._wake[horizon] = asyncio.Event()
+            self._tasks[horizon] = asyncio.create_task(self._drain(horizon))
+        if len(queue) >= self.max_batch_size:
+            self._wake[horizon].set()
+        return await future
+
+    async def _drain(self, horizon: str) -> None:
+        try:
+            try:
+                await asyncio.wait_for(self._wake[horizon].wait(), timeout=self.window_s)
+            except asyncio.TimeoutError:
+                pass
+            while self._pending.get(horizon):
+                queue = self._pending[horizon]
+                batch = queue[: self.max_batch_size]
+                del queue[: len(batch)]
+                await self._run(horizon, batch)
+        finally:
+            self._tasks.pop(horizon, None)
+            self._wake.pop(horizon, None)
+
+    async def _run(
+        self, horizon: str, batch: List[Tuple[pd.DataFrame, np.ndarray, bool, asyncio.Future]]
+    ) -> None:
+        batch = [item for item in batch if not item[3].done()]
+        if not batch:
+            return
+        self._in_flight += len(batch)
+        self._batches += 1
+        self._items += len(batch)
+        self._last_batch_size = len(batch)
+        self._max_observed_batch_size = max(self._max_observed_batch_size, len(batch))
+        try:
+            X_tab_df = pd.concat([item[0] for item in batch], ignore_index=True)
+            X_seq = np.concatenate([item[1] for item in batch], axis=0)
+            explain = [item[2] for item in batch]
+            results = await asyncio.to_thread(self.run_exclusive, horizon, X_tab_df, X_seq, explain)
+        except Exception as exc:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self._in_flight -= len(batch)
+        for (_, _, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def run_exclusive(
+        self, horizon: str, X_tab_df: pd.DataFrame, X_seq: np.ndarray, explain: Sequence[bool]
+    ) -> List[ForecastResponse]:
+        with self._model_locks.setdefault(horizon, threading.Lock()):
+            return self._run_batch(horizon, X_tab_df, X_seq, explain)
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "queue_depth": sum(len(queue) for queue in self._pending.values()),
+            "in_flight": self._in_flight,
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+            "last_batch_size": self._last_batch_size,
+            "max_batch_size": self._max_observed_batch_size,
+            "window_ms": round(self.window_s * 1000.0, 3),
+            "batch_size_limit": self.max_batch_size,
+        }
+
+
 def _series_return(series: pd.Series, periods: int) -> float:
     clean = series.dropna()
     if len(clean) <= periods:
@@ -197,6 +360,14 @@ def _synthetic_market_data(now: Optional[datetime] = None) -> pd.DataFrame:
     )
 
 
+def _history_period_for_range(start: pd.Timestamp, now: pd.Timestamp) -> str:
+    required_days = int((now - start).days) + 200
+    for period, days in (("6mo", 180), ("1y", 365), ("2y", 730), ("5y", 1825), ("10y", 3650)):
+        if required_days <= days:
+            return period
+    return "max"
+
+
 def _heuristic_signal_pack(market_df: pd.DataFrame, daily_signals: pd.DataFrame) -> Dict[str, float]:
     signal_pack = {
         "gold_return_5d": _series_return(market_df["Gold"], 5) if "Gold" in market_df else 0.0,
@@ -251,8 +422,10 @@ def _heuristic_forecast_response(
     model_status: Literal["loading", "unavailable", "heuristic_proxy", "not_applicable"] = "heuristic_proxy",
     model_loaded: bool = False,
     model_checkpoint_path: Optional[str] = None,
+    signal_pack: Optional[Dict[str, float]] = None,
 ) -> ForecastResponse:
-    signal_pack = _heuristic_signal_pack(market_df, daily_signals)
+    if signal_pack is None:
+        signal_pack = _heuristic_signal_pack(market_df, daily_signals)
     configs = {
         "T+1": {
             "return_scale": 0.012,
@@ -355,8 +528,28 @@ def create_app(
     feature_engineer: Optional[FeatureEngineer] = None,
     model_checkpoints_dir_t1: str = "model_checkpoints",
     model_checkpoints_dir_t7: str = "model_checkpoints",
+    start_background_task: Optional[bool] = None,
 ) -> FastAPI:
-    app = FastAPI()
+    background_enabled = (
+        os.environ.get("INFERENCE_START_BACKGROUND_TASK", "0") != "0"
+        if start_background_task is None
+        else start_background_task
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        task = None
+        if background_enabled:
+            task = asyncio.create_task(_forecast_refresh_loop())
+        yield
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
     app_env = os.environ.get("APP_ENV", "development").lower()
     model_checkpoints_dir_t1 = os.environ.get("INFERENCE_MODEL_CHECKPOINTS_DIR_T1", model_checkpoints_dir_t1)
     model_checkpoints_dir_t7 = os.environ.get("INFERENCE_MODEL_CHECKPOINTS_DIR_T7", model_checkpoints_dir_t7)
@@ -404,9 +597,25 @@ def create_app(
     market_cache: Dict[str, Tuple[float, pd.DataFrame]] = {}
     daily_signals_cache: Dict[str, Tuple[float, pd.DataFrame]] = {}
     prepared_cache: Dict[str, Tuple[float, _PreparedInferenceInput]] = {}
-    market_cache_lock = asyncio.Lock()
-    daily_signals_cache_lock = asyncio.Lock()
-    prepared_cache_lock = asyncio.Lock()
+    input_stale_grace_s = float(os.environ.get("INFERENCE_INPUT_STALE_GRACE_SECONDS", "300.0"))
+    forecast_cache_max_items = int(os.environ.get("INFERENCE_FORECAST_CACHE_MAX_ITEMS", "512"))
+    forecast_refresh_s = float(os.environ.get("INFERENCE_FORECAST_REFRESH_SECONDS", "60.0"))
+    forecast_cache: Dict[Tuple[str, str, str, bool], _CachedForecast] = {}
+    forecast_cache_stats: Dict[str, object] = {"hits": 0, "misses": 0, "last_refresh_error": None}
+    explanation_cache_max_items = int(os.environ.get("INFERENCE_EXPLANATION_CACHE_MAX_ITEMS", "1024"))
+    explanation_cache: "OrderedDict[str, List[FeatureImportanceItem]]" = OrderedDict()
+    explanation_cache_lock = threading.Lock()
+    explanation_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+    model_generation: Dict[str, int] = {
+        "T+1": 0,
+        "T+7": 0,
+    }
+    market_inflight: Dict[str, asyncio.Task] = {}
+    daily_signals_inflight: Dict[str, asyncio.Task] = {}
+    prepared_inflight: Dict[str, asyncio.Task] = {}
+    feature_store_dir = os.environ.get("INFERENCE_FEATURE_STORE_DIR", "").strip()
+    feature_store = FeatureStore(feature_store_dir) if feature_store_dir else None
+    feature_store_stats: Dict[str, Optional[str]] = {"last_error": None}
     allow_synthetic_market_fallback = os.environ.get(
         "INFERENCE_ALLOW_SYNTHETIC_FALLBACK",
         "1" if app_env == "development" else "0",
@@ -423,6 +632,8 @@ def create_app(
                     lambda: svc_models[horizon].load_model(model_dir), timeout_s=model_load_timeout_s
                 )
                 model_loaded[horizon] = bool(loaded)
+                if loaded:
+                    model_generation[horizon] += 1
                 model_load_errors[horizon] = None if loaded else "model_checkpoint_load_returned_false"
                 model_load_retry_after[horizon] = 0.0 if loaded else time.monotonic() + model_load_retry_cooldown_s
             except Exception as exc:
@@ -461,6 +672,12 @@ def create_app(
         "daily_signals": daily_signals_cache,
         "prepared": prepared_cache,
     }
+    app.state.forecast_cache = forecast_cache
+    app.state.inference_input_inflight = {
+        "market": market_inflight,
+        "daily_signals": daily_signals_inflight,
+        "prepared": prepared_inflight,
+    }
 
     def _model_runtime_status(horizon: str) -> Dict[str, object]:
         checkpoint_path = model_dirs.get(horizon)
@@ -473,11 +690,26 @@ def create_app(
             "last_error": model_load_errors.get(horizon),
         }
 
+    def _forecast_cache_metrics() -> Dict[str, object]:
+        return {
+            "items": len(forecast_cache),
+            "background_refresh": background_enabled,
+            **forecast_cache_stats,
+            "explanations": {"items": len(explanation_cache), **explanation_cache_stats},
+        }
+
     @app.get("/health")
     async def health():
         return {
             "status": "ok",
             "model_status": {h: _model_runtime_status(h) for h in ("T+1", "T+7")},
+            "forecast_batcher": forecast_batcher.metrics(),
+            "forecast_cache": _forecast_cache_metrics(),
+            "feature_store": {
+                "enabled": feature_store is not None,
+                "version": feature_store.version if feature_store is not None else None,
+                "last_error": feature_store_stats["last_error"],
+            },
         }
 
     @app.get("/health/live")
@@ -504,6 +736,8 @@ def create_app(
                     h: "ensemble_model" if state["loaded"] else "heuristic_proxy"
                     for h, state in model_status.items()
                 },
+                "forecast_batcher": forecast_batcher.metrics(),
+                "forecast_cache": _forecast_cache_metrics(),
                 "warnings": warnings,
                 "errors": [],
             },
@@ -525,112 +759,160 @@ def create_app(
             return ts.tz_convert("UTC").tz_localize(None)
         return ts.tz_localize(None)
 
-    async def _cached_market_df(current_timestamp: datetime) -> pd.DataFrame:
-        cache_key = "6mo:1d"
-        now = time.monotonic()
-        async with market_cache_lock:
-            cached = market_cache.get(cache_key)
-            if cached and now < cached[0]:
-                return cached[1].copy()
-
-            try:
-                market_df: pd.DataFrame = await _to_thread_with_timeout(
-                    lambda: svc_market_loader.fetch_data(period="6mo", interval="1d"),
-                    timeout_s=20.0,
-                )
-            except Exception:
-                if not allow_synthetic_market_fallback:
-                    raise HTTPException(
-                        status_code=503,
-                        detail=ErrorResponse(
-                            error_code="market_data_unavailable",
-                            message="Market data fetch failed.",
-                        ).model_dump(),
-                    )
-                market_df = _synthetic_market_data(current_timestamp)
-
-            if market_df.empty or "Gold" not in market_df.columns:
-                if not allow_synthetic_market_fallback:
-                    raise HTTPException(
-                        status_code=503,
-                        detail=ErrorResponse(
-                            error_code="market_data_unavailable",
-                            message="Insufficient market data for inference.",
-                        ).model_dump(),
-                    )
-                market_df = _synthetic_market_data(current_timestamp)
-
-            market_cache[cache_key] = (time.monotonic() + input_cache_ttl_s, market_df.copy())
-            return market_df.copy()
+    def _consume_task_result(task: asyncio.Task) -> None:
+        if not task.cancelled():
+            task.exception()
 
-    async def _cached_daily_signals() -> pd.DataFrame:
-        cache_key = "daily_signals"
+    async def _refresh_cached(
+        cache: Dict[str, Tuple[float, object]],
+        inflight: Dict[str, asyncio.Task],
+        key: str,
+        compute,
+    ):
+        try:
+            value = await compute()
+            cache[key] = (time.monotonic() + input_cache_ttl_s, value)
+            return value
+        finally:
+            inflight.pop(key, None)
+
+    async def _single_flight(
+        cache: Dict[str, Tuple[float, object]],
+        inflight: Dict[str, asyncio.Task],
+        key: str,
+        compute,
+    ):
         now = time.monotonic()
-        async with daily_signals_cache_lock:
-            cached = daily_signals_cache.get(cache_key)
-            if cached and now < cached[0]:
-                return cached[1].copy()
+        cached = cache.get(key)
+        if cached and now < cached[0]:
+            return cached[1]
 
-            daily_signals = pd.DataFrame()
-            try:
-                news_items = await _to_thread_with_timeout(svc_news_loader.fetch_news, timeout_s=10.0)
-                scored_news = svc_news_loader.analyze_causality(news_items)
-                daily_signals = svc_news_loader.get_daily_signals(scored_news)
-            except Exception:
-                daily_signals = pd.DataFrame()
-            daily_signals_cache[cache_key] = (time.monotonic() + input_cache_ttl_s, daily_signals.copy())
-            return daily_signals.copy()
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(_refresh_cached(cache, inflight, key, compute))
+            task.add_done_callback(_consume_task_result)
+            inflight[key] = task
 
-    async def _prepare_inference_input(current_timestamp: datetime) -> _PreparedInferenceInput:
-        as_of = _as_of_timestamp(current_timestamp)
-        cache_key = as_of.strftime("%Y-%m-%d")
-        now = time.monotonic()
-        async with prepared_cache_lock:
-            cached = prepared_cache.get(cache_key)
-            if cached and now < cached[0]:
-                prepared = cached[1]
-                return _PreparedInferenceInput(
-                    market_df=prepared.market_df.copy(),
-                    daily_signals=prepared.daily_signals.copy(),
-                    X_features=prepared.X_features.copy(),
-                )
+        if cached and now < cached[0] + input_stale_grace_s:
+            return cached[1]
+        return await asyncio.shield(task)
 
-            market_df = await _cached_market_df(current_timestamp)
-            market_df = market_df.loc[market_df.index <= as_of].copy()
-            if len(market_df) < 90:
+    async def _fetch_market_df(current_timestamp: datetime) -> pd.DataFrame:
+        try:
+            market_df: pd.DataFrame = await _to_thread_with_timeout(
+                lambda: svc_market_loader.fetch_data(period="6mo", interval="1d"),
+                timeout_s=20.0,
+            )
+        except Exception:
+            if not allow_synthetic_market_fallback:
                 raise HTTPException(
                     status_code=503,
                     detail=ErrorResponse(
-                        error_code="insufficient_history",
-                        message="Not enough history to build inference features.",
+                        error_code="market_data_unavailable",
+                        message="Market data fetch failed.",
                     ).model_dump(),
                 )
+            market_df = _synthetic_market_data(current_timestamp)
 
-            daily_signals = await _cached_daily_signals()
-            recent_data = market_df.tail(140)
-            X_features = svc_feature_engineer.prepare_inference_data(recent_data, daily_signals, n_rows=60)
-            if X_features.empty or len(X_features) < 60:
+        if market_df.empty or "Gold" not in market_df.columns:
+            if not allow_synthetic_market_fallback:
                 raise HTTPException(
                     status_code=503,
                     detail=ErrorResponse(
-                        error_code="feature_generation_failed",
-                        message="Failed to generate inference features.",
+                        error_code="market_data_unavailable",
+                        message="Insufficient market data for inference.",
                     ).model_dump(),
                 )
+            market_df = _synthetic_market_data(current_timestamp)
+        return _freeze_frame(market_df)
 
-            prepared = _PreparedInferenceInput(
-                market_df=market_df,
-                daily_signals=daily_signals,
-                X_features=X_features,
+    async def _cached_market_df(current_timestamp: datetime) -> pd.DataFrame:
+        return await _single_flight(
+            market_cache, market_inflight, "6mo:1d", lambda: _fetch_market_df(current_timestamp)
+        )
+
+    async def _fetch_daily_signals() -> pd.DataFrame:
+        try:
+            news_items = await _to_thread_with_timeout(svc_news_loader.fetch_news, timeout_s=10.0)
+            scored_news = svc_news_loader.analyze_causality(news_items)
+            return _freeze_frame(svc_news_loader.get_daily_signals(scored_news))
+        except Exception:
+            return pd.DataFrame()
+
+    async def _cached_daily_signals() -> pd.DataFrame:
+        return await _single_flight(
+            daily_signals_cache, daily_signals_inflight, "daily_signals", _fetch_daily_signals
+        )
+
+    async def _build_inference_input(as_of: pd.Timestamp, current_timestamp: datetime) -> _PreparedInferenceInput:
+        market_df = await _cached_market_df(current_timestamp)
+        market_df = market_df.loc[market_df.index <= as_of]
+        if len(market_df) < 90:
+            raise HTTPException(
+                status_code=503,
+                detail=ErrorResponse(
+                    error_code="insufficient_history",
+                    message="Not enough history to build inference features.",
+                ).model_dump(),
+            )
+
+        daily_signals = await _cached_daily_signals()
+        X_features = await asyncio.to_thread(_inference_features, market_df, daily_signals)
+        return _PreparedInferenceInput.build(market_df, daily_signals, X_features)
+
+    def _inference_features(market_df: pd.DataFrame, daily_signals: pd.DataFrame) -> pd.DataFrame:
+        # 单点预测与区间回填共用：只取截至 as_of 的最近 140 根 K 线计算特征，保证同一日期两条路径的输入一致
+        X_features = svc_feature_engineer.prepare_inference_data(
+            market_df.tail(140), daily_signals.copy(deep=False), 60
+        )
+        if X_features.empty or len(X_features) < 60:
+            raise HTTPException(
+                status_code=503,
+                detail=ErrorResponse(
+                    error_code="feature_generation_failed",
+                    message="Failed to generate inference features.",
+                ).model_dump(),
             )
-            prepared_cache[cache_key] = (time.monotonic() + input_cache_ttl_s, prepared)
-            return _PreparedInferenceInput(
-                market_df=prepared.market_df.copy(),
-                daily_signals=prepared.daily_signals.copy(),
-                X_features=prepared.X_features.copy(),
+        if feature_store is not None:
+            X_features = _apply_feature_store(market_df, daily_signals, X_features)
+        return X_features
+
+    def _apply_feature_store(
+        market_df: pd.DataFrame, daily_signals: pd.DataFrame, X_live: pd.DataFrame
+    ) -> pd.DataFrame:
+        # 已收盘日期的特征以特征库为准（与训练读取同一份），当日行始终实时计算；特征库异常时退回实时特征。
+        try:
+            live_days = pd.DatetimeIndex(X_live.index).tz_localize(None).normalize()
+            backfill_feature_store(
+                feature_store, market_df, daily_signals.copy(deep=False), svc_feature_engineer, until=live_days[-1]
             )
+            stored = feature_store.read(start=live_days[0], end=live_days[-1])
+            if list(stored.columns) != list(X_live.columns):
+                raise ValueError("Feature store columns do not match live inference features.")
+            closed = live_days.isin(stored.index) & (live_days < live_days[-1])
+            merged = X_live.copy()
+            merged.loc[closed, :] = stored.loc[live_days[closed]].to_numpy()
+            feature_store_stats["last_error"] = None
+            return merged
+        except Exception as e:
+            feature_store_stats["last_error"] = f"{type(e).__name__}: {e}"
+            return X_live
 
-    def _forecast_from_prepared(horizon: str, prepared: _PreparedInferenceInput) -> ForecastResponse:
+    async def _prepare_inference_input(current_timestamp: datetime) -> _PreparedInferenceInput:
+        as_of = _as_of_timestamp(current_timestamp)
+        cache_key = as_of.strftime("%Y-%m-%d")
+        return await _single_flight(
+            prepared_cache,
+            prepared_inflight,
+            cache_key,
+            lambda: _build_inference_input(as_of, current_timestamp),
+        )
+
+    range_max_days = int(os.environ.get("INFERENCE_RANGE_MAX_DAYS", "2000"))
+    batch_window_s = float(os.environ.get("INFERENCE_BATCH_WINDOW_MS", "5")) / 1000.0
+    batch_max_size = int(os.environ.get("INFERENCE_BATCH_MAX_SIZE", "64"))
+
+    def _validate_horizon(horizon: str) -> None:
         if horizon not in {"T+1", "T+7", "T+30"}:
             raise HTTPException(
                 status_code=400,
@@ -640,14 +922,9 @@ def create_app(
                 ).model_dump(),
             )
 
-        svc_model_ = svc_models.get(horizon)
-        market_df = prepared.market_df
-        daily_signals = prepared.daily_signals
-        X_features = prepared.X_features
-
-        seq_cols = ["Gold_ZScore", "Silver_ZScore", "Crude_Oil_ZScore", "USD_Index_ZScore"]
-        if not all(c in X_features.columns for c in seq_cols):
-            missing = [c for c in seq_cols if c not in X_features.columns]
+    def _validate_sequence_features(X_features: pd.DataFrame) -> None:
+        if not all(c in X_features.columns for c in SEQUENCE_FEATURE_COLUMNS):
+            missing = [c for c in SEQUENCE_FEATURE_COLUMNS if c not in X_features.columns]
             raise HTTPException(
                 status_code=503,
                 detail=ErrorResponse(
@@ -656,8 +933,7 @@ def create_app(
                 ).model_dump(),
             )
 
-        X_seq = X_features[seq_cols].tail(60).to_numpy(dtype=float).reshape(1, 60, 4)
-
+    def _training_features(svc_model_: Optional[DynamicEnsemble], X_features: pd.DataFrame) -> List[str]:
         training_features: Sequence[str] = []
         if svc_model_ is not None and hasattr(svc_model_.xgb, "feature_names_in_"):
             training_features = list(svc_model_.xgb.feature_names_in_)
@@ -665,11 +941,128 @@ def create_app(
             training_features = svc_feature_engineer.load_selected_features()
         if not training_features:
             training_features = list(X_features.columns)[:15]
+        return list(training_features)
+
+    def _explain_rows(horizon: str, X_tab_df: pd.DataFrame) -> List[List[FeatureImportanceItem]]:
+        feature_names = list(X_tab_df.columns)
+        values = X_tab_df.to_numpy(dtype=float)
+        prefix = f"{_model_version(horizon)}|{','.join(feature_names)}|".encode("utf-8")
+        keys = [hashlib.sha1(prefix + np.ascontiguousarray(row).tobytes()).hexdigest() for row in values]
+
+        rows: List[Optional[List[FeatureImportanceItem]]] = []
+        with explanation_cache_lock:
+            for key in keys:
+                cached = explanation_cache.get(key)
+                if cached is not None:
+                    explanation_cache.move_to_end(key)
+                rows.append(cached)
+            missing = [i for i, row in enumerate(rows) if row is None]
+            explanation_cache_stats["hits"] += len(keys) - len(missing)
+            explanation_cache_stats["misses"] += len(missing)
+        if not missing:
+            return rows
+
+        contribs = _xgb_contributions(svc_models[horizon], X_tab_df.iloc[missing])
+        missing_values = contribs if contribs is not None else values[missing]
+        with explanation_cache_lock:
+            for i, row_values in zip(missing, missing_values):
+                rows[i] = _top_3_feature_items(feature_names, row_values)
+                explanation_cache[keys[i]] = rows[i]
+            while len(explanation_cache) > explanation_cache_max_items:
+                explanation_cache.popitem(last=False)
+        return rows
+
+    def _ensemble_forecasts(
+        horizon: str, X_tab_df: pd.DataFrame, X_seq: np.ndarray, explain: Optional[Sequence[bool]] = None
+    ) -> List[ForecastResponse]:
+        svc_model_ = svc_models[horizon]
+        X_tab = X_tab_df.values
+        l1_preds = np.asarray(svc_model_._get_l1_predictions(X_tab, X_seq), dtype=float)
+        if l1_preds.ndim != 2 or l1_preds.shape[0] != len(X_tab_df):
+            raise ValueError(f"unexpected_l1_prediction_shape:{l1_preds.shape}")
+
+        weights = svc_model_.model_weights
+        if weights is None:
+            weights_arr = np.ones(l1_preds.shape[1], dtype=float)
+        else:
+            weights_arr = np.array(weights, dtype=float)
+
+        try:
+            xgb_pred_returns = np.asarray(svc_model_.xgb.predict(X_tab), dtype=float).reshape(-1)
+        except Exception:
+            xgb_pred_returns = None
+        if xgb_pred_returns is not None and xgb_pred_returns.shape[0] != len(X_tab_df):
+            xgb_pred_returns = None
+
+        explain_flags = [True] * len(X_tab_df) if explain is None else list(explain)
+        explained = [i for i, flag in enumerate(explain_flags) if flag]
+        fi_rows: List[List[FeatureImportanceItem]] = [[] for _ in range(len(X_tab_df))]
+        if explained:
+            for i, items in zip(explained, _explain_rows(horizon, X_tab_df.iloc[explained])):
+                fi_rows[i] = items
+        responses: List[ForecastResponse] = []
+        for i, base_vals in enumerate(l1_preds):
+            pred_return, pred_std = _weighted_mean_std(base_vals, weights_arr)
+
+            prob_up = _prob_up_from_return(pred_return, scale=1.0)
+            direction = 1 if pred_return >= 0.0 else -1
+            probability = _direction_probability(direction, prob_up)
+
+            xgb_pred_return = float(xgb_pred_returns[i]) if xgb_pred_returns is not None else float(pred_return)
+            xgb_prob_up = _prob_up_from_return(xgb_pred_return, scale=1.0)
+            xgb_direction = 1 if xgb_pred_return >= 0.0 else -1
+            xgb_probability = _direction_probability(xgb_direction, xgb_prob_up)
+
+            z = 1.96
+            ci_low_r = pred_return - z * pred_std
+            ci_high_r = pred_return + z * pred_std
+            ci_low_p = _direction_probability(direction, _prob_up_from_return(ci_low_r, scale=1.0))
+            ci_high_p = _direction_probability(direction, _prob_up_from_return(ci_high_r, scale=1.0))
+            ci_low = float(min(ci_low_p, ci_high_p))
+            ci_high = float(max(ci_low_p, ci_high_p))
+
+            fi_top3 = fi_rows[i]
+            attn_top3 = _attention_top_3_lags(svc_model_, seq_len=60, row=i)
+
+            responses.append(
+                ForecastResponse(
+                    direction_prediction=direction,
+                    probability=float(probability),
+                    xgboost_direction_prediction=xgb_direction,
+                    xgboost_probability=float(xgb_probability),
+                    confidence_interval=(ci_low, ci_high),
+                    feature_importance_top_3=fi_top3,
+                    attention_top_3_lags=attn_top3,
+                    forecast_basis="ensemble_model",
+                    model_status="loaded",
+                    model_loaded=True,
+                    model_checkpoint_path=model_dirs.get(horizon),
+                    supporting_reasons=[f"{item.feature} 是当前模型最关注的特征。" for item in fi_top3],
+                )
+            )
+        return responses
+
+    def _uses_model(horizon: str) -> bool:
+        return horizon != "T+30" and svc_models.get(horizon) is not None and model_loaded.get(horizon, False)
+
+    forecast_batcher = _ForecastMicroBatcher(
+        _ensemble_forecasts, window_s=batch_window_s, max_batch_size=batch_max_size
+    )
+    app.state.forecast_batcher = forecast_batcher
 
-        last_row = X_features.tail(1)
-        X_tab_df = pd.DataFrame([{f: float(last_row[f].iloc[0]) if f in last_row.columns else 0.0 for f in training_features}])
+    async def _forecast_from_prepared(
+        horizon: str, prepared: _PreparedInferenceInput, explain: bool = True
+    ) -> ForecastResponse:
+        _validate_horizon(horizon)
 
-        if horizon == "T+30" or svc_model_ is None or not model_loaded.get(horizon, False):
+        svc_model_ = svc_models.get(horizon)
+        market_df = prepared.market_df
+        daily_signals = prepared.daily_signals
+        X_features = prepared.X_features
+
+        _validate_sequence_features(X_features)
+
+        if not _uses_model(horizon):
             model_status = "not_applicable" if horizon == "T+30" else "heuristic_proxy"
             return _heuristic_forecast_response(
                 horizon=horizon,
@@ -680,8 +1073,11 @@ def create_app(
                 model_checkpoint_path=model_dirs.get(horizon),
             )
 
+        X_seq = prepared.X_seq
+        X_tab_df = prepared.tabular_row(_training_features(svc_model_, X_features))
+
         try:
-            l1_preds = svc_model_._get_l1_predictions(X_tab_df.values, X_seq)
+            return await forecast_batcher.submit(horizon, X_tab_df, X_seq, explain)
         except Exception:
             return _heuristic_forecast_response(
                 horizon=horizon,
@@ -692,66 +1088,68 @@ def create_app(
                 model_checkpoint_path=model_dirs.get(horizon),
             )
 
-        weights = svc_model_.model_weights
-        if weights is None:
-            weights_arr = np.ones(l1_preds.shape[1], dtype=float)
-        else:
-            weights_arr = np.array(weights, dtype=float)
-        base_vals = l1_preds[0].astype(float)
-        pred_return, pred_std = _weighted_mean_std(base_vals, weights_arr)
-
-        prob_up = _prob_up_from_return(pred_return, scale=1.0)
-        direction = 1 if pred_return >= 0.0 else -1
-        probability = _direction_probability(direction, prob_up)
-
-        try:
-            xgb_pred_return = float(svc_model_.xgb.predict(X_tab_df.values)[0])
-        except Exception:
-            xgb_pred_return = float(pred_return)
-
-        xgb_prob_up = _prob_up_from_return(xgb_pred_return, scale=1.0)
-        xgb_direction = 1 if xgb_pred_return >= 0.0 else -1
-        xgb_probability = _direction_probability(xgb_direction, xgb_prob_up)
-
-        z = 1.96
-        ci_low_r = pred_return - z * pred_std
-        ci_high_r = pred_return + z * pred_std
-        ci_low_p = _direction_probability(direction, _prob_up_from_return(ci_low_r, scale=1.0))
-        ci_high_p = _direction_probability(direction, _prob_up_from_return(ci_high_r, scale=1.0))
-        ci_low = float(min(ci_low_p, ci_high_p))
-        ci_high = float(max(ci_low_p, ci_high_p))
-
-        fi_top3 = _feature_importance_top_3(svc_model_, X_tab_df)
-        attn_top3 = _attention_top_3_lags(svc_model_, seq_len=60)
-
-        return ForecastResponse(
-            direction_prediction=direction,
-            probability=float(probability),
-            xgboost_direction_prediction=xgb_direction,
-            xgboost_probability=float(xgb_probability),
-            confidence_interval=(ci_low, ci_high),
-            feature_importance_top_3=fi_top3,
-            attention_top_3_lags=attn_top3,
-            forecast_basis="ensemble_model",
-            model_status="loaded",
-            model_loaded=True,
-            model_checkpoint_path=model_dirs.get(horizon),
-            supporting_reasons=[f"{item.feature} 是当前模型最关注的特征。" for item in fi_top3],
+    def _model_version(horizon: str) -> str:
+        if not _uses_model(horizon):
+            return "heuristic_proxy"
+        return f"{model_dirs.get(horizon)}#{model_generation.get(horizon, 0)}"
+
+    async def _cached_forecast(
+        horizon: str, current_timestamp: datetime, prepared: _PreparedInferenceInput, explain: bool = True
+    ) -> _CachedForecast:
+        key = (
+            horizon,
+            _as_of_timestamp(current_timestamp).strftime("%Y-%m-%d"),
+            _model_version(horizon),
+            explain,
+        )
+        cached = forecast_cache.get(key)
+        if cached is not None and cached.fingerprint == prepared.fingerprint:
+            forecast_cache_stats["hits"] += 1
+            return cached
+
+        forecast_cache_stats["misses"] += 1
+        response = await _forecast_from_prepared(horizon, prepared, explain)
+        entry = _CachedForecast(
+            fingerprint=prepared.fingerprint,
+            response=response,
+            body=response.model_dump_json().encode("utf-8"),
         )
+        if response.model_status != "unavailable":
+            forecast_cache.pop(key, None)
+            forecast_cache[key] = entry
+            while len(forecast_cache) > forecast_cache_max_items:
+                forecast_cache.pop(next(iter(forecast_cache)))
+        return entry
+
+    async def _forecast_refresh_loop() -> None:
+        last_fingerprint = None
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                prepared = await _prepare_inference_input(now)
+                if prepared.fingerprint != last_fingerprint:
+                    for horizon in ("T+1", "T+7", "T+30"):
+                        await _cached_forecast(horizon, now, prepared)
+                    last_fingerprint = prepared.fingerprint
+                forecast_cache_stats["last_refresh_error"] = None
+            except Exception as exc:
+                forecast_cache_stats["last_refresh_error"] = f"{type(exc).__name__}:{exc}"
+            await asyncio.sleep(forecast_refresh_s)
 
-    async def _forecast_response(req: ForecastRequest) -> ForecastResponse:
+    async def _forecast_response(req: ForecastRequest) -> _CachedForecast:
         _validate_asset(req.asset_symbol)
         if req.horizon in {"T+1", "T+7"} and not model_loaded[req.horizon]:
             await _kick_model_load(req.horizon)
         prepared = await _prepare_inference_input(req.current_timestamp)
-        return _forecast_from_prepared(req.horizon, prepared)
+        return await _cached_forecast(req.horizon, req.current_timestamp, prepared, req.include_explanations)
 
     @app.post("/api/v1/forecast", response_model=ForecastResponse)
     async def forecast(
         req: ForecastRequest,
         deps=Depends(_deps),
     ):
-        return await _forecast_response(req)
+        cached = await _forecast_response(req)
+        return Response(content=cached.body, media_type="application/json")
 
     @app.post("/api/v1/forecast/batch", response_model=ForecastBatchResponse)
     async def forecast_batch(req: ForecastBatchRequest):
@@ -761,16 +1159,191 @@ def create_app(
             if horizon in {"T+1", "T+7"} and not model_loaded[horizon]:
                 await _kick_model_load(horizon)
         prepared = await _prepare_inference_input(req.current_timestamp)
-        forecasts = {
-            horizon: _forecast_from_prepared(horizon, prepared)
-            for horizon in horizons
-        }
+        results = await asyncio.gather(
+            *(
+                _cached_forecast(horizon, req.current_timestamp, prepared, req.include_explanations)
+                for horizon in horizons
+            )
+        )
+        forecasts = {horizon: cached.response for horizon, cached in zip(horizons, results)}
         return ForecastBatchResponse(
             asset_symbol=req.asset_symbol.upper().replace("/", ""),
             current_timestamp=req.current_timestamp,
             forecasts=forecasts,
         )
 
+    async def _range_inputs(
+        req: ForecastRangeRequest,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DatetimeIndex]:
+        start = _as_of_timestamp(req.start).normalize()
+        end = _as_of_timestamp(req.end)
+        if start > end:
+            raise HTTPException(
+                status_code=400,
+                detail=ErrorResponse(
+                    error_code="invalid_range",
+                    message="start must not be later than end.",
+                ).model_dump(),
+            )
+        if (end - start).days > range_max_days:
+            raise HTTPException(
+                status_code=400,
+                detail=ErrorResponse(
+                    error_code="range_too_large",
+                    message=f"Forecast range must not exceed {range_max_days} days.",
+                ).model_dump(),
+            )
+
+        period = _history_period_for_range(start, _as_of_timestamp(datetime.now(timezone.utc)))
+        try:
+            market_df: pd.DataFrame = await _to_thread_with_timeout(
+                lambda: svc_market_loader.fetch_data(period=period, interval="1d"),
+                timeout_s=60.0,
+            )
+        except Exception:
+            market_df = pd.DataFrame()
+        if market_df.empty or "Gold" not in market_df.columns:
+            raise HTTPException(
+                status_code=503,
+                detail=ErrorResponse(
+                    error_code="market_data_unavailable",
+                    message="Market data fetch failed.",
+                ).model_dump(),
+            )
+        market_df = market_df.loc[market_df.index <= end]
+
+        # 与单点预测相同：截至该日至少 90 根 K 线才构建特征
+        in_range = (market_df.index >= start) & (market_df.index <= end)
+        in_range[:89] = False
+        if not in_range.any():
+            raise HTTPException(
+                status_code=503,
+                detail=ErrorResponse(
+                    error_code="insufficient_history",
+                    message="Not enough history to build inference features for the requested range.",
+                ).model_dump(),
+            )
+        daily_signals = await _cached_daily_signals()
+        return market_df, daily_signals, pd.DatetimeIndex(market_df.index[in_range])
+
+    def _range_chunk_inputs(
+        market_df: pd.DataFrame, daily_signals: pd.DataFrame, dates: pd.DatetimeIndex
+    ) -> List[_PreparedInferenceInput]:
+        # 每个日期只看到截至当日的行情与新闻信号，按单点预测的方式各自构建输入
+        signals_index = pd.to_datetime(daily_signals.index) if not daily_signals.empty else None
+        market_positions = market_df.index.searchsorted(dates, side="right")
+        inputs: List[_PreparedInferenceInput] = []
+        for date, position in zip(dates, market_positions):
+            history = market_df.iloc[:position]
+            signals = daily_signals if signals_index is None else daily_signals.loc[signals_index <= date]
+            try:
+                X_features = _inference_features(history, signals)
+            except Exception:
+                X_features = pd.DataFrame()
+            inputs.append(_PreparedInferenceInput.build(history, signals, X_features))
+        return inputs
+
+    def _range_forecasts(
+        horizons: Sequence[str],
+        inputs: Sequence[_PreparedInferenceInput],
+        explain: bool,
+    ) -> Dict[str, List[Optional[ForecastResponse]]]:
+        ready = [i for i, prepared in enumerate(inputs) if prepared.X_seq is not None]
+        results: Dict[str, List[Optional[ForecastResponse]]] = {}
+        for horizon in horizons:
+            results[horizon] = [None] * len(inputs)
+            if not ready or not _uses_model(horizon):
+                continue
+            features = _training_features(svc_models[horizon], inputs[ready[0]].X_features)
+            X_tab_df = pd.concat([inputs[i].tabular_row(features) for i in ready], ignore_index=True)
+            X_seq = np.concatenate([inputs[i].X_seq for i in ready], axis=0)
+            try:
+                # 每个分块单独持有模型锁，区间回填期间普通预测可以在分块之间插入
+                rows = forecast_batcher.run_exclusive(horizon, X_tab_df, X_seq, [explain] * len(ready))
+            except Exception:
+                continue
+            for i, row in zip(ready, rows):
+                results[horizon][i] = row
+        return results
+
+    def _range_line(
+        asset_symbol: str,
+        horizons: Sequence[str],
+        date: pd.Timestamp,
+        prepared: _PreparedInferenceInput,
+        results: Dict[str, List[Optional[ForecastResponse]]],
+        row: int,
+    ) -> bytes:
+        signal_pack: Optional[Dict[str, float]] = None
+        forecasts: Dict[str, ForecastResponse] = {}
+        for horizon in horizons:
+            response = results[horizon][row]
+            if response is not None:
+                forecasts[horizon] = response
+                continue
+            if signal_pack is None:
+                signal_pack = _heuristic_signal_pack(prepared.market_df, prepared.daily_signals)
+            if horizon == "T+30":
+                model_status = "not_applicable"
+            elif _uses_model(horizon):
+                model_status = "unavailable"
+            else:
+                model_status = "heuristic_proxy"
+            forecasts[horizon] = _heuristic_forecast_response(
+                horizon=horizon,
+                market_df=prepared.market_df,
+                daily_signals=prepared.daily_signals,
+                model_status=model_status,
+                model_loaded=model_status != "unavailable" and bool(model_loaded.get(horizon, False)),
+                model_checkpoint_path=model_dirs.get(horizon),
+                signal_pack=signal_pack,
+            )
+        line = ForecastBatchResponse(
+            asset_symbol=asset_symbol,
+            current_timestamp=date.to_pydatetime().replace(tzinfo=timezone.utc),
+            forecasts=forecasts,
+        )
+        return (line.model_dump_json() + "\n").encode("utf-8")
+
+    async def _range_lines(
+        asset_symbol: str,
+        horizons: Sequence[str],
+        market_df: pd.DataFrame,
+        daily_signals: pd.DataFrame,
+        dates: pd.DatetimeIndex,
+        explain: bool,
+    ) -> AsyncIterator[bytes]:
+        # 按 INFERENCE_BATCH_MAX_SIZE 分块：构建输入 -> 批量前向 -> 立即输出该分块的各行
+        for offset in range(0, len(dates), batch_max_size):
+            chunk = dates[offset : offset + batch_max_size]
+            inputs = await asyncio.to_thread(_range_chunk_inputs, market_df, daily_signals, chunk)
+            results = await asyncio.to_thread(_range_forecasts, horizons, inputs, explain)
+            for row, (date, prepared) in enumerate(zip(chunk, inputs)):
+                yield _range_line(asset_symbol, horizons, date, prepared, results, row)
+
+    @app.post("/api/v1/forecast/range")
+    async def forecast_range(req: ForecastRangeRequest):
+        _validate_asset(req.asset_symbol)
+        horizons = list(dict.fromkeys(req.horizons))
+        for horizon in horizons:
+            if horizon in {"T+1", "T+7"} and not model_loaded[horizon]:
+                await _kick_model_load(horizon)
+        market_df, daily_signals, dates = await _range_inputs(req)
+        return StreamingResponse(
+            _range_lines(
+                req.asset_symbol.upper().replace("/", ""),
+                horizons,
+                market_df,
+                daily_signals,
+                dates,
+                req.include_explanations,
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    # 依赖与服务状态构建完毕后冻结当前堆：torch / pandas 等常驻对象移出分代回收，
+    # 请求期间触发的完整回收只扫描之后新分配的对象，不会因扫描数十万常驻对象而停顿上百毫秒
+    gc.freeze()
     return app
 
 
@@ -1,21 +1,28 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
+import math
 import os
+import time
+from collections import deque
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import psycopg
 import redis
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
 
 from data_loader import MarketDataProvider, create_market_data_provider
 from service_contracts import (
+    FastJSONResponse,
     GoldPriceHistoryPoint,
     GoldPriceHistoryResponse,
     GoldPriceKeyNode,
@@ -30,6 +37,8 @@ from service_contracts import (
 
 
 MARKET_SNAPSHOT_KEY = "golden_sense:market_snapshot"
+MARKET_INDICATOR_STATE_KEY = "golden_sense:market_indicator_state"
+SNAPSHOT_WINDOW_MONTHS = 6
 
 
 @dataclass
@@ -37,6 +46,7 @@ class MarketSnapshotConfig:
     redis_url: str = "redis://localhost:6379/0"
     database_url: str = "postgresql://localhost/postgres"
     refresh_seconds: int = 60
+    refresh_debounce_seconds: int = 15
     stale_after_seconds: int = 180
     allow_synthetic_fallback: bool = True
     provider_name: str = "yfinance"
@@ -74,6 +84,23 @@ class SnapshotPersistence:
         except Exception:
             return None
 
+    def save_indicator_state(self, state: "IncrementalIndicatorState") -> None:
+        if self._redis_client is None:
+            return
+        try:
+            self._redis_client.set(MARKET_INDICATOR_STATE_KEY, json.dumps(state.to_dict()))
+        except Exception:
+            pass
+
+    def load_indicator_state(self) -> Optional["IncrementalIndicatorState"]:
+        if self._redis_client is None:
+            return None
+        try:
+            raw = self._redis_client.get(MARKET_INDICATOR_STATE_KEY)
+            return IncrementalIndicatorState.from_dict(json.loads(raw)) if raw else None
+        except Exception:
+            return None
+
     def _save_db(self, payload: Dict[str, Any]) -> None:
         try:
             with psycopg.connect(self._database_url) as conn:
@@ -150,19 +177,28 @@ def _moving_average(series: pd.Series, window: int) -> Optional[float]:
     return float(clean.tail(min(window, len(clean))).mean())
 
 
+def _wilder_step(average: float, value: float, count: int, window: int) -> float:
+    # 前 window 个样本取累计简单均值作为种子，之后按 Wilder 平滑 avg += (x - avg) / window
+    return average + (value - average) / min(count, window)
+
+
+def _rsi_from_averages(gain: float, loss: float) -> float:
+    if loss == 0:
+        return 100.0
+    return 100.0 - (100.0 / (1.0 + gain / loss))
+
+
 def _rsi(series: pd.Series, window: int = 14) -> Optional[float]:
+    """Wilder RSI：平均涨跌幅以前 window 个差分的简单均值为种子，随后做 1/window 的指数平滑，依赖完整历史。"""
     clean = series.dropna()
     if len(clean) < 2:
         return None
     delta = clean.diff().dropna()
-    gain = delta.clip(lower=0).tail(window).mean()
-    loss = -delta.clip(upper=0).tail(window).mean()
-    if pd.isna(gain) or pd.isna(loss):
-        return None
-    if loss == 0:
-        return 100.0
-    rs = float(gain / loss)
-    return 100.0 - (100.0 / (1.0 + rs))
+    gain = loss = 0.0
+    for count, value in enumerate(delta.astype(float), start=1):
+        gain = _wilder_step(gain, max(value, 0.0), count, window)
+        loss = _wilder_step(loss, max(-value, 0.0), count, window)
+    return _rsi_from_averages(gain, loss)
 
 
 def _macd(series: pd.Series) -> Optional[float]:
@@ -184,6 +220,168 @@ def _atr_proxy_pct(series: pd.Series, window: int = 14) -> Optional[float]:
     return float(returns.tail(window).mean())
 
 
+class _RollingMean:
+    def __init__(self, window: int, values: Optional[List[float]] = None):
+        self.window = window
+        self.values: Deque[float] = deque(values or [], maxlen=window)
+        self.total = math.fsum(self.values)
+        self._pushes = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self._pushes += 1
+        if self._pushes >= self.window:
+            self.total = math.fsum(self.values)
+            self._pushes = 0
+
+    def mean_with(self, value: Optional[float]) -> Optional[float]:
+        if value is None:
+            return self.total / len(self.values) if self.values else None
+        if len(self.values) == self.window:
+            return (self.total - self.values[0] + value) / self.window
+        return (self.total + value) / (len(self.values) + 1)
+
+
+def _abs_return(prev: float, close: float) -> Optional[float]:
+    if prev == 0:
+        return None if close == 0 else float("inf")
+    return abs(close / prev - 1.0)
+
+
+class IncrementalIndicatorState:
+    """
+    金价技术指标的增量状态：MA5/20/60 与 ATR 代理以滚动和维护，MACD(12,26) 以 EMA 递推，
+    RSI14 以 Wilder 平滑递推，每根新 K 线 O(1) 更新。最后一根 K 线在收盘前仍会变化，只做预览不提交，
+    因此状态中只保存已收盘的 K 线。结果与 _moving_average / _rsi / _macd / _atr_proxy_pct 在同一段历史上一致；
+    行情窗口向前滑动时 EMA 与 Wilder 均值不会以新窗口首日重新起算。若最后一根已提交 K 线与新数据不符，视为历史被修订并从头重建。
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self.last_date: Optional[str] = None
+        self.last_close: Optional[float] = None
+        self.bars = 0
+        self.ema12: Optional[float] = None
+        self.ema26: Optional[float] = None
+        self.ma5 = _RollingMean(5)
+        self.ma20 = _RollingMean(20)
+        self.ma60 = _RollingMean(60)
+        self.rsi_deltas = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.abs_returns = _RollingMean(14)
+
+    def _push(self, close: float) -> None:
+        if self.last_close is not None:
+            delta = close - self.last_close
+            self.rsi_deltas += 1
+            self.avg_gain = _wilder_step(self.avg_gain, max(delta, 0.0), self.rsi_deltas, 14)
+            self.avg_loss = _wilder_step(self.avg_loss, max(-delta, 0.0), self.rsi_deltas, 14)
+            abs_return = _abs_return(self.last_close, close)
+            if abs_return is not None:
+                self.abs_returns.push(abs_return)
+        self.ema12 = close if self.ema12 is None else self.ema12 + (close - self.ema12) * (2.0 / 13.0)
+        self.ema26 = close if self.ema26 is None else self.ema26 + (close - self.ema26) * (2.0 / 27.0)
+        self.ma5.push(close)
+        self.ma20.push(close)
+        self.ma60.push(close)
+        self.last_close = close
+        self.bars += 1
+
+    def advance(self, gold: pd.Series) -> Dict[str, Optional[float]]:
+        clean = gold.dropna()
+        if clean.empty:
+            return self.features(None)
+        start = 0
+        if self.last_date is not None:
+            try:
+                pos = int(clean.index.searchsorted(pd.Timestamp(self.last_date)))
+                matches = (
+                    pos < len(clean)
+                    and pd.Timestamp(clean.index[pos]).isoformat() == self.last_date
+                    and math.isclose(float(clean.iloc[pos]), float(self.last_close), rel_tol=1e-12, abs_tol=1e-12)
+                )
+            except (TypeError, ValueError):
+                matches = False
+            if matches:
+                start = pos + 1
+            else:
+                self._reset()
+        for pos in range(start, len(clean) - 1):
+            self._push(float(clean.iloc[pos]))
+            self.last_date = pd.Timestamp(clean.index[pos]).isoformat()
+        if start == len(clean):
+            return self.features(None)
+        return self.features(float(clean.iloc[-1]))
+
+    def features(self, pending_close: Optional[float]) -> Dict[str, Optional[float]]:
+        bars = self.bars + (pending_close is not None)
+        delta = None
+        abs_return = None
+        if pending_close is not None and self.last_close is not None:
+            delta = pending_close - self.last_close
+            abs_return = _abs_return(self.last_close, pending_close)
+        gain, loss, deltas = self.avg_gain, self.avg_loss, self.rsi_deltas
+        if delta is not None:
+            deltas += 1
+            gain = _wilder_step(gain, max(delta, 0.0), deltas, 14)
+            loss = _wilder_step(loss, max(-delta, 0.0), deltas, 14)
+        rsi14 = _rsi_from_averages(gain, loss) if deltas else None
+
+        macd = None
+        if bars >= 2:
+            ema12, ema26 = self.ema12, self.ema26
+            if pending_close is not None:
+                ema12 = pending_close if ema12 is None else ema12 + (pending_close - ema12) * (2.0 / 13.0)
+                ema26 = pending_close if ema26 is None else ema26 + (pending_close - ema26) * (2.0 / 27.0)
+            macd = float(ema12 - ema26)
+        return {
+            "ma5": self.ma5.mean_with(pending_close),
+            "ma20": self.ma20.mean_with(pending_close),
+            "ma60": self.ma60.mean_with(pending_close),
+            "rsi14": rsi14,
+            "macd": macd,
+            "atr14_pct": self.abs_returns.mean_with(abs_return) if bars >= 2 else None,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "bars": self.bars,
+            "ema12": self.ema12,
+            "ema26": self.ema26,
+            "rsi": {"deltas": self.rsi_deltas, "avg_gain": self.avg_gain, "avg_loss": self.avg_loss},
+            "windows": {
+                name: list(getattr(self, name).values)
+                for name in ("ma5", "ma20", "ma60", "abs_returns")
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "IncrementalIndicatorState":
+        state = cls()
+        state.last_date = payload.get("last_date")
+        state.last_close = payload.get("last_close")
+        state.bars = int(payload.get("bars", 0))
+        state.ema12 = payload.get("ema12")
+        state.ema26 = payload.get("ema26")
+        # 旧版检查点按简单均值保存 RSI 窗口，缺少 rsi 字段时抛错，由调用方丢弃并从头重建
+        rsi = payload["rsi"]
+        state.rsi_deltas = int(rsi["deltas"])
+        state.avg_gain = float(rsi["avg_gain"])
+        state.avg_loss = float(rsi["avg_loss"])
+        for name, values in payload.get("windows", {}).items():
+            window = getattr(state, name).window
+            setattr(state, name, _RollingMean(window, [float(v) for v in values]))
+        return state
+
+
 def _volatility_regime(vix_value: Optional[float]) -> str:
     if vix_value is None:
         return "elevated"
@@ -203,6 +401,7 @@ def build_market_snapshot(
     status: str = "ok",
     degraded_reason: Optional[str] = None,
     source_freshness_seconds: Optional[int] = 0,
+    indicator_state: Optional[IncrementalIndicatorState] = None,
 ) -> MarketSnapshotResponse:
     if market_df.empty or "Gold" not in market_df.columns:
         raise ValueError("market_data_missing_gold")
@@ -263,6 +462,18 @@ def build_market_snapshot(
         if y10 is not None and y2 is not None:
             yield_curve_spread = y10 - y2
 
+    if indicator_state is not None:
+        technicals = indicator_state.advance(gold_series)
+    else:
+        technicals = {
+            "ma5": _moving_average(gold_series, 5),
+            "ma20": _moving_average(gold_series, 20),
+            "ma60": _moving_average(gold_series, 60),
+            "rsi14": _rsi(gold_series),
+            "macd": _macd(gold_series),
+            "atr14_pct": _atr_proxy_pct(gold_series),
+        }
+
     freshness_seconds = 0
     feature_summary = MarketFeatureSummary(
         technical_state=_technical_state(gold_series),
@@ -270,12 +481,7 @@ def build_market_snapshot(
         yield_curve_spread=yield_curve_spread,
         gold_usd_divergence=gold_usd_divergence,
         gold_momentum_5d=gold_momentum_5d,
-        ma5=_moving_average(gold_series, 5),
-        ma20=_moving_average(gold_series, 20),
-        ma60=_moving_average(gold_series, 60),
-        rsi14=_rsi(gold_series),
-        macd=_macd(gold_series),
-        atr14_pct=_atr_proxy_pct(gold_series),
+        **technicals,
         stale_age_seconds=freshness_seconds,
         is_stale=False,
     )
@@ -743,17 +949,33 @@ def build_market_indicators(snapshot: MarketSnapshotResponse) -> MarketIndicator
     )
 
 
-def _factor_change(market_df: pd.DataFrame, column: str, index_pos: int) -> Optional[float]:
-    if column not in market_df.columns or index_pos <= 0:
-        return None
-    series = market_df[column].dropna()
-    if len(series) <= index_pos:
-        return None
-    prev = _to_float(series.iloc[index_pos - 1])
-    current = _to_float(series.iloc[index_pos])
-    if prev in (None, 0) or current is None:
-        return None
-    return current / prev - 1.0
+_NODE_FACTOR_SPECS = (
+    ("DXY", "USD_Index", "美元走强压制黄金", "美元走弱支撑黄金", 0.003),
+    ("10Y", "10Y_Bond", "美债收益率上行", "美债收益率回落", 0.003),
+    ("VIX", "VIX", "避险波动升温", "风险波动回落", 0.03),
+    ("SPX", "S&P500", "风险资产反弹", "风险资产承压", 0.006),
+    ("WTI", "Crude_Oil", "能源价格上行推升通胀预期", "能源价格回落", 0.015),
+)
+
+
+def _factor_changes(market_df: pd.DataFrame, column: str, length: int) -> np.ndarray:
+    """按位置计算因子逐日涨跌幅（与黄金序列同位置对齐），无效位置为 NaN。
+
+    沿用既有口径：因子列先 dropna 再按位置与黄金序列对齐，前值为 0 的位置不计算。
+    """
+    out = np.full(length, np.nan)
+    if column not in market_df.columns:
+        return out
+    values = pd.to_numeric(market_df[column].dropna(), errors="coerce").to_numpy(dtype=float)
+    usable = min(length, len(values))
+    if usable < 2:
+        return out
+    prev = values[: usable - 1]
+    current = values[1:usable]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = current / prev - 1.0
+    out[1:usable] = np.where(prev == 0, np.nan, changes)
+    return out
 
 
 def _factor_label(name: str, change: Optional[float], *, positive_label: str, negative_label: str, threshold: float) -> Optional[str]:
@@ -762,14 +984,19 @@ def _factor_label(name: str, change: Optional[float], *, positive_label: str, ne
     return f"{positive_label if change > 0 else negative_label}（{name} {change * 100:+.2f}%）"
 
 
-def _gold_node_factors(market_df: pd.DataFrame, index_pos: int, gold_change: float) -> list[str]:
-    factors = [
-        _factor_label("DXY", _factor_change(market_df, "USD_Index", index_pos), positive_label="美元走强压制黄金", negative_label="美元走弱支撑黄金", threshold=0.003),
-        _factor_label("10Y", _factor_change(market_df, "10Y_Bond", index_pos), positive_label="美债收益率上行", negative_label="美债收益率回落", threshold=0.003),
-        _factor_label("VIX", _factor_change(market_df, "VIX", index_pos), positive_label="避险波动升温", negative_label="风险波动回落", threshold=0.03),
-        _factor_label("SPX", _factor_change(market_df, "S&P500", index_pos), positive_label="风险资产反弹", negative_label="风险资产承压", threshold=0.006),
-        _factor_label("WTI", _factor_change(market_df, "Crude_Oil", index_pos), positive_label="能源价格上行推升通胀预期", negative_label="能源价格回落", threshold=0.015),
-    ]
+def _gold_node_factors(factor_changes: Dict[str, np.ndarray], index_pos: int, gold_change: float) -> list[str]:
+    factors = []
+    for name, column, positive_label, negative_label, threshold in _NODE_FACTOR_SPECS:
+        change = factor_changes[column][index_pos]
+        factors.append(
+            _factor_label(
+                name,
+                None if np.isnan(change) else float(change),
+                positive_label=positive_label,
+                negative_label=negative_label,
+                threshold=threshold,
+            )
+        )
     out = [factor for factor in factors if factor]
     if not out:
         out.append("技术面突破/跌破后的动量延续")
@@ -789,20 +1016,29 @@ def build_gold_price_history(
     if market_df.empty or "Gold" not in market_df.columns:
         raise ValueError("market_history_missing_gold")
 
-    clean = market_df.dropna(subset=["Gold"]).copy()
+    clean = market_df.dropna(subset=["Gold"])
     if len(clean) < 2:
         raise ValueError("market_history_insufficient_gold_points")
 
-    points: list[GoldPriceHistoryPoint] = []
-    key_nodes: list[GoldPriceKeyNode] = []
     gold = clean["Gold"].astype(float)
-    changes = gold.pct_change()
-    for index_pos, (idx, price) in enumerate(gold.items()):
-        change = None if pd.isna(changes.loc[idx]) else float(changes.loc[idx])
-        date_label = pd.Timestamp(idx).date().isoformat()
-        points.append(GoldPriceHistoryPoint(date=date_label, price=float(price), change_pct=change))
-        if change is not None and abs(change) >= 0.02:
-            factors = _gold_node_factors(clean, index_pos, change)
+    prices = gold.to_numpy()
+    changes = gold.pct_change().to_numpy()
+    dates = [day.isoformat() for day in pd.DatetimeIndex(gold.index).date]
+    change_values = [None if math.isnan(change) else float(change) for change in changes.tolist()]
+    points = [
+        GoldPriceHistoryPoint(date=date_label, price=price, change_pct=change)
+        for date_label, price, change in zip(dates, prices.tolist(), change_values)
+    ]
+
+    key_nodes: list[GoldPriceKeyNode] = []
+    node_positions = np.flatnonzero(np.abs(np.nan_to_num(changes, nan=0.0)) >= 0.02)
+    if len(node_positions):
+        factor_changes = {
+            column: _factor_changes(clean, column, len(clean)) for _, column, *_ in _NODE_FACTOR_SPECS
+        }
+        for index_pos in node_positions.tolist():
+            change = change_values[index_pos]
+            factors = _gold_node_factors(factor_changes, index_pos, change)
             direction = "up" if change > 0 else "down"
             reason = (
                 f"黄金单日上涨 {change * 100:+.2f}%，主要因素：{'；'.join(factors)}。"
@@ -811,8 +1047,8 @@ def build_gold_price_history(
             )
             key_nodes.append(
                 GoldPriceKeyNode(
-                    date=date_label,
-                    price=float(price),
+                    date=dates[index_pos],
+                    price=prices[index_pos].item(),
                     change_pct=change,
                     direction=direction,
                     reason=reason,
@@ -837,30 +1073,176 @@ def _with_freshness(
 ) -> MarketSnapshotResponse:
     current_time = now or datetime.now(timezone.utc)
     age = max(0, int((current_time - snapshot.as_of).total_seconds()))
-    data = snapshot.model_dump()
-    data["freshness_seconds"] = age
-    data["stale_after_seconds"] = stale_after_seconds
-    data["is_stale"] = age > stale_after_seconds
-    data["source_freshness_seconds"] = age
-    if any(item.get("source") == "synthetic_fallback" for item in data.get("instruments", [])):
-        data["status"] = "degraded"
-        data["degraded_reason"] = data.get("degraded_reason") or "synthetic_fallback"
-    data["feature_summary"]["stale_age_seconds"] = age
-    data["feature_summary"]["is_stale"] = age > stale_after_seconds
-    return MarketSnapshotResponse(**data)
+    is_stale = age > stale_after_seconds
+    update: Dict[str, Any] = {
+        "freshness_seconds": age,
+        "stale_after_seconds": stale_after_seconds,
+        "is_stale": is_stale,
+        "source_freshness_seconds": age,
+        "feature_summary": snapshot.feature_summary.model_copy(
+            update={"stale_age_seconds": age, "is_stale": is_stale}
+        ),
+    }
+    if any(item.source == "synthetic_fallback" for item in snapshot.instruments):
+        update["status"] = "degraded"
+        update["degraded_reason"] = snapshot.degraded_reason or "synthetic_fallback"
+    return snapshot.model_copy(update=update)
+
+
+# 年龄字段的占位值：缓存的 bytes 只随快照时间与是否陈旧变化，发送时再把占位值替换成当前年龄
+_AGE_PLACEHOLDER = 9_007_199_254_740_991
+
+
+def _age_template(snapshot: MarketSnapshotResponse) -> MarketSnapshotResponse:
+    age = _AGE_PLACEHOLDER
+    return snapshot.model_copy(
+        update={
+            "freshness_seconds": age,
+            "source_freshness_seconds": age,
+            "feature_summary": snapshot.feature_summary.model_copy(update={"stale_age_seconds": age}),
+        }
+    )
+
+
+def _patch_age(body: bytes, age: int) -> bytes:
+    placeholder = b":%d" % _AGE_PLACEHOLDER
+    value = b":%d" % age
+    return body.replace(placeholder + b",", value + b",").replace(placeholder + b"}", value + b"}")
+
+
+@dataclass(frozen=True)
+class _SerializedResponse:
+    key: Any
+    body: bytes
+    etag: str
+    built_at: float
+    age_template: bool = False
+
+
+def _store_serialized(
+    app: FastAPI,
+    endpoint: str,
+    key: Any,
+    model: BaseModel,
+    *,
+    age_template: bool = False,
+) -> _SerializedResponse:
+    body = type(model).__pydantic_serializer__.to_json(model)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    entry = _SerializedResponse(
+        key=key,
+        body=body,
+        # 年龄字段在发送时才填入，同一份模板对应的响应只在语义上等价，因此使用弱 ETag
+        etag=f"W/{etag}" if age_template else etag,
+        built_at=time.monotonic(),
+        age_template=age_template,
+    )
+    app.state.serialized[endpoint] = entry
+    return entry
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    return "*" in candidates or _opaque_tag(etag) in [_opaque_tag(item) for item in candidates]
+
+
+def _serialized_response(request: Request, entry: _SerializedResponse, *, age: Optional[int] = None) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    body = _patch_age(entry.body, age) if entry.age_template and age is not None else entry.body
+    return FastJSONResponse(body, headers=headers)
+
+
+def _cached_json(
+    app: FastAPI,
+    request: Request,
+    endpoint: str,
+    key: Any,
+    build: Callable[[], BaseModel],
+    *,
+    age: Optional[int] = None,
+) -> Response:
+    entry: Optional[_SerializedResponse] = app.state.serialized.get(endpoint)
+    if entry is None or entry.key != key:
+        entry = _store_serialized(app, endpoint, key, build(), age_template=age is not None)
+    return _serialized_response(request, entry, age=age)
+
+
+def _indicators_key(snapshot: MarketSnapshotResponse) -> tuple[datetime, bool]:
+    return snapshot.as_of, snapshot.is_stale
+
+
+def _history_key(market_df: pd.DataFrame, source: str) -> tuple[Any, ...]:
+    if market_df.empty:
+        return (source, 0, None, None)
+    last_gold = market_df["Gold"].iloc[-1] if "Gold" in market_df.columns else None
+    return (source, len(market_df), market_df.index[-1], _to_float(last_gold))
+
+
+async def _fetch_history_frame(loader: MarketDataProvider, cfg: MarketSnapshotConfig) -> tuple[pd.DataFrame, str]:
+    try:
+        market_df = await asyncio.to_thread(loader.fetch_data, "1y", "1d")
+        return market_df, getattr(loader, "provider_name", cfg.provider_name)
+    except Exception:
+        if not cfg.allow_synthetic_fallback:
+            raise
+        return build_synthetic_market_frame(), "synthetic_fallback"
+
+
+def _snapshot_window(market_df: pd.DataFrame) -> pd.DataFrame:
+    """快照只需最近半年日线；与金价历史共用同一次一年期拉取，按时间切片而非再拉一次。"""
+    if market_df.empty or not isinstance(market_df.index, pd.DatetimeIndex):
+        return market_df
+    start = market_df.index[-1] - pd.DateOffset(months=SNAPSHOT_WINDOW_MONTHS)
+    return market_df.loc[market_df.index >= start]
+
+
+async def _refresh_history(
+    app: FastAPI,
+    fetched: Optional[tuple[pd.DataFrame, str]] = None,
+) -> _SerializedResponse:
+    """物化金价历史响应；`fetched` 为空时自行拉取一年日线，数据未变化时沿用已有 bytes 与 ETag，只刷新构建时间。"""
+    cfg: MarketSnapshotConfig = app.state.cfg
+    market_df, source = fetched or await _fetch_history_frame(app.state.market_loader, cfg)
+    key = _history_key(market_df, source)
+    entry: Optional[_SerializedResponse] = app.state.serialized.get("history")
+    if entry is not None and entry.key == key:
+        entry = replace(entry, built_at=time.monotonic())
+        app.state.serialized["history"] = entry
+        return entry
+    try:
+        model = await asyncio.to_thread(build_gold_price_history, market_df, source=source)
+    except Exception:
+        if not cfg.allow_synthetic_fallback:
+            raise
+        market_df, source = build_synthetic_market_frame(), "synthetic_fallback"
+        key = _history_key(market_df, source)
+        model = await asyncio.to_thread(build_gold_price_history, market_df, source=source)
+    return _store_serialized(app, "history", key, model)
 
 
 async def _resolve_snapshot(
     loader: MarketDataProvider,
     cfg: MarketSnapshotConfig,
-) -> tuple[MarketSnapshotResponse, Optional[str]]:
+    indicator_state: Optional[IncrementalIndicatorState] = None,
+) -> tuple[MarketSnapshotResponse, Optional[str], Optional[pd.DataFrame]]:
+    """拉取一年日线并构建快照；返回的原始行情供金价历史复用，拉取失败时为 None。"""
+    market_df: Optional[pd.DataFrame] = None
     try:
-        market_df = await asyncio.to_thread(loader.fetch_data, "6mo", "1d")
+        market_df = await asyncio.to_thread(loader.fetch_data, "1y", "1d")
         snapshot = build_market_snapshot(
-            market_df,
+            _snapshot_window(market_df),
             stale_after_seconds=cfg.stale_after_seconds,
+            indicator_state=indicator_state,
         )
-        return snapshot, None
+        return snapshot, None, market_df
     except Exception as exc:
         if not cfg.allow_synthetic_fallback:
             raise
@@ -868,19 +1250,60 @@ async def _resolve_snapshot(
         return (
             build_synthetic_market_snapshot(stale_after_seconds=cfg.stale_after_seconds, degraded_reason=reason),
             reason,
+            market_df,
         )
 
 
-async def _refresh_loop(app: FastAPI) -> None:
+async def _refresh_snapshot(app: FastAPI) -> MarketSnapshotResponse:
     cfg: MarketSnapshotConfig = app.state.cfg
+    indicator_state: IncrementalIndicatorState = app.state.indicator_state
     loader: MarketDataProvider = app.state.market_loader
-    persistence: SnapshotPersistence = app.state.persistence
+    snapshot, fallback_error, market_df = await _resolve_snapshot(loader, cfg, indicator_state)
+    app.state.persistence.save(snapshot)
+    if fallback_error is None:
+        app.state.persistence.save_indicator_state(indicator_state)
+    app.state.latest_snapshot = snapshot
+    app.state.last_error = fallback_error
+    app.state.last_refresh_at = time.monotonic()
+    current = _with_freshness(snapshot, stale_after_seconds=cfg.stale_after_seconds)
+    _store_serialized(
+        app,
+        "indicators",
+        _indicators_key(current),
+        build_market_indicators(_age_template(current)),
+        age_template=True,
+    )
+    if market_df is None:
+        fetched = (build_synthetic_market_frame(), "synthetic_fallback")
+    else:
+        fetched = (market_df, getattr(loader, "provider_name", cfg.provider_name))
+    try:
+        async with app.state.history_lock:
+            await _refresh_history(app, fetched)
+    except Exception as exc:
+        app.state.last_error = f"market_history_refresh_failed: {exc}"
+    return snapshot
+
+
+async def _coalesced_refresh(app: FastAPI) -> MarketSnapshotResponse:
+    task: Optional[asyncio.Task] = app.state.refresh_task
+    if task is None:
+        task = asyncio.create_task(_refresh_snapshot(app))
+        app.state.refresh_task = task
+
+        def _clear(done: asyncio.Task) -> None:
+            if app.state.refresh_task is done:
+                app.state.refresh_task = None
+
+        task.add_done_callback(_clear)
+    return await asyncio.shield(task)
+
+
+async def _refresh_loop(app: FastAPI) -> None:
+    cfg: MarketSnapshotConfig = app.state.cfg
     while True:
         try:
-            snapshot, fallback_error = await _resolve_snapshot(loader, cfg)
-            persistence.save(snapshot)
-            app.state.latest_snapshot = snapshot
-            app.state.last_error = fallback_error
+            await _coalesced_refresh(app)
         except Exception as exc:
             app.state.last_error = str(exc)
         await asyncio.sleep(cfg.refresh_seconds)
@@ -898,6 +1321,7 @@ def create_app(
         redis_url=os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
         database_url=os.environ.get("DATABASE_URL", "postgresql://localhost/postgres"),
         refresh_seconds=int(os.environ.get("MARKET_REFRESH_SECONDS", "60")),
+        refresh_debounce_seconds=int(os.environ.get("MARKET_REFRESH_DEBOUNCE_SECONDS", "15")),
         stale_after_seconds=int(os.environ.get("MARKET_STALE_AFTER_SECONDS", "180")),
         allow_synthetic_fallback=os.environ.get(
             "MARKET_ALLOW_SYNTHETIC_FALLBACK",
@@ -923,7 +1347,12 @@ def create_app(
         app.state.market_loader = loader
         app.state.persistence = persistence
         app.state.latest_snapshot = persistence.load()
+        app.state.indicator_state = persistence.load_indicator_state() or IncrementalIndicatorState()
         app.state.last_error = None
+        app.state.last_refresh_at = None
+        app.state.refresh_task = None
+        app.state.serialized = {}
+        app.state.history_lock = asyncio.Lock()
         task = None
         if background_enabled:
             task = asyncio.create_task(_refresh_loop(app))
@@ -935,7 +1364,12 @@ def create_app(
             except asyncio.CancelledError:
                 pass
 
-    app = FastAPI(title="GoldenSense Market Snapshot Service", version="1.0.0", lifespan=lifespan)
+    app = FastAPI(
+        title="GoldenSense Market Snapshot Service",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
 
     @app.get("/health")
     async def health() -> Dict[str, Any]:
@@ -972,17 +1406,21 @@ def create_app(
 
     @app.post("/api/v1/market/snapshot/refresh", response_model=MarketSnapshotResponse)
     async def refresh_market_snapshot() -> MarketSnapshotResponse:
+        latest_snapshot = getattr(app.state, "latest_snapshot", None)
+        last_refresh_at = getattr(app.state, "last_refresh_at", None)
+        if (
+            latest_snapshot is not None
+            and last_refresh_at is not None
+            and time.monotonic() - last_refresh_at < cfg.refresh_debounce_seconds
+        ):
+            return _with_freshness(latest_snapshot, stale_after_seconds=cfg.stale_after_seconds)
         try:
-            snapshot, fallback_error = await _resolve_snapshot(loader, cfg)
+            snapshot = await _coalesced_refresh(app)
         except Exception as exc:
             raise HTTPException(status_code=503, detail=f"market_refresh_failed: {exc}") from exc
-        persistence.save(snapshot)
-        app.state.latest_snapshot = snapshot
-        app.state.last_error = fallback_error
         return _with_freshness(snapshot, stale_after_seconds=cfg.stale_after_seconds)
 
-    @app.get("/api/v1/market/snapshot/latest", response_model=MarketSnapshotResponse)
-    async def get_latest_market_snapshot() -> MarketSnapshotResponse:
+    def _latest_snapshot() -> MarketSnapshotResponse:
         snapshot = getattr(app.state, "latest_snapshot", None) or persistence.load()
         if snapshot is None and cfg.allow_synthetic_fallback:
             app.state.last_error = "synthetic_fallback:cache_miss"
@@ -997,27 +1435,45 @@ def create_app(
         app.state.latest_snapshot = snapshot
         return snapshot
 
+    @app.get("/api/v1/market/snapshot/latest", response_model=MarketSnapshotResponse)
+    async def get_latest_market_snapshot(request: Request) -> Response:
+        snapshot = _latest_snapshot()
+        return _cached_json(
+            app,
+            request,
+            "snapshot",
+            (snapshot.as_of, snapshot.is_stale),
+            lambda: _age_template(snapshot),
+            age=snapshot.freshness_seconds,
+        )
+
     @app.get("/api/v1/market/indicators/current", response_model=MarketIndicatorsResponse)
-    async def get_current_market_indicators() -> MarketIndicatorsResponse:
-        snapshot = await get_latest_market_snapshot()
-        return build_market_indicators(snapshot)
+    async def get_current_market_indicators(request: Request) -> Response:
+        snapshot = _latest_snapshot()
+        return _cached_json(
+            app,
+            request,
+            "indicators",
+            _indicators_key(snapshot),
+            lambda: build_market_indicators(_age_template(snapshot)),
+            age=snapshot.freshness_seconds,
+        )
+
+    def _history_is_current(entry: Optional[_SerializedResponse]) -> bool:
+        return entry is not None and time.monotonic() - entry.built_at < cfg.stale_after_seconds
 
     @app.get("/api/v1/market/gold/history", response_model=GoldPriceHistoryResponse)
-    async def get_gold_price_history() -> GoldPriceHistoryResponse:
-        try:
-            market_df = await asyncio.to_thread(loader.fetch_data, "1y", "1d")
-            return build_gold_price_history(
-                market_df,
-                source=getattr(loader, "provider_name", cfg.provider_name),
-            )
-        except Exception as exc:
-            if not cfg.allow_synthetic_fallback:
-                raise HTTPException(status_code=503, detail=f"market_history_unavailable: {exc}") from exc
-            market_df = build_synthetic_market_frame()
-            return build_gold_price_history(
-                market_df,
-                source="synthetic_fallback",
-            )
+    async def get_gold_price_history(request: Request) -> Response:
+        entry = app.state.serialized.get("history")
+        if not _history_is_current(entry):
+            async with app.state.history_lock:
+                entry = app.state.serialized.get("history")
+                if not _history_is_current(entry):
+                    try:
+                        entry = await _refresh_history(app)
+                    except Exception as exc:
+                        raise HTTPException(status_code=503, detail=f"market_history_unavailable: {exc}") from exc
+        return _serialized_response(request, entry)
 
     return app
 
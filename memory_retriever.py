@@ -125,34 +125,41 @@ class MemoryRetriever:
         self.encoder = SentenceTransformer(model_id)
 
     def search(self, query_text: str, top_k: int = 3) -> dict:
+        return self.search_many([query_text], top_k=top_k)[0]
+
+    def search_many(self, query_texts: Sequence[str], top_k: int = 3) -> List[dict]:
         t0 = perf_counter()
-        qvec = self.encoder.encode([query_text], normalize_embeddings=True)[0].astype(float).tolist()
+        qvecs = self.encoder.encode(list(query_texts), normalize_embeddings=True).astype(float).tolist()
         t1 = perf_counter()
 
         with psycopg.connect(self.database_url) as conn:
             storage = _detect_storage(conn)
             t2 = perf_counter()
-            if storage == "pgvector":
-                results = _query_pgvector(conn, qvec, top_k=top_k)
-            else:
-                results = _query_array_cosine(conn, qvec, top_k=top_k)
+            query = _query_pgvector if storage == "pgvector" else _query_array_cosine
+            batch_results = []
+            for qvec in qvecs:
+                q0 = perf_counter()
+                batch_results.append((query(conn, qvec, top_k=top_k), int((perf_counter() - q0) * 1000)))
             t3 = perf_counter()
 
-        return {
-            "query": query_text,
-            "top_k": top_k,
-            "storage": storage,
-            "status": "ok",
-            "degraded_reason": None,
-            "source_freshness_seconds": None,
-            "timing_ms": {
-                "embed": int((t1 - t0) * 1000),
-                "connect_and_detect": int((t2 - t1) * 1000),
-                "db_query": int((t3 - t2) * 1000),
-                "total": int((t3 - t0) * 1000),
-            },
-            "results": results,
-        }
+        return [
+            {
+                "query": query_text,
+                "top_k": top_k,
+                "storage": storage,
+                "status": "ok",
+                "degraded_reason": None,
+                "source_freshness_seconds": None,
+                "timing_ms": {
+                    "embed": int((t1 - t0) * 1000),
+                    "connect_and_detect": int((t2 - t1) * 1000),
+                    "db_query": db_query_ms,
+                    "total": int((t3 - t0) * 1000),
+                },
+                "results": results,
+            }
+            for query_text, (results, db_query_ms) in zip(query_texts, batch_results)
+        ]
 
 def main() -> None:
     import argparse
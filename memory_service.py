@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, ConfigDict, Field
 
 from memory_retriever import MemoryRetriever
+from service_contracts import FastJSONResponse
 
 class SearchRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -38,6 +39,17 @@ class SearchResponse(BaseModel):
     timing_ms: Dict[str, int]
     results: List[SearchResultItem]
 
+class SearchBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    current_event_texts: List[str] = Field(..., description="一批待检索的事件文本", min_length=1, max_length=32)
+    top_k: int = Field(default=3, description="每条文本返回最相似的历史事件数量", ge=1, le=10)
+
+class SearchBatchResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[SearchResponse]
+
 retriever = None
 retriever_status: Literal["not_started", "loading", "ready", "unavailable"] = "not_started"
 retriever_error: Optional[str] = None
@@ -98,7 +110,12 @@ async def _load_retriever(db_url: str, model_id: str) -> None:
         print(f"Failed to initialize MemoryRetriever: {retriever_error}")
 
 
-app = FastAPI(title="GoldenSense Memory API", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="GoldenSense Memory API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 @app.post("/api/v1/memory/search", response_model=SearchResponse)
 async def search_memory(req: SearchRequest):
@@ -122,6 +139,39 @@ async def search_memory(req: SearchRequest):
             degraded_reason=f"memory_search_failed:{type(e).__name__}:{e}",
         )
 
+@app.post("/api/v1/memory/search/batch", response_model=SearchBatchResponse)
+async def search_memory_batch(req: SearchBatchRequest):
+    requests = [SearchRequest(current_event_text=text, top_k=req.top_k) for text in req.current_event_texts]
+    if retriever is None:
+        return SearchBatchResponse(
+            items=[
+                _status_response(
+                    item,
+                    storage="unavailable",
+                    status="unavailable",
+                    degraded_reason=f"memory_retriever_{retriever_status}:{retriever_error or 'not_loaded'}",
+                )
+                for item in requests
+            ]
+        )
+
+    try:
+        res = retriever.search_many(req.current_event_texts, req.top_k)
+        return SearchBatchResponse(items=[SearchResponse(**item) for item in res])
+    except Exception as e:
+        print(f"Memory batch search degraded: {e}")
+        return SearchBatchResponse(
+            items=[
+                _status_response(
+                    item,
+                    storage="degraded",
+                    status="degraded",
+                    degraded_reason=f"memory_search_failed:{type(e).__name__}:{e}",
+                )
+                for item in requests
+            ]
+        )
+
 @app.get("/health")
 def health_check():
     return {
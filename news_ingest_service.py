@@ -16,7 +16,7 @@ from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from data_loader import NewsDataProvider, create_news_data_provider
-from service_contracts import NewsEventItem, RecentNewsResponse
+from service_contracts import FastJSONResponse, NewsEventItem, RecentNewsResponse
 
 
 RECENT_NEWS_KEY = "golden_sense:recent_news"
@@ -410,7 +410,12 @@ def create_app(
             except asyncio.CancelledError:
                 pass
 
-    app = FastAPI(title="GoldenSense News Ingest Service", version="1.0.0", lifespan=lifespan)
+    app = FastAPI(
+        title="GoldenSense News Ingest Service",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
 
     @app.get("/health")
     async def health() -> Dict[str, Any]:
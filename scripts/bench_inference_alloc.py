@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference_service import _synthetic_market_data, create_app  # noqa: E402
+
+
+class _SyntheticMarketLoader:
+    provider_name = "synthetic_benchmark"
+
+    def fetch_data(self, period="6mo", interval="1d"):
+        return _synthetic_market_data(datetime.now(timezone.utc))
+
+
+class _EmptyNewsLoader:
+    provider_name = "empty_benchmark"
+
+    def fetch_news(self):
+        return []
+
+    def analyze_causality(self, news_items):
+        return []
+
+    def get_daily_signals(self, scored_items):
+        return pd.DataFrame()
+
+
+def _measure(client: TestClient, payload: Dict[str, object], requests: int) -> Dict[str, float]:
+    peaks: List[int] = []
+    latencies: List[float] = []
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            t0 = time.perf_counter()
+            resp = client.post("/api/v1/forecast", json=payload)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            resp.raise_for_status()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+    return {
+        "requests": float(requests),
+        "peak_alloc_kib_mean": statistics.mean(peaks) / 1024.0,
+        "peak_alloc_kib_max": max(peaks) / 1024.0,
+        "latency_ms_p50": statistics.median(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure per-request allocations on inference cache hits.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--horizon", default="T+1", choices=["T+1", "T+7", "T+30"])
+    parser.add_argument("--model-dir", default=os.environ.get("INFERENCE_MODEL_CHECKPOINTS_DIR_T1", "model_checkpoints"))
+    args = parser.parse_args()
+
+    app = create_app(
+        market_loader=_SyntheticMarketLoader(),
+        news_loader=_EmptyNewsLoader(),
+        model_checkpoints_dir_t1=args.model_dir,
+        model_checkpoints_dir_t7=args.model_dir,
+    )
+    payload = {
+        "asset_symbol": "XAUUSD",
+        "horizon": args.horizon,
+        "current_timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    with TestClient(app) as client:
+        client.post("/api/v1/forecast", json=payload).raise_for_status()
+        result = _measure(client, payload, args.requests)
+
+    for key, value in result.items():
+        print(f"{key}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
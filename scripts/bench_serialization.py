@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from market_snapshot_service import (  # noqa: E402
+    _with_freshness,
+    build_gold_price_history,
+    build_market_indicators,
+    build_synthetic_market_frame,
+    build_synthetic_market_snapshot,
+)
+from service_contracts import FastJSONResponse, MarketSnapshotResponse  # noqa: E402
+
+
+def _default_path(model: BaseModel) -> bytes:
+    adapter = TypeAdapter(type(model))
+    validated = adapter.validate_python(model.model_dump(by_alias=True))
+    return JSONResponse(adapter.dump_python(validated, mode="json", by_alias=True)).body
+
+
+def _with_freshness_roundtrip(snapshot: MarketSnapshotResponse, stale_after_seconds: int) -> MarketSnapshotResponse:
+    data = snapshot.model_dump()
+    data["freshness_seconds"] = 0
+    data["stale_after_seconds"] = stale_after_seconds
+    data["is_stale"] = False
+    data["source_freshness_seconds"] = 0
+    data["feature_summary"]["stale_age_seconds"] = 0
+    data["feature_summary"]["is_stale"] = False
+    return MarketSnapshotResponse(**data)
+
+
+def _time_us(fn: Callable[[], object], iterations: int) -> float:
+    samples: List[float] = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare response serialization cost before and after the fast path.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    snapshot = build_synthetic_market_snapshot(stale_after_seconds=180)
+    payloads: Dict[str, BaseModel] = {
+        "snapshot": snapshot,
+        "indicators": build_market_indicators(snapshot),
+        "history": build_gold_price_history(build_synthetic_market_frame(), source="synthetic_benchmark"),
+    }
+
+    print(f"{'endpoint':<12} {'default_us':>12} {'fast_us':>10} {'cached_us':>10} {'bytes':>8}")
+    for name, model in payloads.items():
+        cached = FastJSONResponse(model).body
+        default_us = _time_us(lambda: _default_path(model), args.iterations)
+        fast_us = _time_us(lambda: FastJSONResponse(model).body, args.iterations)
+        cached_us = _time_us(lambda: FastJSONResponse(cached).body, args.iterations)
+        print(f"{name:<12} {default_us:>12.1f} {fast_us:>10.1f} {cached_us:>10.1f} {len(cached):>8}")
+
+    roundtrip_us = _time_us(lambda: _with_freshness_roundtrip(snapshot, 180), args.iterations)
+    copy_us = _time_us(lambda: _with_freshness(snapshot, stale_after_seconds=180), args.iterations)
+    print(f"with_freshness: model_dump+rebuild {roundtrip_us:.1f}us, model_copy {copy_us:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
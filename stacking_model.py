@@ -5,8 +5,18 @@ from sklearn.ensemble import RandomForestRegressor
 from statsmodels.tsa.arima.model import ARIMA
 from sklearn.linear_model import Ridge
 import numpy as np
+import os
+import sys
+import time
 from typing import Optional, Tuple
 
+from feature_engineer import sliding_windows, window_base
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
 class GRUModel(nn.Module):
     def __init__(self, input_dim, hidden_size=64, num_layers=2, dropout=0.2):
         super(GRUModel, self).__init__()
@@ -77,23 +87,88 @@ class _ExplainableTransformerEncoderLayer(nn.Module):
         src = self.norm2(src + self.dropout2(src2))
         return src, attn_weights
 
+def _fit_tabular_learner(model, X_tab, y, X_tab_val, y_val, n_threads, use_eval_set):
+    started = time.perf_counter()
+    model.set_params(n_jobs=n_threads)
+    if use_eval_set:
+        model.fit(X_tab, y, eval_set=[(X_tab_val, y_val)], verbose=False)
+    else:
+        model.fit(X_tab, y)
+    return model, time.perf_counter() - started
+
+
+def _fit_sequence_learner(ensemble_kwargs, attr, name, initial_state, seq_base, seq_base_val, seq_length, y, y_val, n_threads):
+    # 只接收构造参数、初始权重与二维底层数组：在子进程内重建模型与滑动窗口视图，避免序列化整个集成或物化三维窗口
+    started = time.perf_counter()
+    torch.set_num_threads(n_threads)
+    ensemble = DynamicEnsemble(**ensemble_kwargs)
+    model = getattr(ensemble, attr)
+    model.load_state_dict(initial_state)
+    X_seq = sliding_windows(seq_base, seq_length)
+    X_seq_val = sliding_windows(seq_base_val, seq_length)
+    ensemble._train_torch_model(model, X_seq, y, X_seq_val, y_val, name=name)
+    return model.state_dict(), ensemble.training_stats[name], time.perf_counter() - started
+
+
 class DynamicEnsemble:
     """
     多模型融合架构：LSTM, Transformer, XGBoost, RF, ARIMA。
     实现基于滚动窗口表现的动态权重分配。
     """
-    def __init__(self, tabular_input_dim, seq_input_dim, seq_length=60):
-        self.xgb = xgb.XGBRegressor(n_estimators=500, learning_rate=0.03, max_depth=6, early_stopping_rounds=50)
-        self.rf = RandomForestRegressor(n_estimators=200, max_depth=10, n_jobs=-1)
+    def __init__(
+        self,
+        tabular_input_dim,
+        seq_input_dim,
+        seq_length=60,
+        batch_size=256,
+        grad_accumulation_steps=1,
+        early_stopping_patience=5,
+        checkpoint_dir=None,
+        random_state=None,
+    ):
+        # 保留构造参数，并行训练时子进程据此重建模型，而不是序列化整个集成
+        self._init_kwargs = {
+            "tabular_input_dim": tabular_input_dim,
+            "seq_input_dim": seq_input_dim,
+            "seq_length": seq_length,
+            "batch_size": batch_size,
+            "grad_accumulation_steps": grad_accumulation_steps,
+            "early_stopping_patience": early_stopping_patience,
+            "checkpoint_dir": checkpoint_dir,
+            "random_state": random_state,
+        }
+        self.xgb = xgb.XGBRegressor(
+            n_estimators=500, learning_rate=0.03, max_depth=6, early_stopping_rounds=50, random_state=random_state
+        )
+        self.rf = RandomForestRegressor(n_estimators=200, max_depth=10, n_jobs=-1, random_state=random_state)
         self.gru = GRUModel(input_dim=seq_input_dim)
         self.transformer = TransformerModel(input_dim=seq_input_dim)
         self.meta_learner = Ridge(alpha=1.0) # 使用 Ridge 回归防止过拟合
         self.seq_length = seq_length
         self.model_weights = None # 动态权重
+        # 序列模型的小批量训练配置
+        self.batch_size = batch_size
+        self.grad_accumulation_steps = max(1, grad_accumulation_steps)
+        self.early_stopping_patience = early_stopping_patience
+        self.checkpoint_dir = checkpoint_dir
+        self.random_state = random_state
+        self.training_stats = {}
 
-    def train_l1(self, X_tab, X_seq, y, X_tab_val, X_seq_val, y_val):
+    def set_thread_budget(self, n_threads):
+        """
+        限制 L1 模型可用的 CPU 线程数，避免并行训练时 RF / XGBoost / torch 互相争抢核心。
+        """
+        n_threads = max(1, int(n_threads))
+        self.xgb.set_params(n_jobs=n_threads)
+        self.rf.set_params(n_jobs=n_threads)
+        torch.set_num_threads(n_threads)
+
+    def train_l1(self, X_tab, X_seq, y, X_tab_val, X_seq_val, y_val, parallel=False, n_jobs=None):
         print("正在训练多模型 L1 层...")
-        
+        if parallel:
+            self._train_l1_parallel(X_tab, X_seq, y, X_tab_val, X_seq_val, y_val, n_jobs=n_jobs)
+            return
+
         # 1. XGBoost
         self.xgb.fit(X_tab, y, eval_set=[(X_tab_val, y_val)], verbose=False)
         
@@ -104,23 +179,140 @@ class DynamicEnsemble:
         self._train_torch_model(self.gru, X_seq, y, X_seq_val, y_val, name="GRU")
         self._train_torch_model(self.transformer, X_seq, y, X_seq_val, y_val, name="Transformer")
 
+    def _train_l1_parallel(self, X_tab, X_seq, y, X_tab_val, X_seq_val, y_val, n_jobs=None):
+        """
+        四个 L1 模型互不共享状态：各自在独立进程中训练，n_jobs 个核心按进程平分，
+        训练完成后把拟合好的模型（或权重）收回到当前集成中。
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        n_cpu = max(1, int(n_jobs or os.cpu_count() or 1))
+        n_workers = min(4, n_cpu)
+        n_threads = max(1, n_cpu // n_workers)
+        seq_base, seq_length = window_base(X_seq)
+        seq_base_val, _ = window_base(X_seq_val)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            xgb_future = pool.submit(_fit_tabular_learner, self.xgb, X_tab, y, X_tab_val, y_val, n_threads, True)
+            rf_future = pool.submit(_fit_tabular_learner, self.rf, X_tab, y, None, None, n_threads, False)
+            gru_future, trans_future = (
+                pool.submit(
+                    _fit_sequence_learner,
+                    self._init_kwargs,
+                    attr,
+                    name,
+                    getattr(self, attr).state_dict(),
+                    seq_base,
+                    seq_base_val,
+                    seq_length,
+                    y,
+                    y_val,
+                    n_threads,
+                )
+                for attr, name in (("gru", "GRU"), ("transformer", "Transformer"))
+            )
+
+            self.xgb, xgb_seconds = xgb_future.result()
+            self.rf, rf_seconds = rf_future.result()
+            timings = {"XGBoost": xgb_seconds, "RF": rf_seconds}
+            for attr, name, future in (("gru", "GRU", gru_future), ("transformer", "Transformer", trans_future)):
+                state_dict, stats, seconds = future.result()
+                getattr(self, attr).load_state_dict(state_dict)
+                getattr(self, attr).eval()
+                self.training_stats[name] = stats
+                timings[name] = seconds
+
+        wall = time.perf_counter() - started
+        detail = "，".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items())
+        print(f"L1 并行训练完成：总耗时 {wall:.1f}s（{detail}），{n_workers} 个进程 × {n_threads} 线程")
+
+    @staticmethod
+    def _batch_tensor(X, idx):
+        # X 可以是 create_sequences 返回的滑动窗口视图，只在取批次时才物化窗口
+        return torch.from_numpy(np.ascontiguousarray(X[idx], dtype=np.float32))
+
+    @staticmethod
+    def _peak_rss_mb():
+        if resource is None:
+            return float("nan")
+        # ru_maxrss 在 macOS 上以字节计，在 Linux 上以 KB 计
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+    def _validation_loss(self, model, X_val, y_val, criterion):
+        model.eval()
+        total, count = 0.0, 0
+        with torch.no_grad():
+            for start in range(0, len(X_val), self.batch_size):
+                idx = np.arange(start, min(start + self.batch_size, len(X_val)))
+                yb = torch.from_numpy(y_val[idx])
+                total += criterion(model(self._batch_tensor(X_val, idx)), yb).item() * len(idx)
+                count += len(idx)
+        return total / max(count, 1)
+
     def _train_torch_model(self, model, X, y, X_val, y_val, name, epochs=30):
+        """
+        小批量训练序列模型：按批次懒加载窗口、支持梯度累积，
+        以验证集 Loss 早停并回滚到最佳权重。
+        """
         optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
         criterion = nn.MSELoss()
-        X_t, y_t = torch.tensor(X, dtype=torch.float32), torch.tensor(y.values, dtype=torch.float32)
-        X_v, y_v = torch.tensor(X_val, dtype=torch.float32), torch.tensor(y_val.values, dtype=torch.float32)
-        
+        y_arr = np.asarray(getattr(y, "values", y), dtype=np.float32)
+        y_val_arr = np.asarray(getattr(y_val, "values", y_val), dtype=np.float32)
+        n_samples = len(X)
+        n_batches = (n_samples + self.batch_size - 1) // self.batch_size
+
+        best_loss, best_epoch, best_state = float("inf"), -1, None
+        bad_epochs, seen, e = 0, 0, -1
+        # 固定 random_state 时批次顺序与 dropout 可复现，串行与并行训练结果一致
+        rng = np.random.default_rng(self.random_state)
+        if self.random_state is not None:
+            torch.manual_seed(self.random_state)
+        started = time.perf_counter()
         for e in range(epochs):
             model.train()
             optimizer.zero_grad()
-            loss = criterion(model(X_t), y_t)
-            loss.backward()
-            optimizer.step()
-            
+            order = rng.permutation(n_samples)
+            for step in range(n_batches):
+                idx = np.sort(order[step * self.batch_size:(step + 1) * self.batch_size])
+                yb = torch.from_numpy(y_arr[idx])
+                loss = criterion(model(self._batch_tensor(X, idx)), yb) / self.grad_accumulation_steps
+                loss.backward()
+                if (step + 1) % self.grad_accumulation_steps == 0 or step + 1 == n_batches:
+                    optimizer.step()
+                    optimizer.zero_grad()
+                seen += len(idx)
+
+            v_loss = self._validation_loss(model, X_val, y_val_arr, criterion)
+            if v_loss < best_loss:
+                best_loss, best_epoch, bad_epochs = v_loss, e, 0
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+                if self.checkpoint_dir:
+                    os.makedirs(self.checkpoint_dir, exist_ok=True)
+                    torch.save(best_state, os.path.join(self.checkpoint_dir, f"{name.lower()}_best.pth"))
+            else:
+                bad_epochs += 1
+                if self.early_stopping_patience and bad_epochs >= self.early_stopping_patience:
+                    print(f"{name} 第 {e + 1} 轮触发早停")
+                    break
+
+        if best_state is not None:
+            model.load_state_dict(best_state)
         model.eval()
-        with torch.no_grad():
-            v_loss = criterion(model(X_v), y_v)
-        print(f"{name} 验证 Loss: {v_loss.item():.6f}")
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.training_stats[name] = {
+            "best_val_loss": best_loss,
+            "best_epoch": best_epoch + 1,
+            "epochs_run": e + 1,
+            "samples_per_sec": seen / elapsed,
+            "peak_rss_mb": self._peak_rss_mb(),
+        }
+        print(
+            f"{name} 验证 Loss: {best_loss:.6f}（第 {best_epoch + 1} 轮最佳），"
+            f"吞吐 {seen / elapsed:.0f} samples/s，峰值 RSS {self._peak_rss_mb():.1f} MB"
+        )
 
     def update_dynamic_weights(self, X_tab_roll, X_seq_roll, y_roll):
         """
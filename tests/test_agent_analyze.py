@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import threading
 from datetime import datetime, timezone
 
 import pytest
+import httpx
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
 from agent_gateway import (
     AgentAnalysisService,
     AgentAnalyzeRequest,
+    AgentGatewayConfig,
+    AgentTraceStore,
+    CurrentViewCache,
+    GcraRateLimiter,
+    HttpResearchToolbox,
     HistoricalEventsLookup,
     NarrativeOutput,
+    OpenAINarrator,
     RiskBanner,
     SummaryCard,
+    ToolCircuitOpenError,
+    TraceStoreUnavailableError,
+    build_upstream_client,
     create_app,
 )
 from service_contracts import (
@@ -43,6 +57,13 @@ class _DraftNarrator:
         return draft
 
 
+class _FailingQuestionNarrator:
+    async def narrate(self, bundle, draft):
+        if "失败" in bundle.question:
+            raise RuntimeError("narrator exploded")
+        return draft
+
+
 class _ScenarioToolbox:
     def __init__(
         self,
@@ -333,6 +354,16 @@ class _MemoryUnavailableToolbox(_ScenarioToolbox):
         )
 
 
+class _CountingSnapshotToolbox(_ScenarioToolbox):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.snapshot_calls = 0
+
+    async def get_market_snapshot(self):
+        self.snapshot_calls += 1
+        return await super().get_market_snapshot()
+
+
 def _make_client(toolbox: _ScenarioToolbox) -> TestClient:
     app = create_app(toolbox=toolbox, narrator=_DraftNarrator())
     return TestClient(app)
@@ -378,6 +409,76 @@ def test_agent_analyze_contract_ok():
     assert all(isinstance(item, str) and item for item in data["follow_up_questions"])
 
 
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_agent_analyze_stream_emits_progressive_events_then_complete_response():
+    with _make_client(_ScenarioToolbox()) as client:
+        payload = {
+            "question": "CPI 超预期之后黄金怎么看？",
+            "risk_profile": "conservative",
+            "horizon": "24h",
+            "locale": "zh-CN",
+        }
+        resp = client.post("/api/v1/agent/analyze/stream", json=payload, headers=_headers())
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(resp.text)
+        analysis_id = events[-1][1]["analysis_id"]
+        trace = client.get(f"/api/v1/agent/traces/{analysis_id}", headers=_headers("internal"))
+
+    names = [name for name, _ in events]
+    assert names[-1] == "complete"
+    assert names.index("forecast_cards") < names.index("summary") < names.index("evidence") < names.index("narrative")
+    assert {data["tool"] for name, data in events if name == "tool"} >= {"get_market_snapshot", "search_recent_news"}
+    assert [data["phase"] for name, data in events if name == "timing"] == ["tools", "evidence", "narrative", "persist"]
+    forecast_cards = next(data for name, data in events if name == "forecast_cards")
+    assert {item["horizon"] for item in forecast_cards["horizon_forecasts"]} == {"24h", "7d", "30d"}
+    complete = events[-1][1]
+    assert complete["horizon_forecasts"] == forecast_cards["horizon_forecasts"]
+    assert len(complete["evidence_cards"]) >= 1
+    assert trace.status_code == 200
+
+
+def test_agent_analyze_stream_reports_upstream_failure_as_error_event():
+    class _SnapshotDownToolbox(_ScenarioToolbox):
+        async def get_market_snapshot(self):
+            raise RuntimeError("snapshot_down")
+
+    with _make_client(_SnapshotDownToolbox()) as client:
+        resp = client.post(
+            "/api/v1/agent/analyze/stream",
+            json={"question": "黄金怎么看？", "risk_profile": "balanced", "horizon": "24h", "locale": "zh-CN"},
+            headers=_headers(),
+        )
+    events = _parse_sse(resp.text)
+    assert events[-1][0] == "error"
+    assert events[-1][1]["error_code"] == "upstream_unavailable"
+
+
+def test_agent_analyze_stream_reports_unexpected_failure_as_generic_error_event(caplog):
+    app = create_app(toolbox=_ScenarioToolbox(), narrator=_FailingQuestionNarrator())
+    with TestClient(app) as client:
+        resp = client.post(
+            "/api/v1/agent/analyze/stream",
+            json={"question": "这条会失败吗？", "risk_profile": "balanced", "horizon": "24h", "locale": "zh-CN"},
+            headers=_headers(),
+        )
+    events = _parse_sse(resp.text)
+    assert resp.status_code == 200
+    assert events[-1] == (
+        "error",
+        {"error_code": "analysis_failed", "message": "Analysis failed unexpectedly; please retry."},
+    )
+    assert "complete" not in [name for name, _ in events]
+    assert any("agent_stream_failed" in record.getMessage() for record in caplog.records)
+
+
 def test_agent_readiness_skips_downstream_for_injected_toolbox():
     with _make_client(_ScenarioToolbox()) as client:
         resp = client.get("/health/ready")
@@ -387,6 +488,155 @@ def test_agent_readiness_skips_downstream_for_injected_toolbox():
     assert data["downstream"]["toolbox"]["reason"] == "injected_toolbox"
 
 
+def test_agent_readiness_probes_downstream_concurrently_and_caches_results(monkeypatch):
+    monkeypatch.setenv("RECENT_NEWS_URL", "http://news/api/v1/news/recent")
+    state = {"calls": 0, "inflight": 0, "max_inflight": 0}
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        state["calls"] += 1
+        state["inflight"] += 1
+        state["max_inflight"] = max(state["max_inflight"], state["inflight"])
+        await asyncio.sleep(0.05)
+        state["inflight"] -= 1
+        return httpx.Response(503 if request.url.host == "news" else 200, json={"status": "ok"})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    app = create_app(narrator=_DraftNarrator(), http_client=http)
+    with TestClient(app) as client:
+        first = client.get("/health/ready")
+        second = client.get("/health/ready")
+
+    assert first.status_code == 503
+    assert first.json()["errors"] == ["news_unavailable"]
+    assert first.json()["downstream"]["forecast"] == {"status_code": 200, "status": "ok"}
+    assert second.json()["downstream"] == first.json()["downstream"]
+    assert state["calls"] == 6
+    assert state["max_inflight"] == 6
+
+
+class _CountingBatchToolbox(_ScenarioToolbox):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {"snapshot": 0, "news": 0, "memory_batch": 0, "memory": 0}
+        self.news_queries = []
+
+    async def get_market_snapshot(self):
+        self.calls["snapshot"] += 1
+        return await super().get_market_snapshot()
+
+    async def search_recent_news(self, query, limit=6):
+        self.calls["news"] += 1
+        self.news_queries.append(query)
+        return await super().search_recent_news(query, limit)
+
+    async def retrieve_historical_events(self, text, top_k=3):
+        self.calls["memory"] += 1
+        return await super().retrieve_historical_events(text, top_k)
+
+    async def retrieve_historical_events_batch(self, texts, top_k=3):
+        self.calls["memory_batch"] += 1
+        return [await super().retrieve_historical_events(text, top_k) for text in texts]
+
+
+def test_agent_analyze_batch_shares_upstream_fan_out_and_reports_item_timing():
+    toolbox = _CountingBatchToolbox()
+    questions = ["CPI 超预期之后黄金怎么看？", "美联储降息对金价影响？", "CPI 超预期之后黄金怎么看？"]
+    with _make_client(toolbox) as client:
+        rejected = client.post(
+            "/api/v1/agent/analyze/batch",
+            json={"items": [{"question": questions[0]}]},
+            headers=_headers(),
+        )
+        resp = client.post(
+            "/api/v1/agent/analyze/batch",
+            json={"items": [{"question": question, "risk_profile": "balanced"} for question in questions]},
+            headers=_headers("internal"),
+        )
+        data = resp.json()
+        trace = client.get(
+            f"/api/v1/agent/traces/{data['items'][1]['response']['analysis_id']}", headers=_headers("internal")
+        ).json()
+
+    assert rejected.status_code == 403
+    assert resp.status_code == 200
+    assert toolbox.calls == {"snapshot": 1, "news": 2, "memory_batch": 1, "memory": 0}
+    assert sorted(query.startswith(questions[0]) for query in toolbox.news_queries) == [False, True]
+    assert [item["index"] for item in data["items"]] == [0, 1, 2]
+    assert all(item["error"] is None for item in data["items"])
+    timing = data["items"][0]["response"]["timing_ms"]
+    assert set(timing) == {"shared_tools", "memory", "prepare", "narrative", "total"}
+    assert timing["total"] >= timing["shared_tools"]
+    assert trace["request_payload"]["question"] == questions[1]
+    assert trace["tool_trace"][-1]["tool"] == "retrieve_historical_events"
+
+
+def test_agent_analyze_batch_isolates_unexpected_item_failures():
+    app = create_app(toolbox=_ScenarioToolbox(), narrator=_FailingQuestionNarrator())
+    questions = ["CPI 超预期之后黄金怎么看？", "这条会失败吗？", "美元走强时黄金怎么办？"]
+    with TestClient(app) as client:
+        resp = client.post(
+            "/api/v1/agent/analyze/batch",
+            json={"items": [{"question": question} for question in questions]},
+            headers=_headers("internal"),
+        )
+
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [item["error"] is None for item in items] == [True, False, True]
+    assert items[1]["response"] is None
+    assert items[1]["error"]["error_code"] == "analysis_failed"
+    assert "RuntimeError" in items[1]["error"]["message"]
+    assert items[0]["response"]["analysis_id"] != items[2]["response"]["analysis_id"]
+
+
+class _StubResponsesClient:
+    def __init__(self):
+        self.calls = 0
+        self.responses = self
+
+    async def create(self, *, model, input, text):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        draft = json.loads(input[1]["content"][0]["text"])["draft"]
+        draft["follow_up_questions"] = [f"stub-{self.calls}"]
+        return type("_Response", (), {"output_text": json.dumps(draft, ensure_ascii=False)})()
+
+
+class _FrozenWindowToolbox(_ScenarioToolbox):
+    async def get_market_snapshot(self):
+        if not hasattr(self, "_snapshot"):
+            self._snapshot = await super().get_market_snapshot()
+        return self._snapshot
+
+    async def search_recent_news(self, query, limit=6):
+        if not hasattr(self, "_news"):
+            self._news = await super().search_recent_news(query, limit)
+        return self._news
+
+
+def test_narrator_caches_identical_prompts_and_coalesces_inflight_calls():
+    stub = _StubResponsesClient()
+    narrator = OpenAINarrator(_gateway_config(), client=stub, cache_ttl_seconds=60)
+    payload = {"question": "黄金怎么看？", "risk_profile": "balanced", "horizon": "24h", "locale": "zh-CN"}
+    app = create_app(toolbox=_FrozenWindowToolbox(), narrator=narrator)
+    with TestClient(app) as client:
+        service: AgentAnalysisService = app.state.analysis_service
+
+        async def _concurrent():
+            return await asyncio.gather(*[service.analyze(AgentAnalyzeRequest(**payload)) for _ in range(3)])
+
+        concurrent = client.portal.call(_concurrent)
+        assert stub.calls == 1
+        assert {tuple(item.follow_up_questions) for item in concurrent} == {("stub-1",)}
+
+        resp = client.post("/api/v1/agent/analyze", json=payload, headers=_headers())
+        assert resp.json()["follow_up_questions"] == ["stub-1"]
+        client.post("/api/v1/agent/analyze", json={**payload, "question": "白银呢？"}, headers=_headers())
+        assert stub.calls == 2
+        health = client.get("/health").json()["narrative_cache"]
+    assert health == {"hits": 1, "misses": 2, "coalesced": 2, "size": 2, "inflight": 0}
+
+
 def test_non_development_requires_explicit_non_default_api_keys(monkeypatch):
     monkeypatch.setenv("APP_ENV", "staging")
     monkeypatch.delenv("AGENT_PUBLIC_API_KEYS", raising=False)
@@ -699,6 +949,464 @@ def test_current_forecasts_degrades_when_quant_tools_fail():
     assert "quant_forecast_degraded" in data["degradation_flags"]
 
 
+def test_dashboard_polls_share_one_upstream_fan_out_per_ttl_window():
+    toolbox = _CountingSnapshotToolbox()
+    with _make_client(toolbox) as client:
+        first = client.get("/api/v1/agent/dashboard/current", headers=_headers())
+        second = client.get("/api/v1/agent/dashboard/current", headers=_headers())
+        forecasts = client.get("/api/v1/agent/forecasts/current", headers=_headers())
+        cache_health = client.get("/health").json()["current_view_cache"]
+        cached_views = [view for _, view in client.app.state.current_view_cache._entries.values()]
+    assert first.status_code == second.status_code == forecasts.status_code == 200
+    assert all("cache_age" not in view.timing_ms for view in cached_views)
+    assert first.json()["timing_ms"]["cache_age"] == 0
+    assert second.json()["timing_ms"]["cache_age"] >= 0
+    assert second.json()["horizon_forecasts"] == first.json()["horizon_forecasts"]
+    assert toolbox.snapshot_calls == 2
+    assert cache_health["hits"] == 1
+    assert cache_health["misses"] == 2
+
+
+def test_current_view_cache_coalesces_misses_and_serves_stale_while_revalidating():
+    calls = {"count": 0}
+
+    async def _compute():
+        calls["count"] += 1
+        await asyncio.sleep(0.02)
+        return RiskBanner(level="low", title=f"call-{calls['count']}", message="测试")
+
+    async def _run():
+        cache = CurrentViewCache(ttl_seconds=0.05, stale_grace_seconds=10)
+        results = await asyncio.gather(*[cache.get("dashboard", "zh-CN", _compute) for _ in range(8)])
+        assert {value.title for value, _ in results} == {"call-1"}
+        assert calls["count"] == 1
+
+        await asyncio.sleep(0.06)
+        stale, age_ms = await cache.get("dashboard", "zh-CN", _compute)
+        assert stale.title == "call-1"
+        assert age_ms >= 50
+        await asyncio.sleep(0.05)
+        fresh, _ = await cache.get("dashboard", "zh-CN", _compute)
+        assert fresh.title == "call-2"
+        assert calls["count"] == 2
+
+    asyncio.run(_run())
+
+
+def _gateway_config() -> AgentGatewayConfig:
+    return AgentGatewayConfig(
+        forecast_url="http://forecast/api/v1/forecast",
+        memory_url="http://memory/api/v1/memory/search",
+        market_snapshot_url="http://market/api/v1/market/snapshot/latest",
+        market_indicators_url="http://market/api/v1/market/indicators/current",
+        market_history_url="http://market/api/v1/market/gold/history",
+        recent_news_url="http://news/api/v1/news/recent",
+        default_model="test",
+        complex_model="test",
+        vix_circuit_breaker_threshold=30.0,
+        stale_after_seconds=180,
+        news_stale_after_seconds=300,
+        snapshot_freshness_budget_seconds=60,
+    )
+
+
+def test_market_snapshot_client_refreshes_only_past_freshness_budget_and_coalesces():
+    async def _run():
+        freshness = {"seconds": 12}
+        calls = {"latest": 0, "refresh": 0}
+
+        async def _handler(request: httpx.Request) -> httpx.Response:
+            snapshot = await _ScenarioToolbox().get_market_snapshot()
+            if request.url.path.endswith("/refresh"):
+                calls["refresh"] += 1
+                await asyncio.sleep(0.02)
+                return httpx.Response(200, json=snapshot.model_dump(mode="json"))
+            calls["latest"] += 1
+            payload = snapshot.model_dump(mode="json")
+            payload["freshness_seconds"] = freshness["seconds"]
+            return httpx.Response(200, json=payload)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as http:
+            toolbox = HttpResearchToolbox(http, _gateway_config())
+            fresh = await toolbox.get_market_snapshot()
+            assert fresh.freshness_seconds == 12
+            assert calls == {"latest": 1, "refresh": 0}
+
+            freshness["seconds"] = 600
+            results = await asyncio.gather(*[toolbox.get_market_snapshot() for _ in range(5)])
+            assert all(item.freshness_seconds == 12 for item in results)
+            assert calls == {"latest": 6, "refresh": 1}
+
+    asyncio.run(_run())
+
+
+def test_market_snapshot_refresh_has_its_own_budget_and_breaker():
+    async def _run():
+        refresh = {"delay": 0.1, "status": 200}
+
+        async def _handler(request: httpx.Request) -> httpx.Response:
+            snapshot = await _ScenarioToolbox().get_market_snapshot()
+            payload = snapshot.model_dump(mode="json")
+            if request.url.path.endswith("/refresh"):
+                await asyncio.sleep(refresh["delay"])
+                return httpx.Response(refresh["status"], json=payload)
+            payload["freshness_seconds"] = 600
+            return httpx.Response(200, json=payload)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as http:
+            toolbox = HttpResearchToolbox(
+                http,
+                _gateway_config(),
+                budget_seconds={"market": 0.05},
+                breaker_failure_threshold=2,
+            )
+            refreshed = await toolbox.get_market_snapshot()
+            assert refreshed.freshness_seconds != 600
+
+            refresh.update(delay=0.0, status=503)
+            for _ in range(3):
+                stale = await toolbox.get_market_snapshot()
+                assert stale.freshness_seconds == 600
+            states = toolbox.breaker_states()
+            assert states["market_refresh"]["state"] == "open"
+            assert states["market_refresh"]["budget_ms"] == 40000
+            assert states["market_snapshot"]["state"] == "closed"
+            assert states["market_snapshot"]["failures"] == 0
+
+    asyncio.run(_run())
+
+
+def test_tool_circuit_breaker_fails_fast_then_recovers_after_cooldown(monkeypatch):
+    async def _run():
+        calls = {"indicators": 0}
+        healthy = {"value": False}
+
+        async def _handler(request: httpx.Request) -> httpx.Response:
+            calls["indicators"] += 1
+            if not healthy["value"]:
+                return httpx.Response(503, json={"detail": "down"})
+            payload = (await _ScenarioToolbox().get_market_indicators()).model_dump(mode="json")
+            return httpx.Response(200, json=payload)
+
+        now = {"value": 1000.0}
+        monkeypatch.setattr("agent_gateway.time.monotonic", lambda: now["value"])
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as http:
+            toolbox = HttpResearchToolbox(http, _gateway_config(), breaker_failure_threshold=2, breaker_cooldown_seconds=30)
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await toolbox.get_market_indicators()
+            with pytest.raises(ToolCircuitOpenError):
+                await toolbox.get_market_indicators()
+            assert calls["indicators"] == 2
+            state = toolbox.breaker_states()["market_indicators"]
+            assert state["state"] == "open" and state["short_circuited"] == 1
+
+            now["value"] += 31
+            healthy["value"] = True
+            await toolbox.get_market_indicators()
+            assert toolbox.breaker_states()["market_indicators"]["state"] == "closed"
+
+    asyncio.run(_run())
+
+
+def test_tool_hedged_get_returns_faster_duplicate_after_p95_delay():
+    async def _run():
+        calls = {"news": 0}
+        payload = (await _ScenarioToolbox().search_recent_news("gold")).model_dump(mode="json")
+
+        async def _handler(request: httpx.Request) -> httpx.Response:
+            calls["news"] += 1
+            if calls["news"] == 21:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json=payload)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as http:
+            toolbox = HttpResearchToolbox(http, _gateway_config(), hedge_gets=True)
+            for _ in range(20):
+                await toolbox.search_recent_news("gold")
+            assert toolbox.breaker_states()["hedging"]["hedged"] == 0
+
+            started = asyncio.get_running_loop().time()
+            await toolbox.search_recent_news("gold")
+            assert asyncio.get_running_loop().time() - started < 0.5
+            assert toolbox.breaker_states()["hedging"] == {"enabled": True, "hedged": 1, "hedge_wins": 1}
+            assert calls["news"] == 22
+
+    asyncio.run(_run())
+
+
+def test_upstream_client_pools_per_service_and_reuses_keepalive_connections():
+    async def _run():
+        async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                while await reader.readuntil(b"\r\n\r\n"):
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                    await writer.drain()
+            except asyncio.IncompleteReadError:
+                writer.close()
+
+        server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        cfg = _gateway_config()
+        cfg.forecast_url = f"http://127.0.0.1:{port}/api/v1/forecast"
+        http, pools = build_upstream_client(
+            cfg,
+            timeout=httpx.Timeout(2.0),
+            max_connections={"forecast": 4, "memory": 2, "market": 8, "news": 2},
+            max_keepalive_connections=3,
+            keepalive_expiry_seconds=30,
+        )
+        async with http:
+            for _ in range(3):
+                resp = await http.get(cfg.forecast_url)
+                assert resp.text == "ok"
+            forecast = pools["forecast"].metrics()
+        server.close()
+
+        assert sorted(pools) == ["forecast", "market", "memory", "news"]
+        assert forecast["requests"] == 3
+        assert forecast["idle"] == 1 and forecast["active"] == 0
+        assert forecast["max_connections"] == 4 and forecast["max_keepalive_connections"] == 3
+        assert pools["market"].metrics()["requests"] == 0
+
+    asyncio.run(_run())
+
+
+class _RecordingTraceStore(AgentTraceStore):
+    def __init__(self, **kwargs):
+        super().__init__("postgresql://unused", allow_memory_fallback=False, memory_ttl_seconds=3600, memory_max_items=10, **kwargs)
+        self.batches: list[list[str]] = []
+        self.release = threading.Event()
+        self.in_flight = threading.Event()
+        self.poisoned: set[str] = set()
+
+    def _ensure_schema_sync(self) -> None:
+        return None
+
+    def _persist_batch_sync(self, rows) -> None:
+        self.in_flight.set()
+        self.release.wait(timeout=5)
+        ids = [row["analysis_id"] for row in rows]
+        if self.poisoned.intersection(ids):
+            raise ValueError("constraint_violation")
+        self.batches.append(ids)
+
+
+async def _persist(store: AgentTraceStore, analysis_id: str) -> None:
+    await store.persist_analysis(
+        analysis_id=analysis_id,
+        request_payload={"question": analysis_id},
+        tool_trace=[],
+        evidence_payload={},
+        response_payload={"analysis_id": analysis_id},
+    )
+
+
+def test_trace_store_write_behind_batches_rows_and_serves_pending_traces():
+    async def _run():
+        store = _RecordingTraceStore(write_behind=True, flush_interval_ms=20, flush_max_rows=3)
+        await store.startup()
+        for idx in range(5):
+            await _persist(store, f"a{idx}")
+        pending = await store.load_trace("a4")
+        assert pending is not None and pending["request_payload"] == {"question": "a4"}
+        assert store.health()["write_behind"]["queue_length"] == 5
+
+        store.release.set()
+        await store.shutdown()
+        assert sorted(sum(store.batches, [])) == [f"a{idx}" for idx in range(5)]
+        assert all(len(batch) <= 3 for batch in store.batches)
+        metrics = store.health()["write_behind"]
+        assert metrics["queue_length"] == 0
+        assert metrics["flushed_rows"] == 5
+        assert metrics["last_flush_ms"] is not None
+
+    asyncio.run(_run())
+
+
+def test_trace_store_write_behind_applies_backpressure_when_queue_is_full():
+    async def _run():
+        store = _RecordingTraceStore(
+            write_behind=True,
+            flush_interval_ms=10,
+            flush_max_rows=1,
+            queue_max_items=2,
+            enqueue_timeout_seconds=0.05,
+        )
+        await store.startup()
+        await _persist(store, "b0")
+        await _persist(store, "b1")
+        with pytest.raises(TraceStoreUnavailableError):
+            await _persist(store, "b2")
+        assert store.health()["write_behind"]["dropped_rows"] == 1
+
+        store.release.set()
+        await _persist(store, "b3")
+        await store.shutdown()
+        assert sum(store.batches, []) == ["b0", "b1", "b3"]
+
+    asyncio.run(_run())
+
+
+def test_trace_store_shutdown_waits_for_in_flight_flush_without_rewriting_rows():
+    async def _run():
+        store = _RecordingTraceStore(write_behind=True, flush_interval_ms=10, flush_max_rows=10)
+        await store.startup()
+        await _persist(store, "e0")
+        await asyncio.to_thread(store.in_flight.wait, 5)
+        shutdown = asyncio.create_task(store.shutdown())
+        await asyncio.sleep(0.05)
+        store.release.set()
+        await shutdown
+        assert store.batches == [["e0"]]
+        assert store.health()["write_behind"]["flushed_rows"] == 1
+
+    asyncio.run(_run())
+
+
+def test_trace_store_dead_letters_unpersistable_row_after_repeated_flush_failures():
+    async def _run():
+        store = _RecordingTraceStore(write_behind=True, flush_interval_ms=60000, flush_max_rows=10, flush_max_attempts=2)
+        store.release.set()
+        await store.startup()
+        store.poisoned = {"d1"}
+        for idx in range(3):
+            await _persist(store, f"d{idx}")
+
+        assert await store.flush() is False
+        assert store.health()["write_behind"]["queue_length"] == 3
+        assert await store.flush() is True
+        metrics = store.health()["write_behind"]
+        assert metrics["queue_length"] == 0
+        assert metrics["dead_lettered_rows"] == metrics["dead_letter_length"] == 1
+        assert store.batches == [["d0"], ["d2"]]
+
+        await _persist(store, "d3")
+        assert await store.flush() is True
+        assert store.batches[-1] == ["d3"]
+        await store.shutdown()
+
+    asyncio.run(_run())
+
+
+def test_trace_store_keeps_rows_queued_when_every_row_fails():
+    async def _run():
+        store = _RecordingTraceStore(write_behind=True, flush_interval_ms=60000, flush_max_rows=10, flush_max_attempts=1)
+        store.release.set()
+        await store.startup()
+        store.poisoned = {"f0", "f1"}
+        await _persist(store, "f0")
+        await _persist(store, "f1")
+
+        assert await store.flush() is False
+        metrics = store.health()["write_behind"]
+        assert metrics["queue_length"] == 2
+        assert metrics["dead_lettered_rows"] == 0
+
+        store.poisoned = set()
+        await store.shutdown()
+        assert store.batches == [["f0", "f1"]]
+
+    asyncio.run(_run())
+
+
+def test_trace_write_behind_is_opt_in(monkeypatch):
+    monkeypatch.delenv("AGENT_TRACE_WRITE_BEHIND", raising=False)
+    with _make_client(_ScenarioToolbox()) as client:
+        assert client.get("/health").json()["trace_store"]["write_behind"]["enabled"] is False
+        assert client.app.state.trace_store._write_behind_requested is False
+
+
+def test_trace_memory_fallback_evicts_least_recently_used_and_expired_rows():
+    async def _run():
+        store = AgentTraceStore(
+            "postgresql://unused",
+            allow_memory_fallback=True,
+            memory_ttl_seconds=60,
+            memory_max_items=2,
+        )
+        await _persist(store, "c0")
+        await _persist(store, "c1")
+        assert await store.load_trace("c0") is not None
+        await _persist(store, "c2")
+        assert await store.load_trace("c1") is None
+        assert await store.load_trace("c0") is not None
+        assert store.health()["memory_items"] == 2
+
+        store._memory.expire(now_ts=datetime.now(timezone.utc).timestamp() + 120)
+        assert store.health()["memory_items"] == 0
+
+        sized = AgentTraceStore(
+            "postgresql://unused",
+            allow_memory_fallback=True,
+            memory_ttl_seconds=3600,
+            memory_max_items=100,
+            memory_max_bytes=1200,
+        )
+        for idx in range(10):
+            await _persist(sized, f"d{idx}")
+        health = sized.health()
+        assert 1 <= health["memory_items"] < 10
+        assert health["memory_bytes"] <= 1200
+        assert await sized.load_trace("d9") is not None
+
+    asyncio.run(_run())
+
+
+def test_gcra_rate_limiter_limits_per_client_and_evicts_idle_buckets(monkeypatch):
+    clock = {"now": 1_000.0}
+    monkeypatch.setattr("agent_gateway.time.time", lambda: clock["now"])
+
+    async def _run():
+        limiter = GcraRateLimiter(limit=3, window_seconds=60)
+        for _ in range(3):
+            await limiter.check("alice")
+        with pytest.raises(HTTPException) as exc_info:
+            await limiter.check("alice")
+        assert exc_info.value.status_code == 429
+        assert int(exc_info.value.headers["Retry-After"]) >= 1
+        await limiter.check("bob")
+
+        clock["now"] += 20
+        await limiter.check("alice")
+        clock["now"] += 120
+        await limiter.check("carol")
+        assert limiter.metrics()["local_buckets"] == 1
+
+    asyncio.run(_run())
+
+
+def test_gcra_rate_limiter_uses_one_redis_round_trip_and_skips_it_on_local_rejection():
+    class _FakeRedis:
+        def __init__(self):
+            self.calls = 0
+
+        def register_script(self, script):
+            async def _run(keys, args):
+                self.calls += 1
+                return 0 if self.calls == 1 else 1500
+
+            return _run
+
+    async def _run():
+        redis_client = _FakeRedis()
+        limiter = GcraRateLimiter(limit=2, window_seconds=60, redis_client=redis_client)
+        await limiter.check("alice")
+        assert redis_client.calls == 1
+        with pytest.raises(HTTPException):
+            await limiter.check("alice")
+        assert redis_client.calls == 2
+        with pytest.raises(HTTPException):
+            await limiter.check("alice")
+        assert redis_client.calls == 2
+        metrics = limiter.metrics()
+        assert metrics["backend"] == "redis"
+        assert metrics["redis_rejections"] == 1
+        assert metrics["local_rejections"] == 1
+
+    asyncio.run(_run())
+
+
 def test_agent_analyze_horizon_forecasts_do_not_change_with_question_wording():
     with _make_client(_QuerySensitiveToolbox(direction=1, probability=0.69, technical_state="bullish")) as client:
         base_payload = {
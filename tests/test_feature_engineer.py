@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import pearsonr
+
+import feature_engineer
+from feature_engineer import MI_CHUNK_FEATURES, FeatureEngineer
+
+
+def _selection_inputs(n_rows=160, n_features=MI_CHUNK_FEATURES + 5, seed=13):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, n_features)), columns=[f"f{i}" for i in range(n_features)])
+    # 离散取值的列存在大量并列值，互信息的扰动噪声会影响其评分
+    X.iloc[:, 1::2] = rng.integers(0, 3, size=(n_rows, len(X.columns[1::2]))).astype(float)
+    y = pd.Series(0.6 * X["f0"] - 0.3 * X["f3"] ** 2 + rng.normal(0.0, 0.5, size=n_rows))
+    return X, y
+
+
+def test_select_features_correlation_matches_pearsonr_per_column():
+    X, y = _selection_inputs()
+    results, top_features = FeatureEngineer().select_features(X, y, n_jobs=1, cache_dir=None, top_k=5)
+
+    expected = [pearsonr(X[col], y)[0] for col in X.columns]
+    np.testing.assert_allclose(results["Correlation"].to_numpy(), expected, rtol=1e-10, atol=1e-12)
+    assert len(top_features) == 5 and "f0" in top_features
+
+
+def test_select_features_scores_do_not_depend_on_worker_count():
+    X, y = _selection_inputs()
+    single, _ = FeatureEngineer().select_features(X, y, n_jobs=1, cache_dir=None)
+    several, _ = FeatureEngineer().select_features(X, y, n_jobs=3, cache_dir=None)
+    np.testing.assert_array_equal(several["MI_Score"].to_numpy(), single["MI_Score"].to_numpy())
+
+
+def test_select_features_second_call_reuses_cached_scores(tmp_path, monkeypatch, caplog, capsys):
+    X, y = _selection_inputs()
+    first, first_top = FeatureEngineer().select_features(X, y, n_jobs=1, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("*.csv"))) == 1
+
+    def _no_scoring(*args, **kwargs):
+        raise AssertionError("feature scoring should be served from the cache")
+
+    monkeypatch.setattr(feature_engineer, "mutual_info_regression", _no_scoring)
+    monkeypatch.setattr(feature_engineer, "RandomForestRegressor", _no_scoring)
+    capsys.readouterr()
+    with caplog.at_level("INFO", logger="goldensense.feature_engineer"):
+        cached, cached_top = FeatureEngineer().select_features(X, y, n_jobs=1, cache_dir=tmp_path)
+
+    assert capsys.readouterr().out == ""
+    assert [record.getMessage().split()[0] for record in caplog.records] == ["feature_selection_cache_hit"]
+
+    assert cached_top == first_top
+    pd.testing.assert_frame_equal(cached, first, check_exact=False, rtol=1e-12)
+    with pytest.raises(AssertionError):
+        FeatureEngineer().select_features(X.iloc[1:], y.iloc[1:], n_jobs=1, cache_dir=tmp_path)
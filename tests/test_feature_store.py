@@ -0,0 +1,169 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_engineer import FeatureEngineer
+from feature_store import FEATURE_WARMUP_ROWS, FeatureStore, backfill_feature_store
+
+
+def _market_frame(periods=220):
+    idx = pd.date_range("2024-01-01", periods=periods, freq="D")
+    rng = np.random.default_rng(7)
+    gold = 2000.0 + np.cumsum(rng.normal(0.0, 5.0, size=periods))
+    return pd.DataFrame(
+        {
+            "Gold": gold,
+            "Silver": gold / 80.0 + rng.normal(0.0, 0.1, size=periods),
+            "USD_Index": 100.0 + np.cumsum(rng.normal(0.0, 0.2, size=periods)),
+            "Crude_Oil": 75.0 + np.cumsum(rng.normal(0.0, 0.5, size=periods)),
+            "10Y_Bond": 4.0 + np.cumsum(rng.normal(0.0, 0.02, size=periods)),
+            "2Y_Bond": 4.8 + np.cumsum(rng.normal(0.0, 0.02, size=periods)),
+        },
+        index=idx,
+    )
+
+
+def test_append_read_keeps_latest_write_and_partitions_by_month(tmp_path):
+    store = FeatureStore(tmp_path, version="test")
+    idx = pd.date_range("2024-01-30", periods=4, freq="D")
+    store.append(pd.DataFrame({"a": [1.0, 2.0, 3.0, 4.0], "b": [0.0, 0.0, 0.0, 0.0]}, index=idx))
+    store.append(pd.DataFrame({"a": [20.0], "b": [1.0]}, index=idx[1:2]))
+
+    months = sorted(p.name for p in store.version_dir.glob("month=*"))
+    assert months == ["month=2024-01", "month=2024-02"]
+
+    frame = store.read()
+    assert list(frame.index) == list(idx)
+    assert frame["a"].tolist() == [1.0, 20.0, 3.0, 4.0]
+    assert store.read(start="2024-02-01")["a"].tolist() == [3.0, 4.0]
+
+    with pytest.raises(ValueError):
+        store.append(pd.DataFrame({"a": [1.0]}, index=idx[:1]))
+    assert FeatureStore(tmp_path, version="other").read().empty
+
+
+def test_incremental_backfill_matches_full_history_features(tmp_path):
+    market = _market_frame()
+    engineer = FeatureEngineer()
+
+    full = FeatureStore(tmp_path / "full", version="test")
+    assert backfill_feature_store(full, market, engineer=engineer) > 0
+
+    incremental = FeatureStore(tmp_path / "incremental", version="test")
+    backfill_feature_store(incremental, market.iloc[:150], engineer=engineer)
+    added = backfill_feature_store(incremental, market, engineer=engineer)
+    assert added == len(market) - 150
+    assert backfill_feature_store(incremental, market, engineer=engineer) == 0
+
+    expected = full.read()
+    actual = incremental.read()
+    assert list(actual.columns) == list(expected.columns)
+    assert list(actual.index) == list(expected.index)
+    np.testing.assert_allclose(actual.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-9)
+
+
+def test_one_bar_append_only_computes_the_new_date_plus_warmup(tmp_path, monkeypatch):
+    market = _market_frame()
+    engineer = FeatureEngineer()
+    store = FeatureStore(tmp_path, version="test")
+    backfill_feature_store(store, market.iloc[:-1], engineer=engineer)
+
+    seen_rows = []
+    prepare = engineer.prepare_inference_data
+
+    def _spy(raw_data, daily_signals=None, n_rows=60):
+        seen_rows.append(len(raw_data))
+        return prepare(raw_data, daily_signals, n_rows=n_rows)
+
+    monkeypatch.setattr(engineer, "prepare_inference_data", _spy)
+    assert backfill_feature_store(store, market, engineer=engineer) == 1
+    assert seen_rows == [FEATURE_WARMUP_ROWS + 1]
+    assert backfill_feature_store(store, market, engineer=engineer) == 0
+    assert seen_rows == [FEATURE_WARMUP_ROWS + 1]
+
+
+def test_backfill_skips_dates_on_or_after_until(tmp_path):
+    market = _market_frame()
+    store = FeatureStore(tmp_path, version="test")
+    until = market.index[-1]
+    backfill_feature_store(store, market, until=until)
+    assert store.stored_dates().max() == market.index[-2]
+
+
+def test_appends_compact_partitions_and_keep_a_date_index(tmp_path, monkeypatch):
+    store = FeatureStore(tmp_path, version="test")
+    idx = pd.date_range("2024-01-28", periods=8, freq="D")
+    for pos in range(len(idx)):
+        store.append(pd.DataFrame({"a": [float(pos)]}, index=idx[pos:pos + 1]))
+    store.append(pd.DataFrame({"a": [99.0]}, index=idx[:1]))
+
+    for partition in store.version_dir.glob("month=*"):
+        assert len(list(partition.glob("part-*.parquet"))) == 1
+    assert store.read()["a"].tolist() == [99.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+
+    def _no_parquet(*args, **kwargs):
+        raise AssertionError("stored_dates must not read part files")
+
+    monkeypatch.setattr(pd, "read_parquet", _no_parquet)
+    assert list(store.stored_dates()) == list(idx)
+    assert list(FeatureStore(tmp_path, version="test").stored_dates()) == list(idx)
+    monkeypatch.undo()
+
+    (store.version_dir / "_dates.json").unlink()
+    assert list(FeatureStore(tmp_path, version="test").stored_dates()) == list(idx)
+
+
+def test_concurrent_backfills_compute_missing_dates_once(tmp_path, monkeypatch):
+    market = _market_frame()
+    engineer = FeatureEngineer()
+    calls = []
+    prepare = engineer.prepare_inference_data
+
+    def _spy(raw_data, daily_signals=None, n_rows=60):
+        calls.append(len(raw_data))
+        return prepare(raw_data, daily_signals, n_rows=n_rows)
+
+    monkeypatch.setattr(engineer, "prepare_inference_data", _spy)
+    written = []
+    start = threading.Barrier(4)
+
+    def _backfill():
+        store = FeatureStore(tmp_path, version="test")
+        start.wait()
+        written.append(backfill_feature_store(store, market, engineer=engineer))
+
+    threads = [threading.Thread(target=_backfill) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(written) == [0, 0, 0, len(market) - FEATURE_WARMUP_ROWS]
+    assert len(calls) == 1
+    assert len(FeatureStore(tmp_path, version="test").read()) == len(market) - FEATURE_WARMUP_ROWS
+
+
+def test_store_features_match_full_history_pipeline_with_news_signals(tmp_path):
+    market = _market_frame()
+    rng = np.random.default_rng(5)
+    signal_days = market.index[rng.choice(len(market), size=60, replace=False)]
+    daily_signals = pd.DataFrame(
+        rng.normal(0.0, 1.0, size=(len(signal_days), 5)),
+        index=signal_days,
+        columns=["total", "inflation", "rates", "risk", "fx"],
+    ).sort_index()
+    engineer = FeatureEngineer()
+
+    store = FeatureStore(tmp_path, version="test")
+    backfill_feature_store(store, market.iloc[:170], daily_signals.copy(), engineer=engineer)
+    backfill_feature_store(store, market, daily_signals.copy(), engineer=engineer)
+    stored = store.read()
+
+    full = engineer.prepare_inference_data(market, daily_signals.copy(), n_rows=len(market))
+    assert stored.index[0] == market.index[FEATURE_WARMUP_ROWS]
+    assert set(stored.index) == set(full.index[full.index >= market.index[FEATURE_WARMUP_ROWS]])
+    expected = full.loc[stored.index, stored.columns]
+    assert expected["News_Total"].abs().sum() > 0
+    np.testing.assert_allclose(stored.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-9)
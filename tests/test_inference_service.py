@@ -1,8 +1,14 @@
+import asyncio
+import json
+import threading
 import time
+from dataclasses import replace
 from datetime import UTC, datetime, timedelta
 
+import httpx
 import numpy as np
 import pandas as pd
+import pytest
 from fastapi.testclient import TestClient
 
 from feature_engineer import FeatureEngineer
@@ -82,6 +88,24 @@ class _FakeModel:
         return np.array([[0.01, 0.0, -0.005, 0.002]], dtype=float)
 
 
+class _RowwiseFakeModel(_FakeModel):
+    def __init__(self):
+        super().__init__()
+        self.l1_calls = []
+
+        class _X:
+            feature_names_in_ = self.xgb.feature_names_in_
+
+            def predict(self, X_tab):
+                return np.full(len(X_tab), 0.005, dtype=float)
+
+        self.xgb = _X()
+
+    def _get_l1_predictions(self, X_tab, X_seq):
+        self.l1_calls.append((X_tab.shape, X_seq.shape))
+        return np.tile(np.array([0.01, 0.0, -0.005, 0.002], dtype=float), (len(X_tab), 1))
+
+
 class _CountingMarketDataLoader(_FakeMarketDataLoader):
     def __init__(self):
         self.fetch_calls = 0
@@ -91,6 +115,17 @@ class _CountingMarketDataLoader(_FakeMarketDataLoader):
         return super().fetch_data(period=period, interval=interval)
 
 
+class _CountingFeatureEngineer(FeatureEngineer):
+    def __init__(self):
+        super().__init__()
+        self.prepare_calls = 0
+
+    def prepare_inference_data(self, raw_data, daily_signals=None, n_rows=60):
+        self.prepare_calls += 1
+        time.sleep(0.05)
+        return super().prepare_inference_data(raw_data, daily_signals, n_rows=n_rows)
+
+
 class _FailingLoadModel(_FakeModel):
     def __init__(self):
         super().__init__()
@@ -334,3 +369,496 @@ def test_model_load_cooldown_suppresses_repeated_checkpoint_attempts(monkeypatch
     assert first.status_code == 200
     assert second.status_code == 200
     assert model.load_calls == 0
+
+
+def test_range_forecast_streams_ndjson_from_one_batched_pass():
+    model = _RowwiseFakeModel()
+    market_loader = _CountingMarketDataLoader()
+    app = create_app(
+        model_t1=model,
+        market_loader=market_loader,
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+        model_checkpoints_dir_t7="missing-t7",
+    )
+    client = TestClient(app)
+
+    end = datetime.now(UTC)
+    resp = client.post(
+        "/api/v1/forecast/range",
+        json={
+            "asset_symbol": "XAUUSD",
+            "horizons": ["T+1", "T+7", "T+30"],
+            "start": (end - timedelta(days=20)).isoformat(),
+            "end": end.isoformat(),
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+
+    assert len(lines) == 21
+    assert [line["current_timestamp"] for line in lines] == sorted(line["current_timestamp"] for line in lines)
+    assert all(set(line["forecasts"].keys()) == {"T+1", "T+7", "T+30"} for line in lines)
+    assert all(line["forecasts"]["T+1"]["forecast_basis"] == "ensemble_model" for line in lines)
+    assert all(line["forecasts"]["T+7"]["model_status"] == "heuristic_proxy" for line in lines)
+    assert all(line["forecasts"]["T+30"]["model_status"] == "not_applicable" for line in lines)
+    assert model.l1_calls == [((21, 15), (21, 60, 4))]
+    assert market_loader.fetch_calls == 1
+
+
+def test_range_forecast_rejects_inverted_range():
+    app = create_app(
+        model_t1=_FakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+    )
+    client = TestClient(app)
+
+    end = datetime.now(UTC)
+    resp = client.post(
+        "/api/v1/forecast/range",
+        json={
+            "asset_symbol": "XAUUSD",
+            "horizons": ["T+1"],
+            "start": end.isoformat(),
+            "end": (end - timedelta(days=5)).isoformat(),
+        },
+    )
+    assert resp.status_code == 400
+    assert resp.json()["error_code"] == "invalid_range"
+
+
+def test_concurrent_forecasts_are_coalesced_into_one_model_batch(monkeypatch):
+    monkeypatch.setenv("INFERENCE_BATCH_WINDOW_MS", "50")
+    model = _RowwiseFakeModel()
+    app = create_app(
+        model_t1=model,
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+    )
+    payload = {
+        "asset_symbol": "XAUUSD",
+        "horizon": "T+1",
+        "current_timestamp": datetime.now(UTC).isoformat(),
+    }
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/api/v1/forecast", json=payload) for _ in range(4)))
+
+    responses = asyncio.run(_run())
+
+    assert all(resp.status_code == 200 for resp in responses)
+    assert all(resp.json()["forecast_basis"] == "ensemble_model" for resp in responses)
+    assert model.l1_calls == [((4, 15), (4, 60, 4))]
+    metrics = TestClient(app).get("/health").json()["forecast_batcher"]
+    assert metrics["batches"] == 1
+    assert metrics["max_batch_size"] == 4
+    assert metrics["queue_depth"] == 0
+
+
+def test_range_forecast_and_batched_forecasts_never_share_the_model_concurrently():
+    class _OverlapTrackingModel(_RowwiseFakeModel):
+        def __init__(self):
+            super().__init__()
+            self.counter_lock = threading.Lock()
+            self.active = 0
+            self.max_active = 0
+            self.range_entered = threading.Event()
+            self.forecast_entered = threading.Event()
+
+        def _get_l1_predictions(self, X_tab, X_seq):
+            with self.counter_lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            if len(X_tab) > 1:
+                self.range_entered.set()
+                self.forecast_entered.wait(timeout=1.0)
+            else:
+                self.forecast_entered.set()
+            with self.counter_lock:
+                self.active -= 1
+            return super()._get_l1_predictions(X_tab, X_seq)
+
+    model = _OverlapTrackingModel()
+    app = create_app(
+        model_t1=model,
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+        model_checkpoints_dir_t7="missing-t7",
+    )
+    end = datetime.now(UTC)
+    range_payload = {
+        "asset_symbol": "XAUUSD",
+        "horizons": ["T+1"],
+        "start": (end - timedelta(days=10)).isoformat(),
+        "end": end.isoformat(),
+    }
+    forecast_payload = {"asset_symbol": "XAUUSD", "horizon": "T+1", "current_timestamp": end.isoformat()}
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            range_request = asyncio.create_task(client.post("/api/v1/forecast/range", json=range_payload))
+            assert await asyncio.to_thread(model.range_entered.wait, 5)
+            forecast = await client.post("/api/v1/forecast", json=forecast_payload)
+            return await range_request, forecast
+
+    range_resp, forecast_resp = asyncio.run(_run())
+
+    assert range_resp.status_code == forecast_resp.status_code == 200
+    assert forecast_resp.json()["forecast_basis"] == "ensemble_model"
+    assert [shape[0][0] for shape in model.l1_calls] == [11, 1]
+    assert model.max_active == 1
+
+
+class _DatedSignalsNewsLoader(_FakeNewsDataLoader):
+    def get_daily_signals(self, scored_items):
+        idx = _FakeMarketDataLoader().fetch_data().index
+        rng = np.random.default_rng(4)
+        return pd.DataFrame(
+            rng.normal(0.0, 1.0, size=(len(idx), 5)),
+            index=idx,
+            columns=["total", "inflation", "rates", "risk", "fx"],
+        )
+
+
+class _RecordingFeatureEngineer(FeatureEngineer):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def prepare_inference_data(self, raw_data, daily_signals=None, n_rows=60):
+        last_signal = pd.to_datetime(daily_signals.index).max() if daily_signals is not None else None
+        self.calls.append((len(raw_data), raw_data.index[-1], last_signal))
+        return super().prepare_inference_data(raw_data, daily_signals, n_rows=n_rows)
+
+
+class _InputRecordingModel(_RowwiseFakeModel):
+    def __init__(self):
+        super().__init__()
+        self.inputs = []
+
+    def _get_l1_predictions(self, X_tab, X_seq):
+        self.inputs.append((np.array(X_tab, dtype=float), np.array(X_seq, dtype=float)))
+        return super()._get_l1_predictions(X_tab, X_seq)
+
+
+def test_range_forecast_builds_each_date_like_a_single_forecast():
+    model = _InputRecordingModel()
+    engineer = _RecordingFeatureEngineer()
+    app = create_app(
+        model_t1=model,
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_DatedSignalsNewsLoader(),
+        feature_engineer=engineer,
+        model_checkpoints_dir_t7="missing-t7",
+    )
+    client = TestClient(app)
+    days = _FakeMarketDataLoader().fetch_data().index
+    dates = days[-15:-10]
+
+    resp = client.post(
+        "/api/v1/forecast/range",
+        json={
+            "asset_symbol": "XAUUSD",
+            "horizons": ["T+1"],
+            "start": dates[0].tz_localize(UTC).isoformat(),
+            "end": dates[-1].tz_localize(UTC).isoformat(),
+        },
+    )
+    assert resp.status_code == 200
+    assert len(resp.text.splitlines()) == len(dates)
+    assert [(rows, last) for rows, last, _ in engineer.calls] == [(140, date) for date in dates]
+    assert all(last_signal == last for _, last, last_signal in engineer.calls)
+    range_tab, range_seq = model.inputs[0]
+
+    single = client.post(
+        "/api/v1/forecast",
+        json={"asset_symbol": "XAUUSD", "horizon": "T+1", "current_timestamp": dates[2].tz_localize(UTC).isoformat()},
+    )
+    assert single.status_code == 200
+    single_tab, single_seq = model.inputs[-1]
+    np.testing.assert_array_equal(range_tab[2:3], single_tab)
+    np.testing.assert_array_equal(range_seq[2:3], single_seq)
+
+
+async def _stream_post(app, path, payload, on_chunk):
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            on_chunk(message["body"])
+
+    await app(scope, receive, send)
+
+
+def test_range_forecast_streams_lines_per_model_chunk(monkeypatch):
+    monkeypatch.setenv("INFERENCE_BATCH_MAX_SIZE", "4")
+    model = _RowwiseFakeModel()
+    app = create_app(
+        model_t1=model,
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+        model_checkpoints_dir_t7="missing-t7",
+    )
+    end = datetime.now(UTC)
+    calls_seen_per_line = []
+
+    def _on_chunk(chunk):
+        calls_seen_per_line.extend([len(model.l1_calls)] * chunk.count(b"\n"))
+
+    payload = {
+        "asset_symbol": "XAUUSD",
+        "horizons": ["T+1"],
+        "start": (end - timedelta(days=9)).isoformat(),
+        "end": end.isoformat(),
+    }
+    asyncio.run(_stream_post(app, "/api/v1/forecast/range", payload, _on_chunk))
+
+    assert [shape[0][0] for shape in model.l1_calls] == [4, 4, 2]
+    assert calls_seen_per_line == [1] * 4 + [2] * 4 + [3] * 2
+
+
+def test_input_preparation_is_single_flight_per_as_of_key():
+    engineer = _CountingFeatureEngineer()
+    market_loader = _CountingMarketDataLoader()
+    app = create_app(
+        model_t1=_FakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=market_loader,
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=engineer,
+    )
+    today = datetime.now(UTC)
+    payloads = [
+        {"asset_symbol": "XAUUSD", "horizon": "T+1", "current_timestamp": today.isoformat()},
+        {"asset_symbol": "XAUUSD", "horizon": "T+7", "current_timestamp": today.isoformat()},
+        {"asset_symbol": "XAUUSD", "horizon": "T+30", "current_timestamp": today.isoformat()},
+        {
+            "asset_symbol": "XAUUSD",
+            "horizon": "T+1",
+            "current_timestamp": (today - timedelta(days=3)).isoformat(),
+        },
+    ]
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/api/v1/forecast", json=payload) for payload in payloads))
+
+    responses = asyncio.run(_run())
+
+    assert all(resp.status_code == 200 for resp in responses)
+    assert engineer.prepare_calls == 2
+    assert market_loader.fetch_calls == 1
+    assert app.state.inference_input_inflight["prepared"] == {}
+
+
+def test_stale_prepared_input_is_served_while_refreshing_in_background():
+    engineer = _CountingFeatureEngineer()
+    app = create_app(
+        model_t1=_FakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=engineer,
+    )
+    current = datetime.now(UTC)
+    payload = {"asset_symbol": "XAUUSD", "horizon": "T+1", "current_timestamp": current.isoformat()}
+    prepared_cache = app.state.inference_input_cache["prepared"]
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/v1/forecast", json=payload)
+            key = next(iter(prepared_cache))
+            _, prepared = prepared_cache[key]
+            prepared_cache[key] = (time.monotonic() - 1.0, prepared)
+            second = await client.post("/api/v1/forecast", json=payload)
+            await asyncio.gather(*app.state.inference_input_inflight["prepared"].values())
+            return first, second, key
+
+    first, second, key = asyncio.run(_run())
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert engineer.prepare_calls == 2
+    assert prepared_cache[key][0] > time.monotonic()
+
+
+def test_prepared_cache_hit_reuses_read_only_inputs():
+    app = create_app(
+        model_t1=_FakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+    )
+    payload = {
+        "asset_symbol": "XAUUSD",
+        "horizon": "T+1",
+        "current_timestamp": datetime.now(UTC).isoformat(),
+    }
+    prepared_cache = app.state.inference_input_cache["prepared"]
+
+    with TestClient(app) as client:
+        first = client.post("/api/v1/forecast", json=payload)
+        prepared = next(iter(prepared_cache.values()))[1]
+        second = client.post("/api/v1/forecast", json=payload)
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert next(iter(prepared_cache.values()))[1] is prepared
+    assert prepared.X_seq.shape == (1, 60, 4)
+    assert prepared.X_seq.flags.writeable is False
+    assert len(prepared._tabular_rows) == 1
+    with pytest.raises(ValueError):
+        prepared.X_features.iloc[0, 0] = 0.0
+    with pytest.raises(ValueError):
+        prepared.market_df.iloc[0, 0] = 0.0
+
+
+def test_repeated_forecast_is_served_from_result_cache_until_inputs_change():
+    model = _RowwiseFakeModel()
+    app = create_app(
+        model_t1=model,
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+    )
+    payload = {
+        "asset_symbol": "XAUUSD",
+        "horizon": "T+1",
+        "current_timestamp": datetime.now(UTC).isoformat(),
+    }
+
+    with TestClient(app) as client:
+        first = client.post("/api/v1/forecast", json=payload)
+        second = client.post("/api/v1/forecast", json=payload)
+        assert len(model.l1_calls) == 1
+
+        prepared_cache = app.state.inference_input_cache["prepared"]
+        key, (_, prepared) = next(iter(prepared_cache.items()))
+        prepared_cache[key] = (time.monotonic() + 60.0, replace(prepared, fingerprint="changed"))
+        third = client.post("/api/v1/forecast", json=payload)
+        metrics = client.get("/health").json()["forecast_cache"]
+
+    assert first.status_code == 200
+    assert second.content == first.content
+    assert third.status_code == 200
+    assert len(model.l1_calls) == 2
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 2
+
+
+def test_background_refresher_precomputes_all_horizons(monkeypatch):
+    monkeypatch.setenv("INFERENCE_FORECAST_REFRESH_SECONDS", "60")
+    app = create_app(
+        model_t1=_FakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+        start_background_task=True,
+    )
+
+    with TestClient(app):
+        deadline = time.monotonic() + 3.0
+        while len(app.state.forecast_cache) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    assert {key[0] for key in app.state.forecast_cache} == {"T+1", "T+7", "T+30"}
+
+
+def test_explanations_are_opt_out_and_cached_by_feature_row():
+    app = create_app(
+        model_t1=_RowwiseFakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+    )
+    payload = {
+        "asset_symbol": "XAUUSD",
+        "horizon": "T+1",
+        "current_timestamp": datetime.now(UTC).isoformat(),
+    }
+
+    with TestClient(app) as client:
+        lean = client.post("/api/v1/forecast", json={**payload, "include_explanations": False})
+        after_lean = client.get("/health").json()["forecast_cache"]["explanations"]
+        explained = client.post("/api/v1/forecast", json=payload)
+        app.state.forecast_cache.clear()
+        again = client.post("/api/v1/forecast", json=payload)
+        stats = client.get("/health").json()["forecast_cache"]["explanations"]
+
+    assert lean.status_code == 200
+    assert lean.json()["forecast_basis"] == "ensemble_model"
+    assert lean.json()["feature_importance_top_3"] == []
+    assert after_lean == {"items": 0, "hits": 0, "misses": 0}
+    assert len(explained.json()["feature_importance_top_3"]) == 3
+    assert again.json()["feature_importance_top_3"] == explained.json()["feature_importance_top_3"]
+    assert stats == {"items": 1, "hits": 1, "misses": 1}
+
+
+def test_feature_store_backs_closed_dates_and_keeps_forecast_contract(monkeypatch, tmp_path):
+    monkeypatch.setenv("INFERENCE_FEATURE_STORE_DIR", str(tmp_path))
+    app = create_app(
+        model_t1=_FakeModel(),
+        model_t7=_FakeModel(),
+        market_loader=_FakeMarketDataLoader(),
+        news_loader=_FakeNewsDataLoader(),
+        feature_engineer=FeatureEngineer(),
+    )
+    client = TestClient(app)
+
+    resp = client.post(
+        "/api/v1/forecast",
+        json={"asset_symbol": "XAUUSD", "horizon": "T+1", "current_timestamp": datetime.now(UTC).isoformat()},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["forecast_basis"] == "ensemble_model"
+
+    health = client.get("/health").json()["feature_store"]
+    assert health["enabled"] is True
+    assert health["last_error"] is None
+
+    from feature_store import FeatureStore
+
+    stored_dates = FeatureStore(tmp_path).stored_dates()
+    assert len(stored_dates) > 0
+    today = pd.Timestamp(datetime.now(UTC).date())
+    assert stored_dates.max() < today
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timezone
 
 import numpy as np
@@ -7,7 +8,24 @@ import pandas as pd
 from fastapi.testclient import TestClient
 
 from data_loader import MarketDataLoader
-from market_snapshot_service import MarketSnapshotConfig, build_market_snapshot, create_app
+from market_snapshot_service import (
+    MARKET_INDICATOR_STATE_KEY,
+    IncrementalIndicatorState,
+    MarketSnapshotConfig,
+    SnapshotPersistence,
+    _atr_proxy_pct,
+    _macd,
+    _moving_average,
+    _rsi,
+    _refresh_history,
+    _snapshot_window,
+    _with_freshness,
+    build_gold_price_history,
+    build_market_snapshot,
+    build_synthetic_market_snapshot,
+    create_app,
+)
+from service_contracts import MarketSnapshotResponse
 
 
 class _FakeMarketLoader:
@@ -158,3 +176,352 @@ def test_market_readiness_fails_without_snapshot_when_fallback_disabled():
 def test_yfinance_loader_uses_2y_yield_instead_of_13w_bill():
     loader = MarketDataLoader()
     assert loader.tickers["2Y_Bond"] == "2YY=F"
+
+
+class _CountingMarketLoader(_FakeMarketLoader):
+    def __init__(self):
+        self.fetch_calls = 0
+
+    def fetch_data(self, period="6mo", interval="1d"):
+        self.fetch_calls += 1
+        return super().fetch_data(period=period, interval=interval)
+
+
+def test_market_snapshot_refresh_is_debounced():
+    loader = _CountingMarketLoader()
+    app = create_app(
+        market_loader=loader,
+        config=MarketSnapshotConfig(refresh_debounce_seconds=60),
+        start_background_task=False,
+    )
+    with TestClient(app) as client:
+        first = client.post("/api/v1/market/snapshot/refresh")
+        second = client.post("/api/v1/market/snapshot/refresh")
+    assert first.status_code == second.status_code == 200
+    assert second.json()["latest_price"] == first.json()["latest_price"]
+    assert loader.fetch_calls == 1
+
+
+def test_with_freshness_updates_age_fields_without_mutating_source_snapshot():
+    snapshot = build_synthetic_market_snapshot(stale_after_seconds=180, degraded_reason=None)
+    later = snapshot.as_of + pd.Timedelta(seconds=240)
+    aged = _with_freshness(snapshot, stale_after_seconds=180, now=later)
+
+    assert aged.freshness_seconds == aged.source_freshness_seconds == 240
+    assert aged.is_stale and aged.feature_summary.is_stale
+    assert aged.feature_summary.stale_age_seconds == 240
+    assert aged.status == "degraded" and aged.degraded_reason == "synthetic_fallback"
+    assert snapshot.feature_summary.stale_age_seconds != 240
+    assert type(aged).model_validate(aged.model_dump()) == aged
+
+
+def test_market_indicators_reuse_serialized_bytes_and_report_current_age(monkeypatch):
+    clock = {"now": datetime.now(timezone.utc)}
+
+    class _MovingDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock["now"]
+
+    monkeypatch.setattr("market_snapshot_service.datetime", _MovingDatetime)
+    app = create_app(market_loader=_FakeMarketLoader(), start_background_task=False)
+    with TestClient(app) as client:
+        client.post("/api/v1/market/snapshot/refresh")
+        first = client.get("/api/v1/market/indicators/current")
+        cached = app.state.serialized["indicators"]
+        same_second = client.get("/api/v1/market/indicators/current")
+        clock["now"] += pd.Timedelta(seconds=5)
+        later = client.get("/api/v1/market/indicators/current")
+
+    assert first.status_code == same_second.status_code == later.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    assert app.state.serialized["indicators"].body is cached.body
+    assert same_second.content == first.content
+    assert later.headers["etag"] == first.headers["etag"]
+    age = first.json()["freshness_seconds"]
+    assert later.json()["freshness_seconds"] == age + 5
+    first_groups = {group["id"]: group["freshness_seconds"] for group in first.json()["groups"]}
+    later_groups = {group["id"]: group["freshness_seconds"] for group in later.json()["groups"]}
+    assert len(first_groups) == 4
+    assert {gid for gid, value in first_groups.items() if value == age} == {
+        gid for gid, value in later_groups.items() if value == age + 5
+    }
+
+
+def test_market_snapshot_bytes_keyed_on_as_of_with_age_patched_per_response(monkeypatch):
+    clock = {"now": datetime.now(timezone.utc)}
+
+    class _MovingDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock["now"]
+
+    monkeypatch.setattr("market_snapshot_service.datetime", _MovingDatetime)
+    app = create_app(market_loader=_FakeMarketLoader(), start_background_task=False)
+    with TestClient(app) as client:
+        client.post("/api/v1/market/snapshot/refresh")
+        first = client.get("/api/v1/market/snapshot/latest")
+        cached = app.state.serialized["snapshot"]
+        clock["now"] += pd.Timedelta(seconds=7)
+        later = client.get("/api/v1/market/snapshot/latest")
+        revalidated = client.get("/api/v1/market/snapshot/latest", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == later.status_code == 200
+    assert app.state.serialized["snapshot"] is cached
+    assert first.headers["etag"] == later.headers["etag"] == cached.etag
+    assert cached.etag.startswith("W/")
+    assert revalidated.status_code == 304
+    assert b"9007199254740991" not in later.content
+    aged = MarketSnapshotResponse.model_validate_json(later.content)
+    expected_age = MarketSnapshotResponse.model_validate_json(first.content).freshness_seconds + 7
+    assert aged.freshness_seconds == aged.source_freshness_seconds == expected_age
+    assert aged.feature_summary.stale_age_seconds == expected_age
+
+
+def test_market_indicators_materialized_on_refresh_and_served_with_etag():
+    app = create_app(market_loader=_FakeMarketLoader(), start_background_task=False)
+    with TestClient(app) as client:
+        client.post("/api/v1/market/snapshot/refresh")
+        materialized = app.state.serialized["indicators"]
+        first = client.get("/api/v1/market/indicators/current")
+        revalidated = client.get(
+            "/api/v1/market/indicators/current",
+            headers={"If-None-Match": f'W/"other", {first.headers["etag"]}'},
+        )
+        mismatched = client.get("/api/v1/market/indicators/current", headers={"If-None-Match": '"other"'})
+
+    assert first.status_code == 200
+    assert first.headers["etag"] == materialized.etag
+    assert b"9007199254740991" in materialized.body
+    assert b"9007199254740991" not in first.content
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == materialized.etag
+    assert mismatched.status_code == 200
+    assert mismatched.headers["etag"] == materialized.etag
+
+
+def test_gold_history_materialized_once_and_reused_until_data_changes():
+    class _FixedHistoryLoader(_JumpMarketLoader):
+        def __init__(self):
+            self.frame = super().fetch_data()
+            self.fetch_calls = 0
+
+        def fetch_data(self, period="6mo", interval="1d"):
+            self.fetch_calls += 1
+            return self.frame
+
+    loader = _FixedHistoryLoader()
+    app = create_app(market_loader=loader, start_background_task=False)
+    with TestClient(app) as client:
+        first = client.get("/api/v1/market/gold/history")
+        etag = first.headers["etag"]
+        cached = client.get("/api/v1/market/gold/history", headers={"If-None-Match": etag})
+        assert loader.fetch_calls == 1
+
+        client.portal.call(_refresh_history, app)
+        unchanged = client.get("/api/v1/market/gold/history", headers={"If-None-Match": etag})
+
+        next_bar = loader.frame.iloc[[-1]].copy()
+        next_bar.index = next_bar.index + pd.Timedelta(days=1)
+        next_bar["Gold"] = 2450.0
+        loader.frame = pd.concat([loader.frame, next_bar])
+        client.portal.call(_refresh_history, app)
+        changed = client.get("/api/v1/market/gold/history", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and len(first.json()["points"]) == 8
+    assert cached.status_code == unchanged.status_code == 304
+    assert loader.fetch_calls == 3
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["points"]) == 9
+
+
+def test_snapshot_refresh_fetches_one_year_once_and_materializes_history():
+    class _LongHistoryLoader(_CountingMarketLoader):
+        provider_name = "test_long"
+
+        def __init__(self):
+            super().__init__()
+            self.periods = []
+
+        def fetch_data(self, period="6mo", interval="1d"):
+            self.fetch_calls += 1
+            self.periods.append(period)
+            idx = pd.date_range(end=datetime.now(timezone.utc), periods=250, freq="D")
+            return pd.DataFrame({"Gold": np.linspace(2000.0, 2400.0, num=len(idx))}, index=idx)
+
+    loader = _LongHistoryLoader()
+    app = create_app(market_loader=loader, start_background_task=False)
+    with TestClient(app) as client:
+        refreshed = client.post("/api/v1/market/snapshot/refresh")
+        history = client.get("/api/v1/market/gold/history")
+
+    assert refreshed.status_code == history.status_code == 200
+    assert loader.periods == ["1y"]
+    assert history.headers["etag"] == app.state.serialized["history"].etag
+    assert history.json()["source"] == "test_long"
+    assert len(history.json()["points"]) == 250
+    # 快照复用同一份一年期行情，只取最近半年的切片
+    window = _snapshot_window(loader.fetch_data())
+    assert len(window) < 250
+    assert window.index[0] >= window.index[-1] - pd.DateOffset(months=6)
+
+
+def test_gold_history_uses_synthetic_fallback_when_history_build_fails():
+    class _NoGoldLoader:
+        def fetch_data(self, period="6mo", interval="1d"):
+            idx = pd.date_range(end=datetime.now(timezone.utc), periods=30, freq="D")
+            return pd.DataFrame({"VIX": np.linspace(16.0, 18.0, num=len(idx))}, index=idx)
+
+    app = create_app(market_loader=_NoGoldLoader(), start_background_task=False)
+    with TestClient(app) as client:
+        history = client.get("/api/v1/market/gold/history")
+
+    assert history.status_code == 200
+    assert history.json()["source"] == "synthetic_fallback"
+    assert history.json()["points"]
+
+    strict = create_app(
+        market_loader=_NoGoldLoader(),
+        config=MarketSnapshotConfig(allow_synthetic_fallback=False),
+        start_background_task=False,
+    )
+    with TestClient(strict) as client:
+        unavailable = client.get("/api/v1/market/gold/history")
+    assert unavailable.status_code == 503
+    assert "market_history_missing_gold" in unavailable.json()["detail"]
+
+
+def test_build_gold_price_history_skips_missing_gold_rows_and_zero_factor_base():
+    idx = pd.date_range("2025-03-01", periods=5, freq="D")
+    frame = pd.DataFrame(
+        {
+            "Gold": [2300.0, np.nan, 2360.0, 2300.0, 2305.0],
+            "USD_Index": [0.0, 104.0, 103.0, 104.0, 104.0],
+            "VIX": [16.0, 17.0, 17.0, 21.0, 21.0],
+        },
+        index=idx,
+    )
+    history = build_gold_price_history(frame, source="test", now=datetime(2025, 3, 6, tzinfo=timezone.utc))
+
+    assert [point.date for point in history.points] == ["2025-03-01", "2025-03-03", "2025-03-04", "2025-03-05"]
+    assert history.points[0].change_pct is None
+    assert [node.date for node in history.key_nodes] == ["2025-03-03", "2025-03-04"]
+    up, down = history.key_nodes
+    assert up.factors == ["避险波动升温（VIX +6.25%）"]
+    assert down.factors == ["美元走强压制黄金（DXY +0.97%）", "避险波动升温（VIX +23.53%）"]
+
+
+def _random_gold(periods=160, seed=11):
+    idx = pd.date_range("2025-01-01", periods=periods, freq="D", tz="UTC")
+    rng = np.random.default_rng(seed)
+    return pd.Series(2300.0 + np.cumsum(rng.normal(0.0, 12.0, size=periods)), index=idx)
+
+
+def _full_scan(gold):
+    return {
+        "ma5": _moving_average(gold, 5),
+        "ma20": _moving_average(gold, 20),
+        "ma60": _moving_average(gold, 60),
+        "rsi14": _rsi(gold),
+        "macd": _macd(gold),
+        "atr14_pct": _atr_proxy_pct(gold),
+    }
+
+
+def _assert_parity(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if value is None:
+            assert actual[key] is None, key
+        else:
+            np.testing.assert_allclose(actual[key], value, rtol=1e-9, atol=1e-9, err_msg=key)
+
+
+def test_rsi_uses_wilder_smoothing_seeded_by_simple_mean():
+    gold = _random_gold(periods=40)
+    deltas = gold.diff().dropna().to_numpy()
+    gain = deltas[:14].clip(min=0).mean()
+    loss = (-deltas[:14]).clip(min=0).mean()
+    for delta in deltas[14:]:
+        gain = (gain * 13 + max(delta, 0.0)) / 14
+        loss = (loss * 13 + max(-delta, 0.0)) / 14
+
+    np.testing.assert_allclose(_rsi(gold), 100.0 - 100.0 / (1.0 + gain / loss), rtol=1e-9)
+    simple = deltas[-14:]
+    simple_rsi = 100.0 - 100.0 / (1.0 + simple.clip(min=0).mean() / (-simple).clip(min=0).mean())
+    assert not np.isclose(_rsi(gold), simple_rsi)
+    assert _rsi(gold.iloc[:1]) is None
+    assert _rsi(pd.Series([1.0, 2.0, 3.0])) == 100.0
+
+
+def test_incremental_indicator_state_matches_full_scan_bar_by_bar():
+    gold = _random_gold()
+    gold.iloc[40:45] = gold.iloc[39]
+    state = IncrementalIndicatorState()
+    for end in range(1, len(gold) + 1):
+        window = gold.iloc[:end].copy()
+        window.iloc[-1] += 3.0
+        _assert_parity(state.advance(window), _full_scan(window))
+    assert state.bars == len(gold) - 1
+
+
+class _DictRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+def test_indicator_state_checkpoint_resumes_and_resets_on_revised_history():
+    gold = _random_gold()
+    persistence = SnapshotPersistence("redis://unused", "postgresql://unused")
+    persistence._redis_client = _DictRedis()
+
+    state = IncrementalIndicatorState()
+    state.advance(gold.iloc[:100])
+    persistence.save_indicator_state(state)
+
+    restored = persistence.load_indicator_state()
+    assert restored is not None and restored.bars == 99
+    _assert_parity(restored.advance(gold), _full_scan(gold))
+    assert restored.bars == len(gold) - 1
+
+    sliding = gold.iloc[30:]
+    actual = restored.advance(sliding)
+    expected = _full_scan(sliding)
+    np.testing.assert_allclose(actual.pop("macd"), _macd(gold), rtol=1e-9)
+    np.testing.assert_allclose(actual.pop("rsi14"), _rsi(gold), rtol=1e-9)
+    expected.pop("macd")
+    expected.pop("rsi14")
+    _assert_parity(actual, expected)
+
+    legacy = restored.to_dict()
+    legacy.pop("rsi")
+    legacy["windows"].update(gains=[1.0] * 14, losses=[1.0] * 14)
+    persistence._redis_client.set(MARKET_INDICATOR_STATE_KEY, json.dumps(legacy))
+    assert persistence.load_indicator_state() is None
+
+    revised = gold.copy()
+    revised.iloc[-2] += 25.0
+    _assert_parity(restored.advance(revised), _full_scan(revised))
+    assert restored.bars == len(gold) - 1
+
+
+def test_snapshot_refresh_checkpoints_indicator_state_and_matches_full_scan():
+    loader = _FakeMarketLoader()
+    persistence = SnapshotPersistence("redis://unused", "postgresql://unused")
+    persistence._redis_client = _DictRedis()
+    app = create_app(market_loader=loader, persistence=persistence, start_background_task=False)
+    with TestClient(app) as client:
+        data = client.post("/api/v1/market/snapshot/refresh").json()
+
+    assert persistence.load_indicator_state().bars == 39
+    expected = build_market_snapshot(loader.fetch_data()).feature_summary
+    for key in ("ma5", "ma20", "ma60", "rsi14", "macd", "atr14_pct"):
+        np.testing.assert_allclose(data["feature_summary"][key], getattr(expected, key), rtol=1e-9)
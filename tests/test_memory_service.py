@@ -42,3 +42,24 @@ def test_memory_service_startup_does_not_block_on_embedding_model():
     assert health.json()["retriever_status"] in {"not_started", "loading", "ready", "unavailable"}
     assert ready.status_code == 503
     assert "memory_retriever_not_ready" in ready.json()["errors"]
+
+
+def test_memory_batch_search_returns_one_unavailable_payload_per_text():
+    original = memory_service.retriever
+    memory_service.retriever = None
+    try:
+        with TestClient(memory_service.app) as client:
+            resp = client.post(
+                "/api/v1/memory/search/batch",
+                json={
+                    "current_event_texts": ["CPI 高于预期", "美联储降息"],
+                    "top_k": 2,
+                },
+            )
+        assert resp.status_code == 200
+        items = resp.json()["items"]
+    finally:
+        memory_service.retriever = original
+
+    assert [item["query"] for item in items] == ["CPI 高于预期", "美联储降息"]
+    assert all(item["status"] == "unavailable" and item["results"] == [] for item in items)
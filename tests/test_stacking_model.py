@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from feature_engineer import FeatureEngineer, sliding_windows, window_base
+from stacking_model import DynamicEnsemble
+
+
+def _sequence_data(n_samples=96, seq_length=8, n_features=3, seed=3):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n_samples + seq_length - 1, n_features)).astype(np.float32)
+    windows = FeatureEngineer().create_sequences(base, seq_length)
+    y = (0.5 * windows[:, -1, 0] + rng.normal(0.0, 0.05, size=n_samples)).astype(np.float32)
+    return base, windows, y
+
+
+def _state(model):
+    return {k: v.detach().clone() for k, v in model.state_dict().items()}
+
+
+def _same_state(left, right):
+    return left.keys() == right.keys() and all(torch.equal(left[k], right[k]) for k in left)
+
+
+def test_train_torch_model_stops_on_flat_validation_loss_and_restores_best_epoch(tmp_path, monkeypatch):
+    _, windows, y = _sequence_data()
+    ensemble = DynamicEnsemble(
+        tabular_input_dim=3,
+        seq_input_dim=3,
+        batch_size=16,
+        grad_accumulation_steps=2,
+        early_stopping_patience=2,
+        checkpoint_dir=str(tmp_path),
+    )
+    model = ensemble.gru
+
+    losses = iter([1.0, 0.4, 0.4, 0.4, 0.4])
+    epoch_states = []
+
+    def _flat_validation_loss(model, X_val, y_val, criterion):
+        epoch_states.append(_state(model))
+        return next(losses)
+
+    optimizer_steps = []
+    adam_step = torch.optim.Adam.step
+
+    def _counting_step(self, *args, **kwargs):
+        optimizer_steps.append(1)
+        return adam_step(self, *args, **kwargs)
+
+    monkeypatch.setattr(ensemble, "_validation_loss", _flat_validation_loss)
+    monkeypatch.setattr(torch.optim.Adam, "step", _counting_step)
+    ensemble._train_torch_model(model, windows, y, windows[:16], y[:16], name="GRU")
+
+    stats = ensemble.training_stats["GRU"]
+    assert stats["epochs_run"] == 4
+    assert stats["best_epoch"] == 2
+    assert stats["best_val_loss"] == 0.4
+    assert stats["samples_per_sec"] > 0
+    # 96 个样本 / 每批 16 = 6 个小批量，每 2 批累积一次梯度 -> 每轮 3 次参数更新
+    assert len(optimizer_steps) == 4 * 3
+
+    assert len(epoch_states) == 4
+    assert not _same_state(epoch_states[1], epoch_states[-1])
+    assert _same_state(_state(model), epoch_states[1])
+    assert _same_state(torch.load(tmp_path / "gru_best.pth"), epoch_states[1])
+    assert not model.training
+
+
+def test_window_base_round_trips_sliding_windows_without_copying_windows():
+    base, windows, _ = _sequence_data(n_samples=20, seq_length=5)
+    assert np.shares_memory(windows, base)
+
+    restored, seq_length = window_base(windows[4:12])
+    assert seq_length == 5
+    np.testing.assert_array_equal(restored, base[4:16])
+    np.testing.assert_array_equal(sliding_windows(restored, seq_length), windows[4:12])
+
+    with pytest.raises(ValueError):
+        window_base(np.ascontiguousarray(windows[::2]))
+
+
+def test_create_sequences_returns_empty_windows_for_short_input():
+    short = np.ones((4, 3), dtype=np.float32)
+    windows = FeatureEngineer().create_sequences(short, 5)
+    assert windows.shape == (0, 5, 3)
+    assert windows.dtype == np.float32
+    assert FeatureEngineer().create_sequences(np.ones((5, 3)), 5).shape == (1, 5, 3)
+
+
+@pytest.mark.parametrize("platform, maxrss", [("linux", 512 * 1024), ("darwin", 512 * 1024 * 1024)])
+def test_peak_rss_mb_accounts_for_platform_units(monkeypatch, platform, maxrss):
+    import stacking_model
+
+    monkeypatch.setattr(stacking_model.sys, "platform", platform)
+    monkeypatch.setattr(
+        stacking_model.resource, "getrusage", lambda who: type("_Usage", (), {"ru_maxrss": maxrss})()
+    )
+    assert DynamicEnsemble._peak_rss_mb() == 512.0
+
+
+def _seeded_ensemble():
+    torch.manual_seed(0)
+    return DynamicEnsemble(tabular_input_dim=4, seq_input_dim=3, batch_size=16, early_stopping_patience=3, random_state=7)
+
+
+def test_parallel_l1_training_matches_serial_training():
+    base, windows, y = _sequence_data(n_samples=80, seq_length=6)
+    rng = np.random.default_rng(9)
+    X_tab = pd.DataFrame(rng.normal(size=(80, 4)), columns=["a", "b", "c", "d"])
+    X_tab["a"] += windows[:, -1, 0]
+    y = pd.Series(y)
+    split = 64
+    args = (X_tab[:split], windows[:split], y[:split], X_tab[split:], windows[split:], y[split:])
+
+    serial = _seeded_ensemble()
+    serial.train_l1(*args)
+    parallel = _seeded_ensemble()
+    parallel.train_l1(*args, parallel=True, n_jobs=2)
+
+    assert parallel.training_stats.keys() == serial.training_stats.keys() == {"GRU", "Transformer"}
+    for name in ("GRU", "Transformer"):
+        assert parallel.training_stats[name]["best_epoch"] == serial.training_stats[name]["best_epoch"]
+    assert len(parallel.rf.estimators_) == len(serial.rf.estimators_)
+    assert parallel.xgb.best_iteration == serial.xgb.best_iteration
+    np.testing.assert_allclose(
+        parallel._get_l1_predictions(X_tab[split:], windows[split:]),
+        serial._get_l1_predictions(X_tab[split:], windows[split:]),
+        rtol=1e-4,
+        atol=1e-5,
+    )
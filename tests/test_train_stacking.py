@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import train_stacking
+from feature_engineer import sliding_windows
+
+
+def _walk_forward_inputs(n_samples=48, seq_length=6, seed=5):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=n_samples, freq="D")
+    X_tab = pd.DataFrame(rng.normal(size=(n_samples, 3)), index=idx, columns=["f0", "f1", "f2"])
+    seq_base = rng.normal(size=(n_samples + seq_length - 1, 2))
+    Y = pd.DataFrame({"target_return_1d": rng.normal(0.0, 0.01, size=n_samples)}, index=idx)
+    return X_tab, sliding_windows(seq_base, seq_length), Y
+
+
+def test_walk_forward_resumes_only_missing_folds_and_invalidates_on_new_data(tmp_path, monkeypatch):
+    calls = []
+    run_fold = train_stacking._run_walk_forward_fold
+
+    def _spy(data_dir, h, fold, train_idx, test_idx, n_threads):
+        calls.append((h, fold))
+        return run_fold(data_dir, h, fold, train_idx, test_idx, n_threads)
+
+    monkeypatch.setattr(train_stacking, "_run_walk_forward_fold", _spy)
+    X_tab, X_seq, Y = _walk_forward_inputs()
+
+    def _validate(Y):
+        return train_stacking.walk_forward_validation(
+            X_tab, X_seq, Y, horizons=[1], n_workers=1, threads_per_worker=1, cache_dir=tmp_path, n_splits=2
+        )
+
+    first = _validate(Y)
+    assert calls == [(1, 0), (1, 1)]
+    data_dirs = [path for path in tmp_path.iterdir() if path.is_dir()]
+    assert len(data_dirs) == 1
+    assert sorted(path.name for path in data_dirs[0].glob("*.npy")) == ["X_seq_base.npy", "X_tab.npy", "Y.npy"]
+
+    (data_dirs[0] / "fold_h1_1.json").unlink()
+    calls.clear()
+    resumed = _validate(Y)
+    assert calls == [(1, 1)]
+    assert resumed["Fold"].tolist() == first["Fold"].tolist() == [0, 1]
+    assert resumed.loc[0, "RMSE"] == first.loc[0, "RMSE"]
+
+    calls.clear()
+    _validate(Y.assign(target_return_1d=Y["target_return_1d"] * 2.0))
+    assert calls == [(1, 0), (1, 1)]
+    assert len([path for path in tmp_path.iterdir() if path.is_dir()]) == 2
@@ -1,8 +1,17 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 import torch
 from data_loader import MarketDataLoader, NewsDataLoader
-from feature_engineer import FeatureEngineer
+from feature_engineer import FeatureEngineer, sliding_windows, window_base
+from feature_store import FeatureStore, backfill_feature_store
 from stacking_model import DynamicEnsemble, GRUModel, TransformerModel
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import mean_squared_error, mean_absolute_error
@@ -14,35 +23,153 @@ def evaluate(y_true, y_pred, name="Model"):
     print(f"{name} - RMSE: {rmse:.6f}, MAE: {mae:.6f}, ACC: {acc:.2%}")
     return rmse, mae, acc
 
-def walk_forward_validation(X_tab, X_seq, Y, horizons=[1, 7]):
+def _dataset_fingerprint(X_tab, seq_base, seq_length, Y):
+    digest = hashlib.sha1()
+    digest.update(
+        json.dumps([list(map(str, X_tab.columns)), list(map(str, Y.columns)), int(seq_length)]).encode("utf-8")
+    )
+    for values in (X_tab.to_numpy(dtype=float), np.asarray(seq_base, dtype=float), Y.to_numpy(dtype=float)):
+        digest.update(str(values.shape).encode("utf-8"))
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _cache_fold_inputs(cache_dir, X_tab, X_seq, Y):
+    """
+    将 walk-forward 的特征矩阵按数据指纹落盘一次，各折在子进程中以内存映射方式读取。
+    序列特征只保存二维底层数组与窗口长度，读取时再重建滑动窗口视图。
+    """
+    seq_base, seq_length = window_base(X_seq)
+    data_dir = Path(cache_dir) / _dataset_fingerprint(X_tab, seq_base, seq_length, Y)
+    meta_path = data_dir / "meta.json"
+    if meta_path.exists():
+        return data_dir
+    data_dir.mkdir(parents=True, exist_ok=True)
+    np.save(data_dir / "X_tab.npy", X_tab.to_numpy(dtype=float))
+    np.save(data_dir / "X_seq_base.npy", np.asarray(seq_base, dtype=float))
+    np.save(data_dir / "Y.npy", Y.to_numpy(dtype=float))
+    meta = {
+        "tab_columns": list(map(str, X_tab.columns)),
+        "target_columns": list(map(str, Y.columns)),
+        "seq_length": int(seq_length),
+    }
+    meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return data_dir
+
+
+def _init_fold_worker(n_threads):
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(n_threads)
+    torch.set_num_threads(n_threads)
+
+
+def _fold_result_path(data_dir, h, fold):
+    return Path(data_dir) / f"fold_h{h}_{fold}.json"
+
+
+def _run_walk_forward_fold(data_dir, h, fold, train_idx, test_idx, n_threads):
+    """
+    在独立进程中训练并评估单个折，结果写入磁盘以便中断后续跑。
+    """
+    data_dir = Path(data_dir)
+    meta = json.loads((data_dir / "meta.json").read_text(encoding="utf-8"))
+    X_tab_all = np.load(data_dir / "X_tab.npy", mmap_mode="r")
+    X_seq_all = sliding_windows(np.load(data_dir / "X_seq_base.npy", mmap_mode="r"), meta["seq_length"])
+    Y_all = np.load(data_dir / "Y.npy", mmap_mode="r")
+    y_all = Y_all[:, meta["target_columns"].index(f"target_return_{h}d")]
+
+    X_t = pd.DataFrame(X_tab_all[train_idx], columns=meta["tab_columns"])
+    X_v = pd.DataFrame(X_tab_all[test_idx], columns=meta["tab_columns"])
+    # TimeSeriesSplit 的索引是连续区间，按切片取窗口以保持视图不物化
+    Xs_t = X_seq_all[int(train_idx[0]):int(train_idx[-1]) + 1]
+    Xs_v = X_seq_all[int(test_idx[0]):int(test_idx[-1]) + 1]
+    y_t, y_v = pd.Series(y_all[train_idx]), pd.Series(y_all[test_idx])
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    # 1. 训练集成模型
+    ensemble = DynamicEnsemble(tabular_input_dim=X_t.shape[1], seq_input_dim=Xs_t.shape[2])
+    ensemble.set_thread_budget(n_threads)
+    ensemble.train_l1(X_t, Xs_t, y_t, X_v, Xs_v, y_v)
+
+    # 2. 自适应更新：使用最近 7 天数据更新权重
+    ensemble.update_dynamic_weights(X_t.tail(7), Xs_t[-7:], y_t.tail(7))
+
+    # 3. 预测与评估
+    preds = ensemble.predict(X_v, Xs_v)
+    rmse, mae, acc = evaluate(y_v, preds, f"T+{h} Fold {fold+1}")
+
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+    row = {
+        'Horizon': h,
+        'Fold': fold,
+        'Accuracy': float(acc),
+        'RMSE': float(rmse),
+        'MAE': float(mae),
+        'Wall_Seconds': round(wall_s, 3),
+        'CPU_Seconds': round(cpu_s, 3),
+        'CPU_Utilization': round(cpu_s / (wall_s * n_threads), 4) if wall_s > 0 else 0.0,
+        'Threads': n_threads,
+    }
+    result_path = _fold_result_path(data_dir, h, fold)
+    tmp_path = result_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(row), encoding="utf-8")
+    tmp_path.replace(result_path)
+    return row
+
+
+def walk_forward_validation(
+    X_tab,
+    X_seq,
+    Y,
+    horizons=[1, 7],
+    n_workers=None,
+    threads_per_worker=None,
+    cache_dir="walk_forward_cache",
+    n_splits=5,
+):
     """
     实施 Walk-forward Validation 与 A/B 测试框架。
+    各折在进程池中并行训练，每个进程有固定的线程预算；已完成的折从磁盘结果直接恢复。
     """
-    tscv = TimeSeriesSplit(n_splits=5)
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+    data_dir = _cache_fold_inputs(cache_dir, X_tab, X_seq, Y)
+
     cv_metrics = []
-    
+    pending = []
     for h in horizons:
-        print(f"\n===== 开始 T+{h} 周期 Walk-forward 验证 =====")
-        y_h = Y[f'target_return_{h}d']
-        
         for fold, (train_idx, test_idx) in enumerate(tscv.split(X_tab)):
-            X_t, X_v = X_tab.iloc[train_idx], X_tab.iloc[test_idx]
-            Xs_t, Xs_v = X_seq[train_idx], X_seq[test_idx]
-            y_t, y_v = y_h.iloc[train_idx], y_h.iloc[test_idx]
-            
-            # 1. 训练集成模型
-            ensemble = DynamicEnsemble(tabular_input_dim=X_tab.shape[1], seq_input_dim=X_seq.shape[2])
-            ensemble.train_l1(X_t, Xs_t, y_t, X_v, Xs_v, y_v)
-            
-            # 2. 自适应更新：使用最近 7 天数据更新权重
-            ensemble.update_dynamic_weights(X_t.tail(7), Xs_t[-7:], y_t.tail(7))
-            
-            # 3. 预测与评估
-            preds = ensemble.predict(X_v, Xs_v)
-            rmse, mae, acc = evaluate(y_v, preds, f"Fold {fold+1}")
-            cv_metrics.append({'Horizon': h, 'Fold': fold, 'Accuracy': acc, 'RMSE': rmse, 'MAE': mae})
-            
-    return pd.DataFrame(cv_metrics)
+            result_path = _fold_result_path(data_dir, h, fold)
+            if result_path.exists():
+                print(f"T+{h} Fold {fold+1} 已完成，从缓存恢复")
+                cv_metrics.append(json.loads(result_path.read_text(encoding="utf-8")))
+            else:
+                pending.append((h, fold, train_idx, test_idx))
+
+    n_cpu = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or max(1, n_cpu // 2), len(pending) or 1))
+    threads_per_worker = max(1, threads_per_worker or n_cpu // n_workers)
+    print(f"\n===== Walk-forward 验证：{len(pending)} 个待训练折，{n_workers} 个进程 × {threads_per_worker} 线程 =====")
+
+    if n_workers == 1:
+        for h, fold, train_idx, test_idx in pending:
+            cv_metrics.append(_run_walk_forward_fold(data_dir, h, fold, train_idx, test_idx, threads_per_worker))
+    elif pending:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_fold_worker,
+            initargs=(threads_per_worker,),
+        ) as pool:
+            futures = [
+                pool.submit(_run_walk_forward_fold, str(data_dir), h, fold, train_idx, test_idx, threads_per_worker)
+                for h, fold, train_idx, test_idx in pending
+            ]
+            for future in as_completed(futures):
+                cv_metrics.append(future.result())
+
+    return pd.DataFrame(cv_metrics).sort_values(['Horizon', 'Fold']).reset_index(drop=True)
 
 def train_final_system():
     # 1. 数据准备
@@ -54,18 +181,14 @@ def train_final_system():
     scored_news = n_loader.analyze_causality(news)
     daily_signals = n_loader.get_daily_signals(scored_news)
     
-    # 3. 运行特征工程 (拆解步骤以获取序列特征)
+    # 3. 运行特征工程：特征统一经特征库产出，与在线推理共用同一条流水线。
+    # 特征库从行情第 FEATURE_WARMUP_ROWS 个交易日起落库，已落库日期上的特征（含新闻 EWM）与全量历史流水线一致；
+    # 下方 walk-forward 验证与最终模型使用同一份 X_tab，两者训练行完全相同。
     engineer = FeatureEngineer(horizons=[1, 7, 30])
-    
-    # 3.1 预处理与特征构建
-    df = engineer.preprocess(raw_market)
-    df = engineer.construct_seasonal_features(df)
-    if not daily_signals.empty:
-        df = engineer.construct_news_features(df, daily_signals)
-    df = engineer.construct_market_features(df)
-    
-    # 3.2 自适应归一化 (关键：确保序列特征也使用相同的归一化)
-    df = engineer.adaptive_normalize(df)
+    store = FeatureStore(os.environ.get("FEATURE_STORE_DIR", "feature_store"))
+    written = backfill_feature_store(store, raw_market, daily_signals, engineer=engineer)
+    print(f"特征库 {store.version_dir} 新增 {written} 行")
+    df = store.read(start=raw_market.index.min(), end=raw_market.index.max())
     
     # 3.3 构建目标
     df = engineer.construct_targets(df)
@@ -118,7 +241,9 @@ def train_final_system():
         final_ensemble = DynamicEnsemble(tabular_input_dim=X_tab.shape[1], seq_input_dim=X_seq.shape[2])
         # 使用 90% 数据训练，10% 数据作为动态权重调整参考
         split = int(len(X_tab) * 0.9)
-        final_ensemble.train_l1(X_tab[:split], X_seq[:split], y_h[:split], X_tab[split:], X_seq[split:], y_h[split:])
+        final_ensemble.train_l1(
+            X_tab[:split], X_seq[:split], y_h[:split], X_tab[split:], X_seq[split:], y_h[split:], parallel=True
+        )
         final_ensemble.update_dynamic_weights(X_tab[split:], X_seq[split:], y_h[split:])
         
         preds = final_ensemble.predict(X_tab, X_seq)